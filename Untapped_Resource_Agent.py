@@ -1,162 +1,298 @@
 # Untapped_Resource_Agent.py
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.tools import Tool
-from langchain_groq import ChatGroq
-from langchain_community.utilities import SerpAPIWrapper
-from langgraph.prebuilt import create_react_agent
-from pydantic import BaseModel
+# langchain, langgraph and the Groq/SerpAPI clients are imported and built on
+# first use (or ResourceAgent.warmup()), so importing this module stays cheap
+# and does not require API keys.
 from dotenv import load_dotenv
 import os
-import requests 
+import asyncio
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-load_dotenv() 
+from answer_cache import AnswerCache, normalize_query
+from catalog_index import CategoryIndex
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from conversation_memory import ConversationMemory
+from fast_path import FastPathRouter
+from resource_retrieval import ResourceRetriever
+from search_cache import DEFAULT_CACHE_PATH, SearchCache
+from single_flight import SingleFlight
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-SERP_API_KEY = os.getenv("SERP_API_KEY")
-if not all([GROQ_API_KEY, SERP_API_KEY]):
-    raise ValueError("GROQ_API_KEY and SERP_API_KEY are required in .env file.")
+load_dotenv() 
 
 llm = "meta-llama/llama-4-scout-17b-16e-instruct"
-chat_groq_llm = ChatGroq(model_name=llm, groq_api_key=GROQ_API_KEY)
 
-def government_resource_search(query: str) -> str:
-    """ Find government programs based on query.    """
-    # Define common government resource categories and agencies
-    resource_categories = {
-        "financial assistance": [
-            "SNAP (Supplemental Nutrition Assistance Program)",
-            "TANF (Temporary Assistance for Needy Families)", 
-            "SSI (Supplemental Security Income)",
-            "Medicaid",
-            "Housing Choice Voucher Program (Section 8)",
-            "Low Income Home Energy Assistance Program (LIHEAP)"
-        ],
-        "healthcare": [
-            "Medicare",
-            "Medicaid", 
-            "Community Health Centers",
-            "Veterans Health Administration",
-            "Indian Health Service",
-            "Children's Health Insurance Program (CHIP)"
-        ],
-        "housing": [
-            "HUD Public Housing",
-            "Housing Choice Voucher Program",
-            "Rural Housing Programs (USDA)",
-            "Veterans Housing Programs",
-            "Native American Housing Programs",
-            "Homeless Assistance Programs"
-        ],
-        "employment": [
-            "Workforce Innovation and Opportunity Act (WIOA)",
-            "Unemployment Insurance",
-            "Job Corps",
-            "Trade Adjustment Assistance",
-            "Veterans Employment Programs",
-            "Disability Employment Programs"
-        ],
-        "education": [
-            "Pell Grant Program",
-            "Federal Student Loans",
-            "Head Start Program",
-            "Special Education Services",
-            "Adult Education Programs",
-            "Veterans Education Benefits (GI Bill)"
-        ]
-    }
-    
-    query_lower = query.lower()
-    matched_resources = []
-    for category, resources in resource_categories.items():
-        if any(keyword in query_lower for keyword in category.split()):
-            matched_resources.extend([f"{category.title()} - {r}" for r in resources])
-
-    if not matched_resources:
-        matched_resources = [
-            "211 (Dial 2-1-1 for local resources)",
-            "Benefits.gov - Find government benefits",
-            "Social Services Administration (local office)",
-            "Community Action Agencies",
-            "Salvation Army",
-            "United Way"
-        ]
-    
-    result = "Government and Community Resources:\n\n"
-    result += "\n".join(f"{i+1}. {r}" for i, r in enumerate(matched_resources[:10]))
-    return result
+_client_lock = threading.Lock()
+_chat_model = None
+_query_schema_class = None
+_breaker_callback_class = None
+
+def _require_api_key(name: str) -> str:
+    value = os.getenv(name)
+    if not value:
+        raise ValueError(f"{name} is required in .env file.")
+    return value
+
+def get_chat_model():
+    """The shared ChatGroq client, built on first use"""
+    global _chat_model
+    if _chat_model is None:
+        with _client_lock:
+            if _chat_model is None:
+                from langchain_groq import ChatGroq
+                _chat_model = ChatGroq(model_name=llm, groq_api_key=_require_api_key("GROQ_API_KEY"),
+                                       request_timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES)
+    return _chat_model
+
+def _query_schema():
+    global _query_schema_class
+    if _query_schema_class is None:
+        from pydantic import BaseModel
+
+        class QuerySchema(BaseModel):
+            query: str
+
+        _query_schema_class = QuerySchema
+    return _query_schema_class
+
+def _breaker_callback(breaker: CircuitBreaker):
+    """
+    Callback handler for one agent run that collects each chat model call's
+    latency and errors, and reports them to the breaker once the run's answer
+    is delivered (settle). A run abandoned at its deadline reports nothing
+    more: its timeout is the outcome, and a late finish must not close a
+    half-open breaker.
+    """
+    global _breaker_callback_class
+    if _breaker_callback_class is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class BreakerCallback(BaseCallbackHandler):
+            def __init__(self, breaker: CircuitBreaker):
+                self.breaker = breaker
+                self._lock = threading.Lock()
+                self._started: Dict = {}
+                self._outcomes: List[Tuple[float, bool]] = []
+                self._closed = False
+
+            def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+                self._started[run_id] = time.perf_counter()
+
+            def on_llm_end(self, response, *, run_id, **kwargs):
+                self._collect(run_id, error=False)
+
+            def on_llm_error(self, error, *, run_id, **kwargs):
+                self._collect(run_id, error=True)
+
+            def _collect(self, run_id, error: bool):
+                start = self._started.pop(run_id, None)
+                if start is None:
+                    return
+                with self._lock:
+                    if not self._closed:
+                        self._outcomes.append((time.perf_counter() - start, error))
+
+            def settle(self):
+                with self._lock:
+                    outcomes, self._outcomes, self._closed = self._outcomes, [], True
+                for seconds, error in outcomes:
+                    self.breaker.record(seconds, error=error)
+
+            def abandon(self):
+                with self._lock:
+                    self._outcomes, self._closed = [], True
+
+        _breaker_callback_class = BreakerCallback
+    return _breaker_callback_class(breaker)
+
+def __getattr__(name):
+    # Keep the old module attributes available without building them at import
+    if name == "chat_groq_llm":
+        return get_chat_model()
+    if name == "QuerySchema":
+        return _query_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Async agent runs make their Groq calls one after another, so capping concurrent
+# runs per process caps concurrent Groq calls
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", 16))
+# Blocking network tools (SerpAPI) run here instead of on the event loop
+TOOL_EXECUTOR_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", 32))
+
+# Per-call limits for the Groq client and SerpAPI, and for a whole agent run
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 10))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 1))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", 8))
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", 20))
+# Calls slower than these count as failures towards tripping a breaker
+LLM_SLOW_CALL_SECONDS = float(os.getenv("LLM_SLOW_CALL_SECONDS", 5))
+SEARCH_SLOW_CALL_SECONDS = float(os.getenv("SEARCH_SLOW_CALL_SECONDS", 4))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", 30))
+
+_llm_semaphores = weakref.WeakKeyDictionary()
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_EXECUTOR_WORKERS,
+                                    thread_name_prefix="agent-tool")
+# Synchronous agent runs execute here so the request thread can stop waiting at the deadline
+_agent_executor = ThreadPoolExecutor(max_workers=TOOL_EXECUTOR_WORKERS,
+                                     thread_name_prefix="agent-run")
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """
+    The LLM call semaphore for the running event loop. asyncio primitives are
+    bound to one loop, so each loop gets its own (dropped with the loop) and
+    MAX_CONCURRENT_LLM_CALLS caps the calls per loop, not per process.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+        _llm_semaphores[loop] = semaphore
+    return semaphore
+
+def _inline_coroutine(func):
+    """Async wrapper for in-memory tools that are too cheap to hand off to a thread"""
+    async def run(query: str) -> str:
+        return func(query)
+    return run
+
+def _executor_coroutine(func):
+    """Async wrapper that runs a blocking tool on the shared tool executor"""
+    async def run(query: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(_tool_executor, func, query)
+    return run
+
+GOVERNMENT_RESOURCE_CATEGORIES = {
+    "financial assistance": [
+        "SNAP (Supplemental Nutrition Assistance Program)",
+        "TANF (Temporary Assistance for Needy Families)", 
+        "SSI (Supplemental Security Income)",
+        "Medicaid",
+        "Housing Choice Voucher Program (Section 8)",
+        "Low Income Home Energy Assistance Program (LIHEAP)"
+    ],
+    "healthcare": [
+        "Medicare",
+        "Medicaid", 
+        "Community Health Centers",
+        "Veterans Health Administration",
+        "Indian Health Service",
+        "Children's Health Insurance Program (CHIP)"
+    ],
+    "housing": [
+        "HUD Public Housing",
+        "Housing Choice Voucher Program",
+        "Rural Housing Programs (USDA)",
+        "Veterans Housing Programs",
+        "Native American Housing Programs",
+        "Homeless Assistance Programs"
+    ],
+    "employment": [
+        "Workforce Innovation and Opportunity Act (WIOA)",
+        "Unemployment Insurance",
+        "Job Corps",
+        "Trade Adjustment Assistance",
+        "Veterans Employment Programs",
+        "Disability Employment Programs"
+    ],
+    "education": [
+        "Pell Grant Program",
+        "Federal Student Loans",
+        "Head Start Program",
+        "Special Education Services",
+        "Adult Education Programs",
+        "Veterans Education Benefits (GI Bill)"
+    ]
+}
+
+GOVERNMENT_FALLBACK_RESOURCES = [
+    "211 (Dial 2-1-1 for local resources)",
+    "Benefits.gov - Find government benefits",
+    "Social Services Administration (local office)",
+    "Community Action Agencies",
+    "Salvation Army",
+    "United Way"
+]
 
+NONPROFIT_CATEGORIES = {
+    "food assistance": [
+        "Local Food Banks",
+        "Feeding America Network", 
+        "Meals on Wheels",
+        "Soup Kitchens",
+        "Community Gardens",
+        "Church Food Pantries"
+    ],
+    "housing assistance": [
+        "Habitat for Humanity",
+        "Salvation Army Housing Programs",
+        "Local Homeless Shelters",
+        "Catholic Charities Housing",
+        "United Way Housing Programs",
+        "Community Action Agencies"
+    ],
+    "healthcare": [
+        "Federally Qualified Health Centers (FQHC)",
+        "Free Clinics Association",
+        "Planned Parenthood",
+        "Community Mental Health Centers",
+        "Lions Club Vision Programs",
+        "American Red Cross Health Services"
+    ],
+    "financial assistance": [
+        "United Way Emergency Financial Assistance",
+        "Salvation Army Financial Aid",
+        "Catholic Charities Emergency Services",
+        "Local Community Foundation Grants",
+        "Churches and Faith-Based Aid",
+        "Goodwill Financial Counseling"
+    ],
+    "employment": [
+        "Goodwill Job Training",
+        "YMCA Employment Programs", 
+        "Local Workforce Development Boards",
+        "Dress for Success",
+        "Career Centers",
+        "Volunteer Organizations"
+    ]
+}
 
+NONPROFIT_FALLBACK_RESOURCES = [
+    "United Way (Call 211)",
+    "Salvation Army",
+    "Catholic Charities",
+    "Local Community Action Agency",
+    "American Red Cross",
+    "Goodwill Industries",
+    "Local Faith-Based Organizations",
+    "Community Foundation"
+]
+
+# Compiled once at import; each lookup is a single pass over the query
+government_index = CategoryIndex(
+    GOVERNMENT_RESOURCE_CATEGORIES,
+    GOVERNMENT_FALLBACK_RESOURCES,
+    header="Government and Community Resources:\n\n"
+)
+nonprofit_index = CategoryIndex(
+    NONPROFIT_CATEGORIES,
+    NONPROFIT_FALLBACK_RESOURCES,
+    header="Available Nonprofit and Community Resources:\n\n"
+)
+
+def government_resource_search(query: str) -> str:
+    """ Find government programs based on query.    """
+    return government_index.search(query)
 
 
 def nonprofit_search(query: str) -> str:
     """
     Searches for nonprofit and community resources based on the user's query.
     """
-    nonprofit_categories = {
-        "food assistance": [
-            "Local Food Banks",
-            "Feeding America Network", 
-            "Meals on Wheels",
-            "Soup Kitchens",
-            "Community Gardens",
-            "Church Food Pantries"
-        ],
-        "housing assistance": [
-            "Habitat for Humanity",
-            "Salvation Army Housing Programs",
-            "Local Homeless Shelters",
-            "Catholic Charities Housing",
-            "United Way Housing Programs",
-            "Community Action Agencies"
-        ],
-        "healthcare": [
-            "Federally Qualified Health Centers (FQHC)",
-            "Free Clinics Association",
-            "Planned Parenthood",
-            "Community Mental Health Centers",
-            "Lions Club Vision Programs",
-            "American Red Cross Health Services"
-        ],
-        "financial assistance": [
-            "United Way Emergency Financial Assistance",
-            "Salvation Army Financial Aid",
-            "Catholic Charities Emergency Services",
-            "Local Community Foundation Grants",
-            "Churches and Faith-Based Aid",
-            "Goodwill Financial Counseling"
-        ],
-        "employment": [
-            "Goodwill Job Training",
-            "YMCA Employment Programs", 
-            "Local Workforce Development Boards",
-            "Dress for Success",
-            "Career Centers",
-            "Volunteer Organizations"
-        ]
-    }
-    
-    query_lower = query.lower()
-    matched_resources = []
-    
-    for category, resources in nonprofit_categories.items():
-        if any(keyword in query_lower for keyword in category.split()):
-            matched_resources.extend([f"{category.title()} - {r}" for r in resources])
-    
-    if not matched_resources:
-        matched_resources = [
-            "United Way (Call 211)",
-            "Salvation Army",
-            "Catholic Charities",
-            "Local Community Action Agency",
-            "American Red Cross",
-            "Goodwill Industries",
-            "Local Faith-Based Organizations",
-            "Community Foundation"
-        ]
-    
-    result = "Available Nonprofit and Community Resources:\n\n"
-    result += "\n".join(f"{i+1}. {r}" for i, r in enumerate(matched_resources[:10]))
-    return result
+    return nonprofit_index.search(query)
 
 def financial_info_explainer(topic: str) -> str:
     """Provide basic explanations for mortgages, budgeting, bills, and general housing finance."""
@@ -207,6 +343,57 @@ def financial_info_explainer(topic: str) -> str:
             "Try asking something like 'Explain how a mortgage works' or 'How should I plan for monthly bills?'"
         )
 
+
+# Topics financial_info_explainer has a dedicated explanation for
+FINANCIAL_TOPICS = ["mortgage", "budget", "bills", "rent"]
+
+# Every catalog entry indexed once, duplicates merged; compiled on first search
+resource_retriever = ResourceRetriever()
+resource_retriever.add_catalog(GOVERNMENT_RESOURCE_CATEGORIES, "government")
+resource_retriever.add_catalog(NONPROFIT_CATEGORIES, "nonprofit")
+for _topic in FINANCIAL_TOPICS:
+    _explanation = financial_info_explainer(_topic)
+    resource_retriever.add(_explanation.split("\n", 1)[0].strip("*:"), "explainer", _topic, _explanation)
+
+
+def ranked_resource_search(query: str, k: int = 8) -> str:
+    """Best-matching entries across all built-in catalogs, ranked by relevance."""
+    results = resource_retriever.search(query, k=k)
+    if not results:
+        return ("No close matches in the built-in catalogs. Try government_resource_search or "
+                "nonprofit_search, or google_search for specific details.")
+
+    lines = []
+    for i, (entry, score) in enumerate(results, 1):
+        source = "Financial explainer" if entry.source == "explainer" else entry.source.title()
+        categories = ", ".join(c.title() for c in entry.categories)
+        lines.append(f"{i}. {entry.name} - {source}: {categories} (score {score:.2f})")
+    return "Best matches across government, nonprofit and financial resources:\n\n" + "\n".join(lines)
+
+
+DEGRADED_NOTICE = ("I can't reach my full search right now, so these come from my "
+                   "built-in resource lists.")
+SEARCH_UNAVAILABLE_MESSAGE = ("Web search is unavailable right now. Answer from "
+                              "ranked_resource_search, government_resource_search and "
+                              "nonprofit_search instead.")
+
+
+def internal_only_answer(query: str, max_items: int = 4) -> str:
+    """Structured summary from the built-in catalogs alone, for when the LLM is unavailable"""
+    results = resource_retriever.search(query, k=max_items * 3)
+    sections = [DEGRADED_NOTICE]
+    for source, title in (("government", "Government Resources"), ("nonprofit", "Nonprofit Resources")):
+        names = [entry.name for entry, _ in results if entry.source == source][:max_items]
+        if names:
+            sections.append(f"**{title}**\n" + "\n".join(f"- {name}" for name in names))
+    explainers = [entry.text for entry, _ in results if entry.source == "explainer"]
+    if explainers:
+        sections.append("**Financial Info**\n" + explainers[0])
+    sections.append("**Next Steps**\n"
+                    "1. Dial 2-1-1 any time to reach a local resource specialist.\n"
+                    "2. Ask again in a few minutes for current eligibility and contact details.")
+    return "\n\n".join(sections)
+
        
 single_agent_prompt="""
 You are a Untapped Resource Assistant Agent for housing resources.
@@ -214,7 +401,7 @@ You help users find both government and nonprofit resources based on their needs
 
 Follow this process:
 1. Analyze the user's request to determine the required resource type. 
-2. **Prioritize** the internal tools (`government_resource_search` or `nonprofit_search`) first.
+2. **Prioritize** the internal tools (`ranked_resource_search`, `government_resource_search` or `nonprofit_search`) first.
 3. **ONLY use the `Google Search` tool if the user asks for specific, current, or external information** (e.g., "what is the *latest* eligibility for LIHEAP", "contact details for NYC food banks", or information *not covered* by the internal tools).
 4. Always output a short structured summary:
    - Government Resources
@@ -223,61 +410,640 @@ Follow this process:
    - Next Steps
 """
 
-class QuerySchema(BaseModel):
-    query: str
+NO_ANSWER_MESSAGE = "Agent concluded the task but did not provide a final answer."
+
+
+class AgentUnavailable(Exception):
+    """The model could not answer (breaker open or deadline passed); answer is the catalog-only fallback"""
+
+    def __init__(self, reason: str, answer: str):
+        super().__init__(f"degraded: {reason}")
+        self.reason = reason
+        self.answer = answer
+
 
 class ResourceAgent:
-    def __init__(self):
-        self.model = chat_groq_llm
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", single_agent_prompt),
-            MessagesPlaceholder(variable_name="messages"),
-        ])
-        self.search = SerpAPIWrapper(serpapi_api_key=SERP_API_KEY)
-        self.tools = [
-            Tool(
-                name="government_resource_search",
-                description="Finds federal/state programs and benefits.",
-                func=government_resource_search,
-                args_schema=QuerySchema
-            ),
-            Tool(
-                name="nonprofit_search",
-                description="Finds nonprofit organizations and community support services.",
-                func=nonprofit_search,
-                args_schema=QuerySchema
-            ),
-            Tool(
-                name="financial_info_explainer",
-                description="Explains mortgages, budgeting, rent, and other basic financial concepts.",
-                func=financial_info_explainer,
-                args_schema=QuerySchema
-            ),
-            Tool(
-                name="google_search",
-                description="Finds the latest program info, eligibility updates, or contact info.",
-                func=self.search.run,
-                args_schema=QuerySchema
-            )
-        ]
-
-        self.agent = create_react_agent(
-            model=self.model,
-            tools=self.tools,
-            prompt=self.prompt
-        )
+    def __init__(self, answer_cache: Optional[AnswerCache] = None,
+                 search_cache: Optional[SearchCache] = None,
+                 router: Optional[FastPathRouter] = None, fast_path: bool = True,
+                 memory: Optional[ConversationMemory] = None,
+                 model=None, search=None,
+                 llm_breaker: Optional[CircuitBreaker] = None,
+                 search_breaker: Optional[CircuitBreaker] = None,
+                 timeout: Optional[float] = AGENT_TIMEOUT_SECONDS, coalesce: bool = True,
+                 search_cache_path: Optional[str] = None):
+        # model/search default to the shared ChatGroq client and a SerpAPIWrapper,
+        # both built lazily; pass stand-ins to run without API keys
+        self._model_override = model
+        self._search = search
+        # A slow or failing Groq/SerpAPI trips its breaker; while the LLM breaker is
+        # open, answers come from the built-in catalogs only
+        self.llm_breaker = llm_breaker if llm_breaker is not None else CircuitBreaker(
+            "groq", slow_call_seconds=LLM_SLOW_CALL_SECONDS, reset_timeout=BREAKER_RESET_SECONDS)
+        self.search_breaker = search_breaker if search_breaker is not None else CircuitBreaker(
+            "serpapi", slow_call_seconds=SEARCH_SLOW_CALL_SECONDS, reset_timeout=BREAKER_RESET_SECONDS,
+            timeout=SEARCH_TIMEOUT_SECONDS)
+        # Seconds an agent run may take before the caller gets the degraded answer instead
+        self.timeout = timeout
+        self.degraded = 0
+        # Concurrent identical questions share one agent run
+        self.flights = SingleFlight() if coalesce else None
+        self._agent = None
+        self._session_agent = None
+        self._build_lock = threading.Lock()
+        # Repeat and near-duplicate questions are answered without a ReAct run
+        self.answer_cache = answer_cache if answer_cache is not None else AnswerCache()
+        # Plain catalog-answerable questions skip the model entirely
+        if router is None and fast_path:
+            router = FastPathRouter(GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES,
+                                    financial_info_explainer)
+        self.router = router
+        # Paid SerpAPI lookups are persisted across restarts; opened on the first search
+        self._search_cache = search_cache
+        self.search_cache_path = search_cache_path or DEFAULT_CACHE_PATH
+        # Per-session history for calls that pass a session_id, compacted to a token budget
+        self.memory = memory if memory is not None else ConversationMemory()
+
+        # Seconds from the start of the last find_resources_stream call to its first token
+        self.last_time_to_first_token: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once the model client and agent graph have been built"""
+        return self._agent is not None
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            self.warmup()
+        return self._agent
+
+    @property
+    def session_agent(self):
+        """The agent graph with checkpointed, compacting per-session memory"""
+        if self._session_agent is None:
+            self.warmup()
+        return self._session_agent
+
+    @property
+    def search(self):
+        if self._search is None:
+            with self._build_lock:
+                if self._search is None:
+                    from langchain_community.utilities import SerpAPIWrapper
+                    self._search = SerpAPIWrapper(serpapi_api_key=_require_api_key("SERP_API_KEY"))
+        return self._search
+
+    @property
+    def search_cache(self) -> SearchCache:
+        if self._search_cache is None:
+            with self._build_lock:
+                if self._search_cache is None:
+                    self._search_cache = SearchCache(self._run_search, path=self.search_cache_path)
+        return self._search_cache
+
+    def after_fork(self):
+        """Reopen per-process resources in a worker forked from a preloaded master"""
+        if self._search_cache is not None:
+            self._search_cache.after_fork()
+        self.memory.after_fork()
+
+    def close(self):
+        """Close the search cache, if one was opened"""
+        if self._search_cache is not None:
+            self._search_cache.close()
+
+    def _run_search(self, query: str) -> str:
+        return self.search_breaker.call(self.search.run, query)
+
+    def _google_search(self, query: str) -> str:
+        """google_search tool: cached SerpAPI, or a pointer to the internal tools while it is down"""
+        try:
+            return self.search_cache.run(query)
+        except (CircuitOpenError, TimeoutError):
+            return SEARCH_UNAVAILABLE_MESSAGE
+
+    def warmup(self) -> float:
+        """
+        Import langchain/langgraph and build the model client, tools and agent
+        graph now instead of on the first query. Returns the seconds it took.
+        """
+        start = time.perf_counter()
+        with self._build_lock:
+            if self._agent is None:
+                from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+                from langchain_core.runnables import RunnableLambda
+                from langchain_core.tools import Tool
+                from langgraph.prebuilt import create_react_agent
 
-    def find_resources(self, query: str) -> str:
+                self.model = self._model_override if self._model_override is not None else get_chat_model()
+                self.prompt = ChatPromptTemplate.from_messages([
+                    ("system", single_agent_prompt),
+                    MessagesPlaceholder(variable_name="messages"),
+                ])
+                query_schema = _query_schema()
+                self.tools = [
+                    Tool(
+                        name="government_resource_search",
+                        description="Finds federal/state programs and benefits.",
+                        func=government_resource_search,
+                        coroutine=_inline_coroutine(government_resource_search),
+                        args_schema=query_schema
+                    ),
+                    Tool(
+                        name="nonprofit_search",
+                        description="Finds nonprofit organizations and community support services.",
+                        func=nonprofit_search,
+                        coroutine=_inline_coroutine(nonprofit_search),
+                        args_schema=query_schema
+                    ),
+                    Tool(
+                        name="ranked_resource_search",
+                        description="Ranks the best-matching programs and organizations across all built-in catalogs.",
+                        func=ranked_resource_search,
+                        coroutine=_inline_coroutine(ranked_resource_search),
+                        args_schema=query_schema
+                    ),
+                    Tool(
+                        name="financial_info_explainer",
+                        description="Explains mortgages, budgeting, rent, and other basic financial concepts.",
+                        func=financial_info_explainer,
+                        coroutine=_inline_coroutine(financial_info_explainer),
+                        args_schema=query_schema
+                    ),
+                    Tool(
+                        name="google_search",
+                        description="Finds the latest program info, eligibility updates, or contact info.",
+                        func=self._google_search,
+                        coroutine=_executor_coroutine(self._google_search),
+                        args_schema=query_schema
+                    )
+                ]
+
+                self.memory.summarizer = self.model
+                self._session_agent = create_react_agent(
+                    model=self.model,
+                    tools=self.tools,
+                    prompt=self.prompt,
+                    pre_model_hook=RunnableLambda(self.memory.pre_model_hook,
+                                                  afunc=self.memory.apre_model_hook),
+                    checkpointer=self.memory.checkpointer
+                )
+                self._agent = create_react_agent(
+                    model=self.model,
+                    tools=self.tools,
+                    prompt=self.prompt
+                )
+        return time.perf_counter() - start
+
+    def find_resources(self, query: str, use_cache: bool = True,
+                       session_id: Optional[str] = None, allow_degraded: bool = True) -> str:
+        """
+        Answer a query. With a session_id, earlier turns of that session are
+        part of the context; follow-up turns always go to the model and are
+        not cached, since their answer depends on the conversation.
+
+        When the model is unavailable the answer comes from the built-in
+        catalogs alone; with allow_degraded=False, AgentUnavailable (carrying
+        that answer) is raised instead, so callers can tell it apart.
+
+        Other turns asking the same (normalized) question while a run for it
+        is in flight wait for that run and share its answer or error.
+        """
+        if not query:
+            raise ValueError("Please provide a description of your situation or needs.")
+
+        contextual = self._begin_turn(session_id)
+        if not contextual:
+            immediate = self._immediate_answer(query, use_cache)
+            if immediate is not None:
+                self._remember(session_id, query, immediate[0])
+                return immediate[0]
+            if self.flights is not None:
+                try:
+                    answer, shared = self.flights.run(
+                        normalize_query(query), lambda: self._run_agent(query, use_cache, session_id, False))
+                except AgentUnavailable as e:
+                    return self._fallback(e, allow_degraded)
+                if shared:
+                    # The run that answered belonged to another caller, so record the turn here
+                    self._remember(session_id, query, answer)
+                return answer
+        try:
+            return self._run_agent(query, use_cache, session_id, contextual)
+        except AgentUnavailable as e:
+            return self._fallback(e, allow_degraded)
+
+    def _run_agent(self, query: str, use_cache: bool, session_id: Optional[str],
+                   contextual: bool) -> str:
+        """One agent run, bounded by the LLM breaker and self.timeout"""
+        if not self.llm_breaker.allow():
+            raise self._unavailable(query, "model circuit open")
+        graph, config = self._graph_for(session_id)
+        monitor = _breaker_callback(self.llm_breaker)
+        future = _agent_executor.submit(graph.invoke, self.memory.turn_input(session_id, query),
+                                        self._run_config(config, monitor))
+        try:
+            response = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A run still queued never starts; one already running finishes in the background
+            future.cancel()
+            monitor.abandon()
+            self.llm_breaker.record_timeout(self.timeout)
+            raise self._unavailable(query, f"no answer within {self.timeout:.1f}s")
+        finally:
+            monitor.settle()
+        answer = _final_answer(response["messages"])
+        if use_cache and not contextual and answer != NO_ANSWER_MESSAGE:
+            self.answer_cache.put(query, answer)
+        return answer
+
+    def _begin_turn(self, session_id: Optional[str]) -> bool:
+        """Mark the session active; True if it already has history to continue"""
+        if session_id is None:
+            return False
+        contextual = self.memory.has_history(session_id)
+        self.memory.touch(session_id)
+        return contextual
+
+    def _graph_for(self, session_id: Optional[str]):
+        if session_id is None:
+            return self.agent, None
+        return self.session_agent, self.memory.config_for(session_id)
+
+    def _run_config(self, config: Optional[Dict], monitor) -> Dict:
+        """Run config with the run's callback that reports model latency to the LLM breaker"""
+        config = dict(config or {})
+        config["callbacks"] = list(config.get("callbacks") or []) + [monitor]
+        return config
+
+    def _degraded_answer(self, query: str) -> str:
+        self.degraded += 1
+        return internal_only_answer(query)
+
+    def _unavailable(self, query: str, reason: str) -> AgentUnavailable:
+        return AgentUnavailable(reason, self._degraded_answer(query))
+
+    @staticmethod
+    def _fallback(error: AgentUnavailable, allow_degraded: bool) -> str:
+        if not allow_degraded:
+            raise error
+        return error.answer
+
+    def _remember(self, session_id: Optional[str], query: str, answer: str):
+        """Record an answer given without the model so follow-ups can refer to it"""
+        if session_id is not None:
+            self.memory.remember(session_id, query, answer)
+
+    def end_session(self, session_id: str):
+        """Forget a session's conversation history"""
+        self.memory.end_session(session_id)
+
+    def _immediate_answer(self, query: str, use_cache: bool) -> Optional[Tuple[str, str]]:
+        """(answer, source) when the cache or the fast-path router can answer without the LLM"""
+        if use_cache:
+            cached = self.answer_cache.get(query)
+            if cached is not None:
+                return cached, 'cache'
+        if self.router is not None:
+            routed = self.router.route(query)
+            if routed is not None:
+                return routed, 'fast_path'
+        return None
+
+    async def afind_resources(self, query: str, use_cache: bool = True,
+                              session_id: Optional[str] = None, allow_degraded: bool = True) -> str:
+        """Async find_resources; concurrent runs are capped by MAX_CONCURRENT_LLM_CALLS"""
+        if not query:
+            raise ValueError("Please provide a description of your situation or needs.")
+
+        contextual = self._begin_turn(session_id)
+        if not contextual:
+            immediate = self._immediate_answer(query, use_cache)
+            if immediate is not None:
+                self._remember(session_id, query, immediate[0])
+                return immediate[0]
+            if self.flights is not None:
+                try:
+                    answer, shared = await self.flights.arun(
+                        normalize_query(query), lambda: self._arun_agent(query, use_cache, session_id, False))
+                except AgentUnavailable as e:
+                    return self._fallback(e, allow_degraded)
+                if shared:
+                    self._remember(session_id, query, answer)
+                return answer
+        try:
+            return await self._arun_agent(query, use_cache, session_id, contextual)
+        except AgentUnavailable as e:
+            return self._fallback(e, allow_degraded)
+
+    async def _arun_agent(self, query: str, use_cache: bool, session_id: Optional[str],
+                          contextual: bool) -> str:
+        if not self.llm_breaker.allow():
+            raise self._unavailable(query, "model circuit open")
+        graph, config = self._graph_for(session_id)
+        monitor = _breaker_callback(self.llm_breaker)
+        async with _llm_semaphore():
+            try:
+                response = await asyncio.wait_for(
+                    graph.ainvoke(self.memory.turn_input(session_id, query),
+                                  self._run_config(config, monitor)),
+                    self.timeout)
+            except asyncio.TimeoutError:
+                monitor.abandon()
+                self.llm_breaker.record_timeout(self.timeout)
+                raise self._unavailable(query, f"no answer within {self.timeout:.1f}s") from None
+            finally:
+                monitor.settle()
+        answer = _final_answer(response["messages"])
+        if use_cache and not contextual and answer != NO_ANSWER_MESSAGE:
+            self.answer_cache.put(query, answer)
+        return answer
+
+    def find_resources_stream(self, query: str, use_cache: bool = True,
+                              session_id: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream the agent's answer as it is generated.
+
+        Yields event dicts in order:
+          {'type': 'token', 'content': str}                         answer text delta
+          {'type': 'interim', 'content': str}                       text the model sent along
+                                                                    with its tool calls
+          {'type': 'tool_call', 'name': str, 'args': dict}          model requested a tool
+          {'type': 'tool_result', 'name': str, 'content': str}      tool finished
+          {'type': 'final', 'content': str, 'cached': bool, 'fast_path': bool,
+           'degraded': bool, 'time_to_first_token': float,
+           'total_time': float}                                     always last
+
+        A model streams the text it sends before a tool call before the tool
+        call itself, so tokens may arrive that turn out not to be part of the
+        answer. An interim event (with that text) and the tool_call events
+        follow them; the answer is the text streamed after the last tool_call,
+        which is also the final event's content.
+
+        A run that outlives self.timeout is abandoned: an interim event with
+        empty content withdraws anything streamed so far, and the degraded
+        answer follows as for an open breaker.
+        """
+        if not query:
+            raise ValueError("Please provide a description of your situation or needs.")
+
+        run = _StreamRun(self)
+        contextual = self._begin_turn(session_id)
+        if not contextual:
+            immediate = self._immediate_answer(query, use_cache)
+            if immediate is not None:
+                self._remember(session_id, query, immediate[0])
+                yield from run.immediate(*immediate)
+                return
+
+        if not self.llm_breaker.allow():
+            yield from run.immediate(self._degraded_answer(query), 'degraded')
+            return
+        graph, config = self._graph_for(session_id)
+        monitor = _breaker_callback(self.llm_breaker)
+        # The run streams from an agent-run thread, so the reader can stop waiting at the deadline
+        chunks: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for item in graph.stream(self.memory.turn_input(session_id, query),
+                                         self._run_config(config, monitor),
+                                         stream_mode=["messages", "updates"]):
+                    if stop.is_set():
+                        break
+                    chunks.put(item)
+            finally:
+                chunks.put(None)
+
+        producer = _agent_executor.submit(produce)
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=run.remaining(self.timeout))
+                except queue.Empty:
+                    producer.cancel()
+                    monitor.abandon()
+                    self.llm_breaker.record_timeout(self.timeout)
+                    yield from run.timed_out(self._degraded_answer(query))
+                    return
+                if item is None:
+                    break
+                yield from run.events(*item)
+            # Re-raises the run's error, if any
+            producer.result()
+        finally:
+            stop.set()
+            monitor.settle()
+        yield run.final(query, use_cache and not contextual)
+
+    async def afind_resources_stream(self, query: str, use_cache: bool = True,
+                                     session_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Async find_resources_stream; yields the same events"""
         if not query:
             raise ValueError("Please provide a description of your situation or needs.")
 
-        response = self.agent.invoke({"messages": [("user", query)]})
-        final_message = response["messages"][-1]
+        run = _StreamRun(self)
+        contextual = self._begin_turn(session_id)
+        if not contextual:
+            immediate = self._immediate_answer(query, use_cache)
+            if immediate is not None:
+                self._remember(session_id, query, immediate[0])
+                for event in run.immediate(*immediate):
+                    yield event
+                return
+
+        if not self.llm_breaker.allow():
+            for event in run.immediate(self._degraded_answer(query), 'degraded'):
+                yield event
+            return
+        graph, config = self._graph_for(session_id)
+        monitor = _breaker_callback(self.llm_breaker)
+        # The run feeds a queue, so a slow reader never holds an LLM slot
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                async with _llm_semaphore():
+                    async for mode, chunk in graph.astream(self.memory.turn_input(session_id, query),
+                                                           self._run_config(config, monitor),
+                                                           stream_mode=["messages", "updates"]):
+                        for event in run.events(mode, chunk):
+                            events.put_nowait(event)
+            finally:
+                events.put_nowait(None)
+
+        producer = asyncio.get_running_loop().create_task(produce())
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), run.remaining(self.timeout))
+                except asyncio.TimeoutError:
+                    producer.cancel()
+                    monitor.abandon()
+                    self.llm_breaker.record_timeout(self.timeout)
+                    for event in run.timed_out(self._degraded_answer(query)):
+                        yield event
+                    return
+                if event is None:
+                    break
+                yield event
+            # Re-raises the run's error, if any
+            await producer
+        finally:
+            producer.cancel()
+            monitor.settle()
+        yield run.final(query, use_cache and not contextual)
+
+    def find_resources_batch(self, queries: Iterable[Union[str, Tuple[str, str]]],
+                             max_concurrency: int = 8, use_cache: bool = False) -> Iterator[Dict]:
+        """
+        Run many queries concurrently, yielding results in completion order.
+
+        queries may be plain strings (their position is used as the id) or
+        (id, query) pairs. Each result is a dict with id, query, response,
+        error and latency_seconds; a failing query does not stop the batch.
+        A query answered only from the built-in catalogs (model unavailable)
+        keeps that response but is marked failed, so a resumed batch retries
+        it. Batches re-check answers, so by default they bypass the answer
+        cache and its near-duplicate matches.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        def run_one(query_id, query):
+            start = time.perf_counter()
+            try:
+                response, error = self.find_resources(query, use_cache=use_cache, allow_degraded=False), None
+            except AgentUnavailable as e:
+                response, error = e.answer, str(e)
+            except Exception as e:
+                response, error = None, f"{type(e).__name__}: {e}"
+            return {'id': query_id, 'query': query, 'response': response,
+                    'error': error, 'latency_seconds': time.perf_counter() - start}
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max_concurrency,
+                                thread_name_prefix="agent-batch") as executor:
+            for index, item in enumerate(queries):
+                query_id, query = item if isinstance(item, tuple) else (index, item)
+                # Keep only a bounded window of submitted work so huge inputs stream through
+                if len(pending) >= max_concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(run_one, query_id, query))
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the answer cache"""
+        return self.answer_cache.stats()
+
+    def fast_path_stats(self) -> dict:
+        """How many requests the fast-path router answered without the LLM"""
+        return self.router.stats() if self.router is not None else {}
+
+    def memory_stats(self) -> dict:
+        """Active sessions, compactions and evictions of the conversation memory"""
+        return self.memory.stats()
+
+    def coalescing_stats(self) -> dict:
+        """Agent runs started vs. calls that shared another caller's in-flight run"""
+        return self.flights.stats() if self.flights is not None else {}
+
+    def breaker_stats(self) -> dict:
+        """State and trip counts of the Groq and SerpAPI breakers, and degraded answers given"""
+        return {'groq': self.llm_breaker.stats(), 'serpapi': self.search_breaker.stats(),
+                'degraded_answers': self.degraded}
+
+
+def _final_answer(messages) -> str:
+    """Last non-empty message content from a finished agent run"""
+    final_message = messages[-1]
+
+    if final_message.content:
+        return final_message.content
+    else:
+        for msg in reversed(messages):
+            if msg.content:
+                return msg.content
+        return NO_ANSWER_MESSAGE
+
+
+class _StreamRun:
+    """Turns LangGraph messages/updates stream chunks into find_resources_stream events"""
+
+    def __init__(self, agent: ResourceAgent):
+        self.agent = agent
+        self.start = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.answer = ""
+        # IDs of agent messages seen to carry tool calls; their text is not streamed as tokens
+        self._tool_messages = set()
+
+    def _token(self, content: str) -> Dict:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            self.agent.last_time_to_first_token = self.first_token_at - self.start
+        return {'type': 'token', 'content': content}
+
+    def immediate(self, answer: str, source: str) -> List[Dict]:
+        token = self._token(answer)
+        elapsed = time.perf_counter() - self.start
+        return [token, {'type': 'final', 'content': answer, 'cached': source == 'cache',
+                        'fast_path': source == 'fast_path', 'degraded': source == 'degraded',
+                        'time_to_first_token': elapsed, 'total_time': elapsed}]
+
+    def remaining(self, timeout: Optional[float]) -> Optional[float]:
+        """Seconds left before the run's deadline (None without a timeout)"""
+        if timeout is None:
+            return None
+        return max(self.start + timeout - time.perf_counter(), 0.0)
+
+    def timed_out(self, answer: str) -> List[Dict]:
+        """Withdraw whatever was streamed and end with the degraded answer"""
+        return [{'type': 'interim', 'content': ''}, *self.immediate(answer, 'degraded')]
+
+    def events(self, mode: str, chunk) -> List[Dict]:
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") != "agent":
+                return []
+            if getattr(message, "tool_calls", None) or getattr(message, "tool_call_chunks", None):
+                self._tool_messages.add(message.id)
+            if (message.id not in self._tool_messages
+                    and isinstance(message.content, str) and message.content):
+                return [self._token(message.content)]
+            return []
+
+        events = []
+        for node, update in chunk.items():
+            for message in (update or {}).get("messages", []):
+                if node == "agent":
+                    tool_calls = getattr(message, "tool_calls", None) or []
+                    if tool_calls and message.content:
+                        events.append({'type': 'interim', 'content': message.content})
+                    for call in tool_calls:
+                        events.append({'type': 'tool_call', 'name': call["name"], 'args': call["args"]})
+                    if message.content and not tool_calls:
+                        self.answer = message.content
+                elif node == "tools":
+                    events.append({'type': 'tool_result', 'name': message.name,
+                                   'content': message.content})
+        return events
+
+    def final(self, query: str, use_cache: bool) -> Dict:
+        answer = self.answer or NO_ANSWER_MESSAGE
+        if self.answer and use_cache:
+            self.agent.answer_cache.put(query, answer)
 
-        if final_message.content:
-            return final_message.content
-        else:
-            for msg in reversed(response["messages"]):
-                if msg.content:
-                    return msg.content
-            return "Agent concluded the task but did not provide a final answer."
\ No newline at end of file
+        end = time.perf_counter()
+        return {'type': 'final', 'content': answer, 'cached': False, 'fast_path': False,
+                'degraded': False,
+                'time_to_first_token': (self.first_token_at or end) - self.start,
+                'total_time': end - self.start}
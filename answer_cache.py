@@ -0,0 +1,195 @@
+"""
+Two-tier answer cache for ResourceAgent.
+
+Tier one is an exact-match LRU keyed on the normalized query. Tier two finds
+near-duplicate questions ("help with my electric bill in Georgia" vs "help
+paying my electric bill in georgia") by cosine similarity over hashed word
+and character n-gram vectors kept in a NumPy matrix, one row per cached
+entry. Both tiers share the same size bound and TTL.
+
+Similar wording is not enough for a near-duplicate hit: the two questions
+must also have the same content words (everything but filler such as
+"help", "my", "paying"), so a question about Atlanta never gets the answer
+cached for Athens, or "single mother" the one for "single father".
+"""
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# NumPy is imported on first use so importing the agent module stays fast
+np = None
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+# Words that can differ between two phrasings of the same question
+FILLER_WORDS = frozenset("""
+a about am an and any are as assistance at be can could do does find for get getting give
+has have help helping how i im in is it looking me my near need needs of on or out pay
+paying please program programs resource resources some someone that the there to want what
+where which who with would you your
+""".split())
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", query.lower())).strip()
+
+
+def content_words(key: str) -> frozenset:
+    """Words of a normalized query that must match for a near-duplicate hit, plurals folded"""
+    return frozenset(word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss')
+                     else word for word in key.split() if word not in FILLER_WORDS)
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+class AnswerCache:
+    """Thread-safe LRU+TTL cache with a cosine near-duplicate fallback"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.75, n_features: int = 1024,
+                 near_duplicates: bool = True):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.n_features = n_features
+        self.near_duplicates = near_duplicates
+
+        self._lock = threading.Lock()
+        # key -> (answer, expires_at, slot); ordered oldest -> most recently used
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Similarity matrix and per-slot expiry, allocated on first use
+        self._matrix = None
+        self._expires = None
+        self._slot_keys = [None] * max_entries
+        self._slot_words = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _ensure_storage(self):
+        if self._matrix is None:
+            _load_numpy()
+            self._matrix = np.zeros((self.max_entries, self.n_features), dtype=np.float32)
+            self._expires = np.zeros(self.max_entries, dtype=np.float64)
+
+    def _vectorize(self, key: str) -> "np.ndarray":
+        """Signed feature hashing of word unigrams/bigrams and char trigrams"""
+        words = key.split()
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        padded = f" {key} "
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+        vec = np.zeros(self.n_features, dtype=np.float32)
+        if not features:
+            return vec
+        hashes = np.fromiter((zlib.crc32(f.encode()) for f in features),
+                             dtype=np.uint32, count=len(features))
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vec, hashes % self.n_features, signs)
+        norm = np.linalg.norm(vec)
+        if norm:
+            vec /= norm
+        return vec
+
+    def get(self, query: str) -> Optional[str]:
+        """Return a cached answer for the query (or a near-duplicate of it)"""
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            self._ensure_storage()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return entry[0]
+                self._remove(key)
+
+            if self.near_duplicates and self._entries:
+                scores = self._matrix @ self._vectorize(key)
+                scores[self._expires <= now] = -1.0
+                words = content_words(key)
+                # Most similar first; the first with the same content words is the match
+                candidates = np.flatnonzero(scores >= self.similarity_threshold)
+                for slot in candidates[np.argsort(-scores[candidates], kind='stable')]:
+                    if self._slot_words[slot] == words:
+                        match = self._slot_keys[slot]
+                        self._entries.move_to_end(match)
+                        self.near_hits += 1
+                        return self._entries[match][0]
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, answer: str, ttl_seconds: Optional[float] = None):
+        """Store an answer, evicting the least recently used entry if full"""
+        key = normalize_query(query)
+        if not key:
+            return
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._ensure_storage()
+            entry = self._entries.get(key)
+            if entry is not None:
+                slot = entry[2]
+                self._entries.move_to_end(key)
+            else:
+                if not self._free_slots:
+                    oldest = next(iter(self._entries))
+                    self._remove(oldest)
+                    self.evictions += 1
+                slot = self._free_slots.pop()
+                self._slot_keys[slot] = key
+                if self.near_duplicates:
+                    self._matrix[slot] = self._vectorize(key)
+                    self._slot_words[slot] = content_words(key)
+            self._entries[key] = (answer, expires_at, slot)
+            self._expires[slot] = expires_at
+
+    def _remove(self, key: str):
+        _, _, slot = self._entries.pop(key)
+        self._matrix[slot] = 0.0
+        self._expires[slot] = 0.0
+        self._slot_keys[slot] = None
+        self._slot_words[slot] = None
+        self._free_slots.append(slot)
+
+    def clear(self):
+        """Drop every cached answer (counters are kept)"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+            }
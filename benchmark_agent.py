@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+End-to-end ResourceAgent benchmark with offline record/replay.
+
+Record once against the live services (needs GROQ_API_KEY and SERP_API_KEY);
+queries are JSONL {"id": ..., "query": ...} records as in run_agent.py --batch:
+
+    python benchmark_agent.py record queries.jsonl --fixtures fixtures/
+
+Then benchmark offline as often as needed, with injected latencies standing
+in for Groq and SerpAPI:
+
+    python benchmark_agent.py replay --fixtures fixtures/ --llm-latency 0.4 --search-latency 0.6
+
+Both modes report per-stage timings: model calls, each tool, voice
+post-processing (utils.format_resource_response) and the end-to-end latency.
+The answer cache is always bypassed and the search cache starts cold, so
+every run measures the full path; --fast-path enables the router.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from Untapped_Resource_Agent import ResourceAgent, _require_api_key, get_chat_model
+from replay_harness import (
+    FixtureStore,
+    ModelRecorder,
+    RecordingSearch,
+    StageTimer,
+    attach_callbacks,
+    replay_components,
+)
+from run_agent import percentile, read_batch_queries
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+from utils import format_resource_response  # noqa: E402
+
+
+def build_agent(model, search, fast_path, cache_dir):
+    # A fresh search cache per run, so tool timings include the search backend
+    return ResourceAgent(model=model, search=search, fast_path=fast_path,
+                         search_cache_path=os.path.join(cache_dir, 'search_cache.db'))
+
+
+def run_queries(agent, queries, timer, repeat):
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            answer = agent.find_resources(query, use_cache=False)
+            format_start = time.perf_counter()
+            format_resource_response(answer)
+            end = time.perf_counter()
+            timer.record('post-processing', end - format_start)
+            timer.record('end-to-end', end - start)
+
+
+def report(timer):
+    print(f"\n{'stage':28s} {'calls':>6} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    print("-" * 75)
+    stages = sorted(timer.durations, key=lambda stage: (stage == 'end-to-end', stage))
+    for stage in stages:
+        durations = sorted(timer.durations[stage])
+        total = sum(durations)
+        print(f"{stage:28s} {len(durations):>6d} {total:>9.3f} {total / len(durations) * 1000:>9.2f} "
+              f"{percentile(durations, 50) * 1000:>9.2f} {percentile(durations, 95) * 1000:>9.2f}")
+
+    accounted = sum(sum(d) for stage, d in timer.durations.items() if stage != 'end-to-end')
+    overhead = sum(timer.durations.get('end-to-end', [])) - accounted
+    print("-" * 75)
+    print(f"{'agent/graph overhead':28s} {'':>6} {overhead:>9.3f}")
+
+
+def record(args):
+    queries = [query for _, query in read_batch_queries(args.queries, set())]
+    fixtures = FixtureStore(args.fixtures)
+    from langchain_community.utilities import SerpAPIWrapper
+
+    model = get_chat_model()
+    search = RecordingSearch(SerpAPIWrapper(serpapi_api_key=_require_api_key("SERP_API_KEY")), fixtures)
+    return fixtures, model, search, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay an end-to-end agent benchmark")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('queries', nargs='?',
+                        help='JSONL queries to record (replay defaults to the recorded ones)')
+    parser.add_argument('--fixtures', default='fixtures', help='Fixture directory')
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help='Injected seconds per model call in replay mode')
+    parser.add_argument('--search-latency', type=float, default=0.0,
+                        help='Injected seconds per search in replay mode')
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the query set')
+    parser.add_argument('--fast-path', action='store_true', help='Let the fast-path router answer')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='agent-bench-')
+    timer = StageTimer()
+    try:
+        if args.mode == 'record':
+            if not args.queries:
+                parser.error("record requires a queries file")
+            fixtures, model, search, queries = record(args)
+            agent = build_agent(model, search, args.fast_path, cache_dir)
+            attach_callbacks(agent, [ModelRecorder(fixtures), timer])
+        else:
+            model, search = replay_components(args.fixtures, args.llm_latency, args.search_latency)
+            queries = ([query for _, query in read_batch_queries(args.queries, set())]
+                       if args.queries else model.fixtures.queries)
+            agent = build_agent(model, search, args.fast_path, cache_dir)
+            attach_callbacks(agent, [timer])
+
+        print(f"⏱️  {args.mode}: {len(queries)} queries x {args.repeat}")
+        try:
+            run_queries(agent, queries, timer, args.repeat)
+        finally:
+            agent.close()
+        report(timer)
+
+        if args.mode == 'record':
+            fixtures.save()
+            print(f"\n💾 Fixtures saved to {args.fixtures}")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
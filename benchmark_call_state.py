@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Soak test for AnthonyPersona's call-state store.
+
+Drives many short calls through the persona (a greeting turn and a location
+turn each), ends most of them with call_ended and abandons the rest, and
+samples traced Python memory as it goes. With a bounded store the traced
+memory levels off once max_calls abandoned calls are held; the old plain
+dict grew with every call.
+
+Usage:
+    python benchmark_call_state.py [--calls 1000000] [--backend memory|sqlite]
+                                   [--max-calls 10000] [--abandon 0.2]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from call_state import MemoryCallStateStore, SQLiteCallStateStore  # noqa: E402
+
+NEEDS = ["I need help with my electric bill", "I need food", "help with rent",
+         "I lost my job", "necesito ayuda con comida"]
+LOCATIONS = ["Atlanta, GA 30303", "Brooklyn, NY 11201", "Houston, TX 77002", "Oakland, CA 94607"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument('--max-calls', type=int, default=10000, help='Store capacity')
+    parser.add_argument('--abandon', type=float, default=0.2,
+                        help='Fraction of calls that never send call_ended')
+    parser.add_argument('--samples', type=int, default=10, help='Memory samples to print')
+    args = parser.parse_args()
+
+    # Imported here so logging setup and agent construction are not traced
+    import logging
+    from app import AnthonyPersona
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    if args.backend == 'memory':
+        store = MemoryCallStateStore(max_calls=args.max_calls)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), 'call_state.db')
+        store = SQLiteCallStateStore(path, max_calls=args.max_calls)
+    persona = AnthonyPersona(store)
+    rng = random.Random(5)
+
+    print(f"📞 Call-state soak ({args.calls} calls, {args.backend} store, max {args.max_calls}, "
+          f"{args.abandon:.0%} abandoned)")
+    print("-" * 60)
+    print(f"{'calls':>10s} {'held':>8s} {'traced MB':>10s} {'calls/s':>9s}")
+
+    tracemalloc.start()
+    every = max(args.calls // args.samples, 1)
+    start = last = time.perf_counter()
+    baseline = None
+    for i in range(1, args.calls + 1):
+        call_id = f"call-{i}"
+        persona.process_user_input(call_id, rng.choice(NEEDS))
+        persona.process_user_input(call_id, rng.choice(LOCATIONS))
+        if rng.random() >= args.abandon:
+            persona.end_call(call_id)
+
+        if i % every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            now = time.perf_counter()
+            if baseline is None and len(store) >= args.max_calls:
+                baseline = current
+            print(f"{i:>10d} {len(store):>8d} {current / 1e6:>10.1f} {every / (now - last):>9.0f}")
+            last = now
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("-" * 60)
+    print(f"Growth since the store filled: {(current - (baseline or current)) / 1e6:+.1f} MB "
+          f"(peak {peak / 1e6:.1f} MB) in {time.perf_counter() - start:.0f}s")
+    print(f"Store: {store.stats()}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark.
+
+Imports each module in a fresh interpreter with `python -X importtime`,
+parses the timing report and prints the cumulative import time per module
+together with its heaviest dependencies. API keys are blanked so the run
+also checks that the modules import without them.
+
+Save a baseline once, then compare against it (e.g. in CI) to catch
+regressions such as a heavy library creeping back into module scope:
+
+    python benchmark_import_time.py --save-baseline import_times.json
+    python benchmark_import_time.py --baseline import_times.json [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FLASK_BACKEND = os.path.join(ROOT, 'flask_backend')
+
+# module name -> directory it is imported from
+MODULES = {
+    'catalog_index': ROOT,
+    'answer_cache': ROOT,
+    'fast_path': ROOT,
+    'search_cache': ROOT,
+    'resource_retrieval': ROOT,
+    'spatial_index': ROOT,
+    'eligibility': ROOT,
+    'Untapped_Resource_Agent': ROOT,
+    'app': FLASK_BACKEND,
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+# Imports slower than the baseline by less than this are treated as noise
+NOISE_FLOOR_MS = 15.0
+
+
+def measure(module, cwd):
+    """Return (cumulative_ms, [(self_ms, name), ...]) for one cold import"""
+    env = dict(os.environ, GROQ_API_KEY='', SERP_API_KEY='',
+               PYTHONPATH=os.pathsep.join([ROOT, FLASK_BACKEND]))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    cumulative_ms = None
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        imports.append((int(self_us) / 1000, name))
+        if name == module and not indent:
+            cumulative_ms = int(cumulative_us) / 1000
+    return cumulative_ms or 0.0, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time per module")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per module (fastest is kept)')
+    parser.add_argument('--top', type=int, default=3, help='Heaviest dependencies to list')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write results as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Fail if slower than this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown over the baseline (fraction)')
+    args = parser.parse_args()
+
+    print(f"⏱️  Cold import times (best of {args.repeat})")
+    print("-" * 60)
+    results = {}
+    failed = False
+    for module, cwd in MODULES.items():
+        try:
+            runs = [measure(module, cwd) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+        cumulative_ms, imports = min(runs, key=lambda run: run[0])
+        results[module] = round(cumulative_ms, 1)
+        heaviest = sorted(imports, reverse=True)[:args.top]
+        print(f"{module:26s} {cumulative_ms:8.1f} ms   heaviest: "
+              + ", ".join(f"{name} {ms:.0f}ms" for ms, name in heaviest))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("\n📏 Compared with baseline")
+        for module, ms in results.items():
+            if module not in baseline:
+                continue
+            limit = max(baseline[module] * (1 + args.tolerance), baseline[module] + NOISE_FLOOR_MS)
+            status = "✅" if ms <= limit else "❌"
+            failed |= ms > limit
+            print(f"{status} {module:26s} {ms:8.1f} ms (baseline {baseline[module]:.1f} ms, limit {limit:.1f} ms)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
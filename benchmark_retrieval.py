@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the ranked catalog retriever.
+
+Indexes the built-in catalogs plus synthetic entries (to simulate the
+catalog growing to tens of thousands of programs), then reports index build
+time and per-query scoring latency percentiles.
+
+Usage:
+    python benchmark_retrieval.py [--entries 50000] [--queries 5000] [--k 10]
+"""
+
+import argparse
+import random
+import time
+
+from Untapped_Resource_Agent import FINANCIAL_TOPICS, GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES
+from resource_retrieval import ResourceRetriever
+from run_agent import percentile
+
+WORDS = """
+food housing rent energy heating cooling utility medical health dental vision
+job training employment education college tuition child care senior veteran
+disability legal aid transportation shelter emergency cash grant loan voucher
+counseling mental recovery nutrition family youth immigrant refugee tax credit
+""".split()
+PLACES = ["County", "City", "Regional", "State", "Tribal", "Community", "Neighborhood"]
+KINDS = ["Program", "Assistance Fund", "Services", "Center", "Coalition", "Network", "Initiative"]
+
+
+def build_retriever(extra: int, seed: int = 7) -> ResourceRetriever:
+    rng = random.Random(seed)
+    retriever = ResourceRetriever()
+    retriever.add_catalog(GOVERNMENT_RESOURCE_CATEGORIES, "government")
+    retriever.add_catalog(NONPROFIT_CATEGORIES, "nonprofit")
+    categories = list(GOVERNMENT_RESOURCE_CATEGORIES) + list(NONPROFIT_CATEGORIES)
+    for i in range(extra):
+        words = " ".join(w.title() for w in rng.sample(WORDS, 2))
+        name = f"{rng.choice(PLACES)} {words} {rng.choice(KINDS)} #{i}"
+        retriever.add(name, rng.choice(["government", "nonprofit"]), rng.choice(categories))
+    return retriever
+
+
+def make_queries(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    templates = ["I need help with {a}", "{a} and {b} assistance", "{a} {b} programs near me",
+                 "where can I get {a}", "{a}"]
+    return [rng.choice(templates).format(a=rng.choice(WORDS + FINANCIAL_TOPICS), b=rng.choice(WORDS))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--entries', type=int, default=50000, help='Synthetic entries to add')
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    retriever = build_retriever(args.entries)
+    start = time.perf_counter()
+    retriever.search("warm up", k=args.k)
+    build_time = time.perf_counter() - start
+
+    queries = make_queries(args.queries)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        retriever.search(query, k=args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"📊 Ranked retrieval benchmark ({len(retriever)} entries, {len(queries)} queries, top {args.k})")
+    print("-" * 60)
+    print(f"Index build:   {build_time * 1000:8.1f} ms")
+    print(f"Query p50:     {percentile(latencies, 50) * 1e6:8.1f} µs")
+    print(f"Query p99:     {percentile(latencies, 99) * 1e6:8.1f} µs")
+    print(f"Query mean:    {sum(latencies) / len(latencies) * 1e6:8.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
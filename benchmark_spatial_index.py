@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the nearest-resource spatial index.
+
+Builds the index over synthetic resource points (uniform across the
+continental U.S. plus dense city clusters), checks k-nearest results
+against a brute-force haversine scan, and reports per-query latency for
+the index and the scan.
+
+Usage:
+    python benchmark_spatial_index.py [--points 100000] [--queries 2000] [--k 5]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from run_agent import percentile
+from spatial_index import SpatialIndex, haversine_miles
+
+CATEGORIES = ["Food Assistance", "Utility Assistance", "Housing Assistance", "Healthcare", "Employment"]
+CITIES = [(33.75, -84.39), (40.75, -73.99), (41.88, -87.63), (34.05, -118.24), (29.76, -95.37)]
+
+
+def make_points(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        if i % 2:
+            lat, lng = rng.uniform(25, 49), rng.uniform(-124, -67)
+        else:
+            city_lat, city_lng = rng.choice(CITIES)
+            lat, lng = rng.gauss(city_lat, 0.2), rng.gauss(city_lng, 0.2)
+        points.append({'id': i, 'lat': lat, 'lng': lng, 'category': rng.choice(CATEGORIES)})
+    return points
+
+
+def time_queries(func, queries):
+    latencies = []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        func(lat, lng)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    points = make_points(args.points)
+    start = time.perf_counter()
+    index = SpatialIndex(points)
+    build_time = time.perf_counter() - start
+
+    rng = random.Random(4)
+    queries = [(rng.uniform(25, 49), rng.uniform(-124, -67)) if i % 2 else
+               (rng.gauss(lat, 0.2), rng.gauss(lng, 0.2))
+               for i, (lat, lng) in enumerate(rng.choice(CITIES) for _ in range(args.queries))]
+
+    lat = np.array([p['lat'] for p in index.records])
+    lng = np.array([p['lng'] for p in index.records])
+
+    def brute_force(qlat, qlng):
+        distances = haversine_miles(qlat, qlng, lat, lng)
+        return np.sort(distances[np.argpartition(distances, args.k - 1)[:args.k]])
+
+    mismatches = sum(
+        not np.allclose([d for _, d in index.nearest(q[0], q[1], k=args.k)], brute_force(*q))
+        for q in queries[:200]
+    )
+    if mismatches:
+        raise SystemExit(f"❌ {mismatches} queries disagree with the brute-force scan")
+
+    indexed = time_queries(lambda a, b: index.nearest(a, b, k=args.k), queries)
+    filtered = time_queries(lambda a, b: index.nearest(a, b, k=args.k, category="Healthcare"), queries)
+    scanned = time_queries(brute_force, queries)
+
+    print(f"📍 Spatial index benchmark ({len(index)} points, {len(queries)} queries, k={args.k})")
+    print("-" * 64)
+    print(f"Index build:          {build_time * 1000:8.1f} ms")
+    for name, latencies in (("KD-tree kNN", indexed), ("KD-tree kNN+category", filtered),
+                            ("Brute-force scan", scanned)):
+        print(f"{name:22s} p50 {percentile(latencies, 50) * 1e6:8.1f} µs   "
+              f"p99 {percentile(latencies, 99) * 1e6:8.1f} µs")
+    print("✅ Results match the brute-force scan")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Bounded per-call conversation state for the Anthony voice persona.
+
+Each Retell call carries a small state dict (current step, language, what
+the caller has told us so far). A store keeps these dicts keyed by call ID
+and bounds them two ways: a call untouched for ttl_seconds expires, and once
+more than max_calls are held the least recently used are evicted. Calls that
+end normally are removed explicitly with delete().
+
+Backends:
+- MemoryCallStateStore: an LRU dict in this process (the default)
+- SQLiteCallStateStore: a WAL-mode SQLite file that several worker
+  processes can share, so any worker can serve any turn of a call
+
+Usage:
+    python call_state.py stats [--path call_state.db]
+    python call_state.py purge [--path call_state.db]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_STATE_PATH = os.environ.get(
+    'CALL_STATE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'call_state.db')
+)
+DEFAULT_TTL_SECONDS = float(os.environ.get('CALL_STATE_TTL_SECONDS', 2 * 3600))
+DEFAULT_MAX_CALLS = int(os.environ.get('CALL_STATE_MAX_CALLS', 10000))
+
+
+class CallStateStore(ABC):
+    """Interface for call-state backends; states must be JSON-serializable dicts"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_calls: int = DEFAULT_MAX_CALLS):
+        if max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.max_calls = max_calls
+        self.expired = 0
+        self.evicted = 0
+        self.deleted = 0
+
+    @abstractmethod
+    def get(self, call_id: str) -> Optional[Dict]:
+        """The call's state, or None if it is unknown or expired"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, call_id: str, state: Dict):
+        """Save the call's state and mark it recently used"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, call_id: str) -> bool:
+        """Forget a call; True if it was stored"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {
+            'backend': type(self).__name__,
+            'calls': len(self),
+            'max_calls': self.max_calls,
+            'ttl_seconds': self.ttl_seconds,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'deleted': self.deleted,
+        }
+
+    def after_fork(self):
+        """Called in each worker process forked from a master that created the store"""
+
+    def close(self):
+        pass
+
+
+class MemoryCallStateStore(CallStateStore):
+    """In-process store; get() returns the stored dict itself, so edits need no copy"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_calls: int = DEFAULT_MAX_CALLS,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(ttl_seconds, max_calls)
+        self.clock = clock
+        self._lock = threading.Lock()
+        # call_id -> (last used, state), least recently used first
+        self._states: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _sweep(self, now: float):
+        """Drop expired calls from the old end, then anything over max_calls"""
+        while self._states:
+            oldest, (last_used, _) = next(iter(self._states.items()))
+            if now - last_used > self.ttl_seconds:
+                self.expired += 1
+            elif len(self._states) > self.max_calls:
+                self.evicted += 1
+            else:
+                break
+            del self._states[oldest]
+
+    def get(self, call_id: str) -> Optional[Dict]:
+        now = self.clock()
+        with self._lock:
+            entry = self._states.get(call_id)
+            if entry is None:
+                return None
+            if now - entry[0] > self.ttl_seconds:
+                del self._states[call_id]
+                self.expired += 1
+                return None
+            return entry[1]
+
+    def put(self, call_id: str, state: Dict):
+        now = self.clock()
+        with self._lock:
+            self._states[call_id] = (now, state)
+            self._states.move_to_end(call_id)
+            self._sweep(now)
+
+    def delete(self, call_id: str) -> bool:
+        with self._lock:
+            removed = self._states.pop(call_id, None) is not None
+            self.deleted += removed
+            return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
+
+    def after_fork(self):
+        # Each worker keeps its own copy of the states; only the lock needs renewing
+        self._lock = threading.Lock()
+
+
+class SQLiteCallStateStore(CallStateStore):
+    """Store shared by every process that opens the same SQLite file"""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_calls: int = DEFAULT_MAX_CALLS, sweep_every: int = 256,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(ttl_seconds, max_calls)
+        self.path = path
+        # Expired and over-limit rows are purged once every sweep_every writes
+        self.sweep_every = sweep_every
+        self.clock = clock
+        self._writes = 0
+        self._open()
+
+    def _open(self):
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS call_states ("
+            " call_id TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS call_states_updated ON call_states (updated_at)")
+        self._conn.commit()
+
+    def after_fork(self):
+        # SQLite connections must not be shared across fork()
+        self._open()
+
+    def get(self, call_id: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, updated_at FROM call_states WHERE call_id = ?", (call_id,)
+            ).fetchone()
+        if row is None or self.clock() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, call_id: str, state: Dict):
+        payload = json.dumps(state, ensure_ascii=False, separators=(',', ':'))
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO call_states (call_id, state, updated_at) VALUES (?, ?, ?)",
+                (call_id, payload, self.clock())
+            )
+            self._conn.commit()
+            self._writes += 1
+            sweep = self._writes % self.sweep_every == 0
+        if sweep:
+            self.purge()
+
+    def delete(self, call_id: str) -> bool:
+        with self._db_lock:
+            cursor = self._conn.execute("DELETE FROM call_states WHERE call_id = ?", (call_id,))
+            self._conn.commit()
+        self.deleted += cursor.rowcount
+        return cursor.rowcount > 0
+
+    def purge(self) -> int:
+        """Delete expired calls and the least recently used beyond max_calls"""
+        with self._db_lock:
+            expired = self._conn.execute(
+                "DELETE FROM call_states WHERE updated_at < ?", (self.clock() - self.ttl_seconds,)
+            ).rowcount
+            evicted = self._conn.execute(
+                "DELETE FROM call_states WHERE call_id IN ("
+                " SELECT call_id FROM call_states ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_calls,)
+            ).rowcount
+            self._conn.commit()
+        self.expired += expired
+        self.evicted += evicted
+        return expired + evicted
+
+    def __len__(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM call_states").fetchone()[0]
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+
+def create_call_state_store(backend: Optional[str] = None, **kwargs) -> CallStateStore:
+    """Store for CALL_STATE_BACKEND ('memory' or 'sqlite'); kwargs go to its constructor"""
+    backend = (backend or os.environ.get('CALL_STATE_BACKEND', 'memory')).lower()
+    if backend == 'memory':
+        return MemoryCallStateStore(**kwargs)
+    if backend == 'sqlite':
+        return SQLiteCallStateStore(**kwargs)
+    raise ValueError(f"Unknown call state backend: {backend!r} (expected 'memory' or 'sqlite')")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the shared SQLite call-state store")
+    parser.add_argument('command', choices=['stats', 'purge'])
+    parser.add_argument('--path', default=DEFAULT_STATE_PATH, help='SQLite call-state file')
+    args = parser.parse_args()
+
+    store = SQLiteCallStateStore(path=args.path)
+    if args.command == 'purge':
+        print(f"🧹 Removed {store.purge()} expired or over-limit calls")
+    print(f"📞 {len(store)} calls in {args.path}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Compiled keyword index for the built-in resource catalogs.
+
+The tool functions in Untapped_Resource_Agent.py match a query against
+category names by checking whether any word of the category name appears
+as a substring of the lowercased query. CategoryIndex compiles those words
+into an Aho-Corasick automaton once, so a lookup is a single pass over the
+query, and pre-renders the numbered result text for every combination of
+matched categories.
+"""
+
+from collections import deque
+from typing import Dict, List, Sequence
+
+
+class CategoryIndex:
+    """Single-pass multi-pattern matcher over a category -> resources catalog."""
+
+    def __init__(self, categories: Dict[str, List[str]], fallback: Sequence[str],
+                 header: str, limit: int = 10):
+        self.categories = list(categories)
+        self.header = header
+        self.limit = limit
+        self.fallback = list(fallback)
+
+        # Lines are pre-formatted once; category order is preserved by bit position
+        self._lines = [
+            [f"{category.title()} - {r}" for r in categories[category]]
+            for category in self.categories
+        ]
+        self._results: Dict[int, str] = {}
+        self._build_automaton()
+
+    def _build_automaton(self):
+        """Build the goto/fail/output tables and flatten them into a DFA"""
+        goto: List[Dict[str, int]] = [{}]
+        output = [0]
+
+        for bit, category in enumerate(self.categories):
+            for keyword in category.split():
+                state = 0
+                for ch in keyword:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        goto.append({})
+                        output.append(0)
+                        nxt = len(goto) - 1
+                        goto[state][ch] = nxt
+                    state = nxt
+                output[state] |= 1 << bit
+
+        # Breadth-first pass: resolve failure links and fold them into the
+        # transition table so matching never has to follow a fail chain
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._output = output
+
+    def match_mask(self, query: str) -> int:
+        """Return a bitmask of the categories matched by the query"""
+        delta = self._delta
+        output = self._output
+        state = 0
+        mask = 0
+        for ch in query.lower():
+            state = delta[state].get(ch, 0)
+            mask |= output[state]
+        return mask
+
+    def match(self, query: str) -> List[str]:
+        """Return the names of the categories matched by the query"""
+        mask = self.match_mask(query)
+        return [c for bit, c in enumerate(self.categories) if mask >> bit & 1]
+
+    def search(self, query: str) -> str:
+        """Return the formatted, numbered resource list for the query"""
+        mask = self.match_mask(query)
+        result = self._results.get(mask)
+        if result is None:
+            result = self._render(mask)
+            self._results[mask] = result
+        return result
+
+    def _render(self, mask: int) -> str:
+        matched = []
+        for bit, lines in enumerate(self._lines):
+            if mask >> bit & 1:
+                matched.extend(lines)
+        if not matched:
+            matched = self.fallback
+
+        result = self.header
+        result += "\n".join(f"{i+1}. {r}" for i, r in enumerate(matched[:self.limit]))
+        return result
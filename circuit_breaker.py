@@ -0,0 +1,205 @@
+"""
+Latency-aware circuit breakers for the agent's network dependencies.
+
+A slow Groq or SerpAPI backend is worse than a failing one: every request
+thread that reaches it waits out the full call. CircuitBreaker watches the
+outcome of recent calls to one dependency and trips when too many of them
+failed, timed out or ran slower than a latency threshold:
+
+- closed: calls go through; each outcome is recorded in a sliding window
+- open: calls are rejected immediately for reset_timeout seconds
+- half-open: a limited number of probe calls go through; a fast success
+  closes the breaker, a failure or slow call opens it again
+
+Callers either wrap a call with call() (which can also enforce a hard
+timeout by running it on a worker thread), or check allow() and report the
+outcome themselves with record() when the call happens somewhere they do not
+control, such as inside the LangGraph agent loop.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised by CircuitBreaker.call while the breaker rejects calls"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Sliding-window breaker that counts errors and slow calls as failures"""
+
+    def __init__(self, name: str, slow_call_seconds: float = 5.0, failure_rate: float = 0.5,
+                 window_size: int = 20, minimum_calls: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, timeout: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if minimum_calls < 1 or window_size < minimum_calls:
+            raise ValueError("window_size must be at least minimum_calls, which must be at least 1")
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        # Hard limit for call(); None runs the function on the caller's thread
+        self.timeout = timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=window_size)   # True for each failed or slow call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes: deque = deque()               # start times of in-flight half-open probes
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes.clear()
+        return self._state
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self._window.clear()
+        self._probes.clear()
+        self.trips += 1
+
+    def allow(self) -> bool:
+        """
+        True if a call may go ahead now. In half-open state this claims one of
+        the probe slots, so every allowed call must be followed by record().
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # A probe that never reported back must not block probing forever
+                now = self.clock()
+                while self._probes and now - self._probes[0] >= self.reset_timeout:
+                    self._probes.popleft()
+                if len(self._probes) < self.half_open_max_calls:
+                    self._probes.append(now)
+                    return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker starts letting probes through"""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(self.reset_timeout - (self.clock() - self._opened_at), 0.0)
+
+    def record(self, seconds: float, error: bool = False):
+        """Report the outcome of a call that allow() let through"""
+        slow = seconds >= self.slow_call_seconds
+        failed = error or slow
+        with self._lock:
+            self.calls += 1
+            self.failures += error
+            self.slow_calls += slow and not error
+            state = self._current_state()
+            if state == HALF_OPEN:
+                if self._probes:
+                    self._probes.popleft()
+                if failed:
+                    self._trip()
+                else:
+                    self._state = CLOSED
+                    self._window.clear()
+            elif state == CLOSED:
+                self._window.append(failed)
+                if (len(self._window) >= self.minimum_calls
+                        and sum(self._window) >= self.failure_rate * len(self._window)):
+                    self._trip()
+            # Late results from calls started before the breaker opened are only counted
+
+    def record_timeout(self, seconds: float):
+        """Report a call that allow() let through and that the caller stopped waiting for"""
+        with self._lock:
+            self.timeouts += 1
+        self.record(seconds, error=True)
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Run func through the breaker. Raises CircuitOpenError without calling
+        it while open, and TimeoutError if it outlives self.timeout (the call
+        keeps running on its worker thread, but the caller stops waiting).
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        start = time.perf_counter()
+        try:
+            if self.timeout is None:
+                result = func(*args, **kwargs)
+            else:
+                future = self._pool().submit(func, *args, **kwargs)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise TimeoutError(f"{self.name} did not respond within {self.timeout:.1f}s") from None
+        except BaseException:
+            self.record(time.perf_counter() - start, error=True)
+            raise
+        self.record(time.perf_counter() - start)
+        return result
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix=f"breaker-{self.name}")
+        return self._executor
+
+    def reset(self):
+        """Close the breaker and forget recent outcomes (counters are kept)"""
+        with self._lock:
+            self._state = CLOSED
+            self._window.clear()
+            self._probes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'trips': self.trips,
+                'calls': self.calls,
+                'failures': self.failures,
+                'slow_calls': self.slow_calls,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+                'recent_failure_rate': sum(self._window) / len(self._window) if self._window else 0.0,
+                'retry_after': (max(self.reset_timeout - (self.clock() - self._opened_at), 0.0)
+                                if state == OPEN else 0.0),
+            }
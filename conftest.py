@@ -0,0 +1,30 @@
+"""
+Shared pytest setup. Nothing a test run opens lives in the source tree:
+tests that need call analytics give CallAnalytics a tmp_path (the app's own
+recorder is disabled), and agents from make_agent keep their search cache
+under tmp_path.
+"""
+
+import os
+
+import pytest
+
+os.environ['CALL_ANALYTICS_PATH'] = ''
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    """ResourceAgent factory; each agent gets its own search cache under tmp_path"""
+    from Untapped_Resource_Agent import ResourceAgent
+
+    agents = []
+
+    def make(**kwargs):
+        kwargs.setdefault('search_cache_path', str(tmp_path / f"search-{len(agents)}.db"))
+        agent = ResourceAgent(**kwargs)
+        agents.append(agent)
+        return agent
+
+    yield make
+    for agent in agents:
+        agent.close()
@@ -0,0 +1,259 @@
+"""
+Bounded multi-turn memory for ResourceAgent.
+
+Conversation history is kept per session in a LangGraph checkpointer keyed
+by session (or call) ID. Before every model call, ConversationMemory checks
+the stored history against a token budget; once it is exceeded, older turns
+are folded into a single running-summary message and only the most recent
+turns are kept verbatim, so the prompt stays roughly the same size however
+long a chat runs. Sessions that go idle are evicted from the checkpointer,
+both when another session becomes active and by a background sweep.
+
+Turns answered without the model (answer cache, fast path) are held as
+pending turns and handed to the graph with the next model turn, so recording
+them never builds the agent.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+SUMMARY_MESSAGE_ID = "conversation-summary"
+
+SUMMARY_PROMPT = (
+    "Summarize this conversation between a caller and a benefits assistant for the "
+    "assistant's own reference. Keep the caller's needs, location, household, income, "
+    "programs already suggested and anything still unresolved. Use at most {max_words} words."
+)
+
+
+class ConversationMemory:
+    """Checkpointer-backed session memory with summarizing compaction"""
+
+    def __init__(self, token_budget: int = 2000, keep_recent_tokens: int = 800,
+                 summary_max_words: int = 120, idle_ttl_seconds: float = 1800.0,
+                 max_sessions: int = 10000, sweep_interval_seconds: float = 60.0,
+                 checkpointer=None, token_counter: Optional[Callable[[List], int]] = None):
+        if keep_recent_tokens >= token_budget:
+            raise ValueError("keep_recent_tokens must be smaller than token_budget")
+        self.token_budget = token_budget
+        self.keep_recent_tokens = keep_recent_tokens
+        self.summary_max_words = summary_max_words
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._checkpointer = checkpointer
+        self._token_counter = token_counter
+        # Chat model used to write summaries; ResourceAgent sets it when the graph is built
+        self.summarizer = None
+
+        self._lock = threading.Lock()
+        # session_id -> last used (monotonic), oldest first
+        self._sessions: "OrderedDict[str, float]" = OrderedDict()
+        # session_id -> (role, content) turns not yet written to the checkpointer
+        self._pending: Dict[str, List[Tuple[str, str]]] = {}
+        # Started on the first session, so a preloading master forks before any thread exists
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.compactions = 0
+        self.evictions = 0
+
+    @property
+    def checkpointer(self):
+        if self._checkpointer is None:
+            from langgraph.checkpoint.memory import InMemorySaver
+            self._checkpointer = InMemorySaver()
+        return self._checkpointer
+
+    def count_tokens(self, messages: List) -> int:
+        if self._token_counter is None:
+            from langchain_core.messages.utils import count_tokens_approximately
+            self._token_counter = count_tokens_approximately
+        return self._token_counter(messages)
+
+    @staticmethod
+    def config_for(session_id: str) -> Dict:
+        return {"configurable": {"thread_id": session_id}}
+
+    def touch(self, session_id: str):
+        """Mark a session as active and evict sessions that have gone idle"""
+        with self._lock:
+            self._sessions[session_id] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            if self._sweeper is None and self.sweep_interval_seconds > 0:
+                self._sweeper = threading.Thread(target=self._sweep_loop,
+                                                 name='conversation-sweep', daemon=True)
+                self._sweeper.start()
+        self.sweep()
+
+    def sweep(self) -> int:
+        """Evict sessions idle past the TTL (and the oldest beyond max_sessions); returns how many"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._sessions:
+                oldest, last_used = next(iter(self._sessions.items()))
+                if now - last_used <= self.idle_ttl_seconds and len(self._sessions) <= self.max_sessions:
+                    break
+                del self._sessions[oldest]
+                self._pending.pop(oldest, None)
+                expired.append(oldest)
+        for stale in expired:
+            self._delete(stale)
+        return len(expired)
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception:
+                # A failed sweep is retried on the next tick or touch
+                pass
+
+    def after_fork(self):
+        """Forget the parent's sweeper; threads do not survive fork()"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+
+    def close(self):
+        self._stop.set()
+
+    def end_session(self, session_id: str):
+        """Drop a session's history immediately (e.g. when a call ends)"""
+        with self._lock:
+            known = self._sessions.pop(session_id, None) is not None
+            self._pending.pop(session_id, None)
+        if known:
+            self._delete(session_id)
+
+    def _delete(self, session_id: str):
+        if self._checkpointer is not None:
+            self._checkpointer.delete_thread(session_id)
+        with self._lock:
+            self.evictions += 1
+
+    def remember(self, session_id: str, query: str, answer: str):
+        """Record a turn answered without the model; it joins the history on the next model turn"""
+        with self._lock:
+            self._pending.setdefault(session_id, []).extend([("user", query), ("assistant", answer)])
+
+    def turn_input(self, session_id: Optional[str], query: str) -> Dict:
+        """Graph input for a turn: pending turns of the session, then the new query"""
+        with self._lock:
+            pending = self._pending.pop(session_id, []) if session_id is not None else []
+        return {"messages": [*pending, ("user", query)]}
+
+    def has_history(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            if self._pending.get(session_id):
+                return True
+        return self.checkpointer.get_tuple(self.config_for(session_id)) is not None
+
+    def pre_model_hook(self, state: Dict) -> Dict:
+        """LangGraph pre-model hook: compact the stored history once it exceeds the budget"""
+        plan = self._plan_compaction(state["messages"])
+        if plan is None:
+            return {}
+        previous_summary, older, recent = plan
+        transcript = self._transcript(previous_summary, older)
+        summary = None
+        if self.summarizer is not None:
+            try:
+                summary = self.summarizer.invoke(self._summary_prompt(transcript)).content
+            except Exception:
+                # Fall back to the extractive summary; memory must never fail a turn
+                pass
+        return self._compacted(transcript, summary, recent)
+
+    async def apre_model_hook(self, state: Dict) -> Dict:
+        """pre_model_hook for ainvoke/astream: summarizes without blocking the event loop"""
+        plan = self._plan_compaction(state["messages"])
+        if plan is None:
+            return {}
+        previous_summary, older, recent = plan
+        transcript = self._transcript(previous_summary, older)
+        summary = None
+        if self.summarizer is not None:
+            try:
+                summary = (await self.summarizer.ainvoke(self._summary_prompt(transcript))).content
+            except Exception:
+                pass
+        return self._compacted(transcript, summary, recent)
+
+    def _plan_compaction(self, messages: List):
+        """(previous summary, turns to fold, turns to keep), or None while within budget"""
+        if self.count_tokens(messages) <= self.token_budget:
+            return None
+
+        from langchain_core.messages import HumanMessage
+
+        previous_summary = None
+        if messages and getattr(messages[0], "id", None) == SUMMARY_MESSAGE_ID:
+            previous_summary = messages[0].content
+            messages = messages[1:]
+
+        # Keep whole recent turns (a turn starts at a human message, so tool calls
+        # are never separated from their results), always including the current one
+        split = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            if not isinstance(messages[i], HumanMessage):
+                continue
+            if split < len(messages) and self.count_tokens(messages[i:]) > self.keep_recent_tokens:
+                break
+            split = i
+        older, recent = messages[:split], messages[split:]
+        if not older or not recent:
+            return None
+        return previous_summary, older, recent
+
+    @staticmethod
+    def _transcript(previous_summary: Optional[str], messages: List) -> List[str]:
+        transcript = []
+        if previous_summary:
+            transcript.append(previous_summary)
+        for message in messages:
+            if message.type in ("human", "ai") and isinstance(message.content, str) and message.content:
+                speaker = "Caller" if message.type == "human" else "Assistant"
+                transcript.append(f"{speaker}: {message.content}")
+        return transcript
+
+    def _summary_prompt(self, transcript: List[str]) -> List:
+        prompt = SUMMARY_PROMPT.format(max_words=self.summary_max_words)
+        return [("system", prompt), ("user", "\n".join(transcript))]
+
+    def _compacted(self, transcript: List[str], summary: Optional[str], recent: List) -> Dict:
+        """State update replacing the history with the summary and the recent turns"""
+        from langchain_core.messages import RemoveMessage, SystemMessage
+        from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+        if not summary:
+            summary = " ".join(line for line in transcript if not line.startswith("Assistant:"))
+        with self._lock:
+            self.compactions += 1
+        return {"messages": [
+            RemoveMessage(id=REMOVE_ALL_MESSAGES),
+            SystemMessage(content=f"Summary of the conversation so far: {self._clip(summary)}",
+                          id=SUMMARY_MESSAGE_ID),
+            *recent,
+        ]}
+
+    def _clip(self, summary: str) -> str:
+        words = summary.split()
+        if len(words) <= self.summary_max_words:
+            return summary.strip()
+        # Keep the most recent part of an over-long summary
+        return "... " + " ".join(words[-self.summary_max_words:])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'pending_turns': sum(len(turns) // 2 for turns in self._pending.values()),
+                'compactions': self.compactions,
+                'evictions': self.evictions,
+                'token_budget': self.token_budget,
+            }
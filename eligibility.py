@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Vectorized eligibility screening.
+
+Program rules are held as compact arrays: an income limit as a percentage
+of the Federal Poverty Level (FPL), age bounds and a minimum number of
+children per program, plus per-state limit columns for the programs whose
+thresholds states set themselves (broad-based SNAP eligibility, Medicaid
+expansion, CHIP). Screening a caller and screening a million historical
+profiles are the same NumPy expression over (profiles x programs).
+
+The limits are 2024 federal figures and common state settings; they say who
+*likely* qualifies and are no substitute for the program's own application.
+
+Back-test a rule change against past callers (JSONL with age, income,
+household_size, state, children per line):
+
+    python eligibility.py profiles.jsonl [--rules proposed_rules.json]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# NumPy is imported on first use so importing the Flask app stays fast
+np = None
+
+# 2024 HHS poverty guidelines: (first person, each additional person)
+FPL_GUIDELINES = {
+    'default': (15060, 5380),
+    'AK': (18810, 6730),
+    'HI': (17310, 6190),
+}
+
+# max_fpl is the gross income limit in percent of FPL (inf = no income test)
+PROGRAMS = [
+    {'name': 'SNAP (Food Stamps)', 'need': 'food', 'max_fpl': 130,
+     'description': 'Monthly money for groceries on an EBT card.',
+     'link': 'https://www.fns.usda.gov/snap/state-directory'},
+    {'name': 'WIC', 'need': 'food', 'max_fpl': 185, 'min_children': 1,
+     'description': 'Healthy food and nutrition support for young children and parents.',
+     'link': 'https://www.fns.usda.gov/wic'},
+    {'name': 'LIHEAP (Energy Bill Help)', 'need': 'energy', 'max_fpl': 150,
+     'description': 'Helps pay heating or cooling bills.',
+     'link': 'https://www.acf.hhs.gov/ocs/energy-assistance',
+     'requirements': 'photo ID, proof of address, recent bill, income proof'},
+    {'name': 'Weatherization Assistance', 'need': 'energy', 'max_fpl': 200,
+     'description': 'Free home repairs that lower energy bills.',
+     'link': 'https://www.energy.gov/scep/wap/weatherization-assistance-program'},
+    {'name': 'Lifeline Phone and Internet Discount', 'need': 'money', 'max_fpl': 135,
+     'description': 'A monthly discount on phone or internet service.',
+     'link': 'https://www.lifelinesupport.org'},
+    # Roughly 50% of area median income; the local housing agency has the exact limit
+    {'name': 'Housing Choice Voucher (Section 8)', 'need': 'housing', 'max_fpl': 200,
+     'description': 'Helps pay rent for a home you choose.',
+     'link': 'https://www.hud.gov/topics/housing_choice_voucher_program_section_8'},
+    {'name': 'TANF (Cash Assistance)', 'need': 'money', 'max_fpl': 50, 'min_children': 1,
+     'description': 'Monthly cash help for families with children.',
+     'link': 'https://www.acf.hhs.gov/ofa/map/about/help-families'},
+    {'name': 'SSI', 'need': 'money', 'max_fpl': 75, 'min_age': 65,
+     'description': 'Monthly payments for older adults with little income.',
+     'link': 'https://www.ssa.gov/ssi'},
+    {'name': 'Medicaid', 'need': 'health', 'max_fpl': 138, 'min_age': 19, 'max_age': 64,
+     'description': 'Free or low-cost health coverage.',
+     'link': 'https://www.medicaid.gov/about-us/where-can-people-get-help-medicaid-chip'},
+    {'name': "CHIP (Children's Health Insurance)", 'need': 'health', 'max_fpl': 200, 'min_children': 1,
+     'description': 'Low-cost health coverage for your children.',
+     'link': 'https://www.insurekidsnow.gov'},
+    {'name': 'Medicare', 'need': 'health', 'max_fpl': math.inf, 'min_age': 65,
+     'description': 'Federal health insurance for people 65 and older.',
+     'link': 'https://www.medicare.gov'},
+    {'name': 'Unemployment Insurance', 'need': 'employment', 'max_fpl': math.inf,
+     'description': 'Temporary income if you lost your job through no fault of your own.',
+     'link': 'https://www.careeronestop.org/LocalHelp/UnemploymentBenefits/find-unemployment-benefits.aspx'},
+]
+
+# program -> {state: income limit in % FPL}; nan means the program is not offered there
+STATE_OVERRIDES = {
+    # Broad-based categorical eligibility raises the SNAP gross income limit
+    'SNAP (Food Stamps)': {
+        'CA': 200, 'CO': 200, 'CT': 200, 'DC': 200, 'DE': 200, 'MA': 200, 'MD': 200,
+        'ME': 200, 'MN': 165, 'NJ': 185, 'NM': 200, 'NV': 200, 'NY': 200, 'OR': 200,
+        'RI': 185, 'VT': 185, 'WA': 200, 'WI': 200,
+    },
+    # States that have not expanded Medicaid to low-income adults
+    'Medicaid': {
+        'AL': math.nan, 'FL': math.nan, 'GA': math.nan, 'KS': math.nan, 'MS': math.nan,
+        'SC': math.nan, 'TN': math.nan, 'TX': math.nan, 'WI': 100, 'WY': math.nan,
+    },
+    "CHIP (Children's Health Insurance)": {
+        'NY': 400, 'NJ': 350, 'DC': 319, 'MD': 317, 'CT': 318, 'MA': 300, 'VT': 312,
+    },
+}
+
+STATE_CODES = {
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR', 'california': 'CA',
+    'colorado': 'CO', 'connecticut': 'CT', 'delaware': 'DE', 'district of columbia': 'DC',
+    'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID', 'illinois': 'IL',
+    'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS', 'kentucky': 'KY', 'louisiana': 'LA',
+    'maine': 'ME', 'maryland': 'MD', 'massachusetts': 'MA', 'michigan': 'MI', 'minnesota': 'MN',
+    'mississippi': 'MS', 'missouri': 'MO', 'montana': 'MT', 'nebraska': 'NE', 'nevada': 'NV',
+    'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM', 'new york': 'NY',
+    'north carolina': 'NC', 'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK', 'oregon': 'OR',
+    'pennsylvania': 'PA', 'rhode island': 'RI', 'south carolina': 'SC', 'south dakota': 'SD',
+    'tennessee': 'TN', 'texas': 'TX', 'utah': 'UT', 'vermont': 'VT', 'virginia': 'VA',
+    'washington': 'WA', 'west virginia': 'WV', 'wisconsin': 'WI', 'wyoming': 'WY',
+}
+
+_STATE_NAME = re.compile(r"\b(" + "|".join(sorted(STATE_CODES, key=len, reverse=True)) + r")\b")
+# A bare two-letter code is only a state in a location context ("Atlanta, GA", "GA 30303");
+# elsewhere "OK", "IN" and "ME" are ordinary words
+_CODES = "|".join(sorted(STATE_CODES.values()))
+_STATE_CODE = re.compile(r"(?:^|,)\s*(" + _CODES + r")\s*(?:$|,|\d{5})|\b(" + _CODES + r")\s+\d{5}\b")
+_ZIP_CODE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+# First three ZIP digits -> state, as (first prefix, last prefix, state) ranges
+ZIP_PREFIXES = [
+    (5, 5, 'NY'), (10, 27, 'MA'), (28, 29, 'RI'), (30, 38, 'NH'), (39, 49, 'ME'),
+    (50, 54, 'VT'), (55, 55, 'MA'), (56, 59, 'VT'), (60, 69, 'CT'), (70, 89, 'NJ'),
+    (100, 149, 'NY'), (150, 196, 'PA'), (197, 199, 'DE'), (200, 200, 'DC'), (201, 201, 'VA'),
+    (202, 205, 'DC'), (206, 219, 'MD'), (220, 246, 'VA'), (247, 268, 'WV'), (270, 289, 'NC'),
+    (290, 299, 'SC'), (300, 319, 'GA'), (320, 349, 'FL'), (350, 369, 'AL'), (370, 385, 'TN'),
+    (386, 397, 'MS'), (398, 399, 'GA'), (400, 427, 'KY'), (430, 459, 'OH'), (460, 479, 'IN'),
+    (480, 499, 'MI'), (500, 528, 'IA'), (530, 549, 'WI'), (550, 567, 'MN'), (569, 569, 'DC'),
+    (570, 577, 'SD'), (580, 588, 'ND'), (590, 599, 'MT'), (600, 629, 'IL'), (630, 658, 'MO'),
+    (660, 679, 'KS'), (680, 693, 'NE'), (700, 714, 'LA'), (716, 729, 'AR'), (730, 732, 'OK'),
+    (733, 733, 'TX'), (734, 749, 'OK'), (750, 799, 'TX'), (800, 816, 'CO'), (820, 831, 'WY'),
+    (832, 838, 'ID'), (840, 847, 'UT'), (850, 865, 'AZ'), (870, 884, 'NM'), (885, 885, 'TX'),
+    (889, 898, 'NV'), (900, 961, 'CA'), (967, 968, 'HI'), (970, 979, 'OR'), (980, 994, 'WA'),
+    (995, 999, 'AK'),
+]
+_ZIP_STARTS = [start for start, _, _ in ZIP_PREFIXES]
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def state_from_zip(zip_code: str) -> Optional[str]:
+    """State of a five-digit ZIP code by its first three digits; None for territories and military mail"""
+    prefix = int(zip_code[:3])
+    i = bisect.bisect_right(_ZIP_STARTS, prefix) - 1
+    if i >= 0 and prefix <= ZIP_PREFIXES[i][1]:
+        return ZIP_PREFIXES[i][2]
+    return None
+
+
+def state_from_location(text: str, allow_zip: bool = True) -> Optional[str]:
+    """
+    Two-letter state code from free text like "Atlanta, GA", "new york city" or
+    "30303". Pass allow_zip=False for text that may hold other five-digit
+    numbers, such as an income.
+    """
+    if not text:
+        return None
+    match = _STATE_NAME.search(text.lower())
+    if match:
+        return STATE_CODES[match.group(1)]
+    match = _STATE_CODE.search(text)
+    if match:
+        return match.group(1) or match.group(2)
+    match = _ZIP_CODE.search(text) if allow_zip else None
+    return state_from_zip(match.group(1)) if match else None
+
+
+class ProgramShortlist:
+    """
+    Programs a caller is not ruled out of by state, household or children,
+    each with its age bounds and income limit. refine() finishes the screen
+    once age and income are known, with a handful of float comparisons.
+    """
+
+    def __init__(self, candidates: List[Tuple[Dict, float, float, float]], guideline: float):
+        # (program, income limit in % FPL, min age, max age), in catalog order
+        self.candidates = candidates
+        # Poverty guideline in dollars for the household
+        self.guideline = guideline
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def refine(self, age: Optional[float] = None, income: Optional[float] = None) -> List[Dict]:
+        """The programs EligibilityEngine.screen() would return for this age and income"""
+        # Same expression as fpl_percent(), so limits compare exactly as in screen_batch()
+        percent = None if income is None else 100.0 * float(income) / self.guideline
+        return [program for program, max_fpl, min_age, max_age in self.candidates
+                if (percent is None or percent <= max_fpl)
+                and (age is None or min_age <= age <= max_age)]
+
+
+class EligibilityEngine:
+    """Screens caller profiles against program rules compiled into NumPy arrays"""
+
+    def __init__(self, programs: Sequence[Dict] = PROGRAMS,
+                 state_overrides: Dict[str, Dict[str, float]] = STATE_OVERRIDES):
+        self.programs = list(programs)
+        self.state_overrides = state_overrides
+        names = {p['name'] for p in self.programs}
+        unknown = set(state_overrides) - names
+        if unknown:
+            raise ValueError(f"State overrides reference unknown programs: {sorted(unknown)}")
+        # Row 0 of the state tables is "state unknown": federal defaults
+        self._states = {code: row for row, code in enumerate(sorted(STATE_CODES.values()), 1)}
+        self._state_lookup = dict(self._states, **{code.lower(): row for code, row in self._states.items()})
+        self._lock = threading.Lock()
+        self._arrays = None
+
+    def _compile(self) -> Dict:
+        np = _load_numpy()
+        n_states = len(self._states) + 1
+        max_fpl = np.array([float(p['max_fpl']) for p in self.programs])
+        # Only programs with state overrides get a per-state column of limits
+        override_limits = {}
+        for column, program in enumerate(self.programs):
+            overrides = self.state_overrides.get(program['name'])
+            if overrides:
+                limits = np.full(n_states, max_fpl[column])
+                for state, limit in overrides.items():
+                    limits[self._states[state]] = limit
+                override_limits[column] = limits
+
+        base = np.full(n_states, FPL_GUIDELINES['default'][0], dtype=np.float64)
+        extra = np.full(n_states, FPL_GUIDELINES['default'][1], dtype=np.float64)
+        for state, (first, additional) in FPL_GUIDELINES.items():
+            if state != 'default':
+                base[self._states[state]], extra[self._states[state]] = first, additional
+        return {
+            'max_fpl': max_fpl,
+            'override_limits': override_limits,
+            'min_age': np.array([p.get('min_age', 0) for p in self.programs], dtype=np.float64),
+            'max_age': np.array([p.get('max_age', math.inf) for p in self.programs], dtype=np.float64),
+            'min_children': np.array([p.get('min_children', 0) for p in self.programs], dtype=np.float64),
+            'fpl_base': base,
+            'fpl_extra': extra,
+        }
+
+    def _compiled(self) -> Dict:
+        if self._arrays is None:
+            with self._lock:
+                if self._arrays is None:
+                    self._arrays = self._compile()
+        return self._arrays
+
+    def state_rows(self, states: Sequence[Optional[str]]):
+        """Row index per two-letter state code (0 for unknown or missing)"""
+        np = _load_numpy()
+        lookup = self._state_lookup
+        return np.fromiter((lookup.get(state, 0) for state in states), dtype=np.int64, count=len(states))
+
+    def fpl_percent(self, incomes, household_sizes, state_rows):
+        """Annual income as a percentage of the poverty guideline for each household"""
+        np = _load_numpy()
+        arrays = self._compiled()
+        sizes = np.maximum(np.asarray(household_sizes, dtype=np.float64), 1)
+        guideline = arrays['fpl_base'][state_rows] + arrays['fpl_extra'][state_rows] * (sizes - 1)
+        return 100.0 * np.asarray(incomes, dtype=np.float64) / guideline
+
+    def screen_batch(self, ages, incomes, household_sizes=None, states=None, children=None):
+        """
+        Boolean (profiles x programs) matrix of likely eligibility.
+
+        ages and incomes may contain NaN for "not asked"; an unknown value
+        does not rule a program out. states are two-letter codes or None.
+        """
+        np = _load_numpy()
+        arrays = self._compiled()
+        ages = np.asarray(ages, dtype=np.float64)
+        incomes = np.asarray(incomes, dtype=np.float64)
+        n = len(incomes)
+        household_sizes = np.ones(n) if household_sizes is None else household_sizes
+        children = np.zeros(n) if children is None else np.asarray(children, dtype=np.float64)
+        rows = np.zeros(n, dtype=np.int64) if states is None else self.state_rows(states)
+
+        percent = self.fpl_percent(incomes, household_sizes, rows)
+        unknown_income = np.isnan(percent)
+        # Federal limits broadcast over all programs; overridden programs are then
+        # recomputed column by column, so no (profiles x programs) float array is built
+        eligible = (percent[:, None] <= arrays['max_fpl']) | unknown_income[:, None]
+        for column, limits in arrays['override_limits'].items():
+            limit = limits[rows]
+            eligible[:, column] = (percent <= limit) | (unknown_income & ~np.isnan(limit))
+
+        age = ages[:, None]
+        eligible &= np.isnan(age) | ((age >= arrays['min_age']) & (age <= arrays['max_age']))
+        eligible &= children[:, None] >= arrays['min_children']
+        return eligible
+
+    def screen(self, age: Optional[float] = None, income: Optional[float] = None,
+               household_size: int = 1, state: Optional[str] = None, children: int = 0) -> List[Dict]:
+        """Programs one caller likely qualifies for, in catalog order"""
+        np = _load_numpy()
+        eligible = self.screen_batch(
+            [np.nan if age is None else age], [np.nan if income is None else income],
+            [household_size], [state], [children])[0]
+        return [self.programs[i] for i in np.flatnonzero(eligible)]
+
+    def prefilter(self, state: Optional[str] = None, household_size: int = 1,
+                  children: int = 0) -> ProgramShortlist:
+        """Screen on everything but age and income, which can be applied later with refine()"""
+        arrays = self._compiled()
+        row = self._state_lookup.get(state, 0)
+        size = float(max(household_size, 1))
+        guideline = float(arrays['fpl_base'][row] + arrays['fpl_extra'][row] * (size - 1))
+        candidates = []
+        for column, program in enumerate(self.programs):
+            limits = arrays['override_limits'].get(column)
+            max_fpl = float(arrays['max_fpl'][column] if limits is None else limits[row])
+            # nan: not offered in this state
+            if math.isnan(max_fpl) or children < arrays['min_children'][column]:
+                continue
+            candidates.append((program, max_fpl, float(arrays['min_age'][column]),
+                               float(arrays['max_age'][column])))
+        return ProgramShortlist(candidates, guideline)
+
+
+def load_profiles(path: str) -> Dict[str, list]:
+    """Column lists from a JSONL file of caller profiles"""
+    columns = {'ages': [], 'incomes': [], 'household_sizes': [], 'states': [], 'children': []}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            columns['ages'].append(math.nan if record.get('age') is None else record['age'])
+            columns['incomes'].append(math.nan if record.get('income') is None else record['income'])
+            columns['household_sizes'].append(record.get('household_size') or 1)
+            columns['states'].append(record.get('state'))
+            columns['children'].append(record.get('children') or 0)
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-test eligibility rules against caller profiles")
+    parser.add_argument('profiles', help='JSONL with age, income, household_size, state, children')
+    parser.add_argument('--rules', help='JSON {"programs": [...], "state_overrides": {...}} to compare')
+    args = parser.parse_args()
+
+    np = _load_numpy()
+    profiles = load_profiles(args.profiles)
+    engine = EligibilityEngine()
+    current = engine.screen_batch(**profiles)
+    print(f"📋 Screened {len(current)} profiles")
+
+    if not args.rules:
+        print(f"{'program':40s} {'eligible':>9} {'share':>7}")
+        for program, count in zip(engine.programs, current.sum(axis=0)):
+            print(f"{program['name']:40s} {count:>9d} {count / max(len(current), 1):>7.1%}")
+        return
+
+    with open(args.rules) as f:
+        rules = json.load(f)
+    proposed_engine = EligibilityEngine(rules.get('programs', PROGRAMS),
+                                        rules.get('state_overrides', STATE_OVERRIDES))
+    proposed = proposed_engine.screen_batch(**profiles)
+    current_by_name = {p['name']: current[:, i] for i, p in enumerate(engine.programs)}
+    print(f"{'program':40s} {'current':>9} {'proposed':>9} {'gained':>8} {'lost':>8}")
+    for i, program in enumerate(proposed_engine.programs):
+        before = current_by_name.get(program['name'], np.zeros(len(proposed), dtype=bool))
+        after = proposed[:, i]
+        print(f"{program['name']:40s} {before.sum():>9d} {after.sum():>9d} "
+              f"{(after & ~before).sum():>8d} {(before & ~after).sum():>8d}")
+
+
+if __name__ == '__main__':
+    main()
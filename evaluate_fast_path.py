@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation for the fast-path router.
+
+Runs a labeled query set through FastPathRouter and reports how much
+traffic bypasses the LLM, how often it bypasses queries that should have
+gone to the model (false bypasses), and whether the detected needs match
+the labels, across a sweep of confidence thresholds.
+
+Labeled input is JSONL with one record per line:
+    {"query": "I need food stamps", "fast_path": true, "needs": ["food"]}
+"fast_path" says whether the catalogs alone answer the query. Without
+--labels a built-in sample of caller queries is used.
+
+With --compare-llm (needs GROQ_API_KEY and SERP_API_KEY) every routed
+query is also sent through the full agent, and the script reports how many
+of the catalog resources in the fast-path answer the agent also mentions.
+
+Usage:
+    python evaluate_fast_path.py [--labels labeled.jsonl] [--threshold 0.75] [--compare-llm]
+"""
+
+import argparse
+import json
+import re
+import time
+
+from Untapped_Resource_Agent import (
+    GOVERNMENT_RESOURCE_CATEGORIES,
+    NONPROFIT_CATEGORIES,
+    financial_info_explainer,
+)
+from fast_path import FastPathRouter
+
+SAMPLE_QUERIES = [
+    ("I need food stamps", True, ["food"]),
+    ("help with rent", True, ["housing"]),
+    ("I'm looking for help paying my electric bill in Georgia", True, ["energy"]),
+    ("my family is hungry", True, ["food"]),
+    ("I need help with my heating bill this winter", True, ["energy"]),
+    ("I lost my job and need food and rent help", True, ["employment", "food", "housing"]),
+    ("can you help me find a doctor", True, ["healthcare"]),
+    ("I need health insurance for my kids", True, ["healthcare"]),
+    ("job training programs in Ohio", True, ["employment"]),
+    ("I'm homeless and need shelter", True, ["housing"]),
+    ("help paying for college", True, ["education"]),
+    ("I need cash assistance", True, ["money"]),
+    ("Explain how a mortgage works", True, ["mortgage"]),
+    ("how do I make a budget", True, ["money"]),
+    ("section 8 housing in new york", True, ["housing"]),
+    ("food bank 30303", True, ["food"]),
+    ("I need help with utilities and groceries", True, ["energy", "food"]),
+    ("what is the latest eligibility for LIHEAP", False, ["energy"]),
+    ("contact details for NYC food banks", False, ["food"]),
+    ("phone number for the Atlanta housing authority", False, ["housing"]),
+    ("when is the deadline to apply for Pell grants", False, ["education"]),
+    ("my landlord is threatening to evict me over mold in the bathroom", False, ["housing"]),
+    ("my SNAP application was denied what do I do", False, ["food"]),
+    ("I need a lawyer for a custody case", False, []),
+    ("where is the nearest food pantry open on Sunday", False, ["food"]),
+    ("can I get Medicaid if I'm undocumented", False, ["healthcare"]),
+    ("I'm a veteran with PTSD looking for counseling", False, ["healthcare"]),
+    ("my car broke down and I can't get to work", False, ["employment"]),
+    ("how do I transfer my EBT card to another state", False, ["food"]),
+    ("is there a program that pays for funeral costs", False, []),
+    ("help with my medical bill", False, ["healthcare"]),
+    ("I dont need food stamps I need housing", False, ["housing"]),
+]
+
+
+def load_labels(path):
+    samples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record['query'], bool(record['fast_path']), record.get('needs', [])))
+    return samples
+
+
+def evaluate(router, samples):
+    """Bypass rate, false bypasses, missed bypasses and need accuracy at router.threshold"""
+    routed = false_bypass = missed = need_matches = 0
+    for query, should_route, needs in samples:
+        confidence, detected = router.score(query)
+        takes_fast_path = confidence >= router.threshold
+        if takes_fast_path:
+            routed += 1
+            if not should_route:
+                false_bypass += 1
+            elif sorted(detected) == sorted(needs):
+                need_matches += 1
+        elif should_route:
+            missed += 1
+    return {
+        'threshold': router.threshold,
+        'bypass_rate': routed / len(samples),
+        'false_bypasses': false_bypass,
+        'missed_bypasses': missed,
+        'need_accuracy': need_matches / max(routed - false_bypass, 1),
+    }
+
+
+def mentioned_resources(answer, resources):
+    """Catalog resources whose leading name appears in an answer"""
+    answer_lower = answer.lower()
+    return [r for r in resources if re.split(r"\s*\(", r)[0].lower() in answer_lower]
+
+
+def compare_with_llm(router, samples):
+    from Untapped_Resource_Agent import ResourceAgent
+
+    agent = ResourceAgent(fast_path=False)
+    print("\n🔁 Comparing fast-path answers with the full agent")
+    for query, _, _ in samples:
+        fast_answer = router.route(query)
+        if fast_answer is None:
+            continue
+        resources = [line[2:] for line in fast_answer.splitlines() if line.startswith("- ")]
+        start = time.perf_counter()
+        llm_answer = agent.find_resources(query, use_cache=False)
+        llm_time = time.perf_counter() - start
+        overlap = mentioned_resources(llm_answer, resources)
+        print(f"  {len(overlap):2d}/{len(resources):2d} shared  LLM {llm_time:5.2f}s  {query}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the fast-path router offline")
+    parser.add_argument('--labels', help='Labeled JSONL file (defaults to the built-in sample)')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Evaluate a single threshold instead of a sweep')
+    parser.add_argument('--compare-llm', action='store_true',
+                        help='Also run routed queries through the full agent')
+    args = parser.parse_args()
+
+    samples = load_labels(args.labels) if args.labels else SAMPLE_QUERIES
+    thresholds = [args.threshold] if args.threshold is not None else [0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 1.0]
+
+    print(f"📊 Fast-path evaluation on {len(samples)} labeled queries")
+    print("-" * 72)
+    print(f"{'threshold':>9}  {'bypass rate':>11}  {'false bypass':>12}  {'missed':>6}  {'need accuracy':>13}")
+    for threshold in thresholds:
+        router = FastPathRouter(GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES,
+                                financial_info_explainer, threshold=threshold)
+        result = evaluate(router, samples)
+        print(f"{result['threshold']:>9.2f}  {result['bypass_rate']:>10.0%}  "
+              f"{result['false_bypasses']:>12d}  {result['missed_bypasses']:>6d}  "
+              f"{result['need_accuracy']:>12.0%}")
+
+    router = FastPathRouter(GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES,
+                            financial_info_explainer,
+                            **({'threshold': args.threshold} if args.threshold is not None else {}))
+    start = time.perf_counter()
+    for query, _, _ in samples:
+        router.route(query)
+    per_query = (time.perf_counter() - start) / len(samples) * 1e6
+    print("-" * 72)
+    print(f"⚡ Routing cost: {per_query:.1f} µs/query at threshold {router.threshold}")
+
+    if args.compare_llm:
+        compare_with_llm(router, samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Deterministic fast path for catalog-answerable queries.
+
+Plain requests like "I need food stamps" or "help with rent" are fully
+answered by the built-in government, nonprofit and financial explainer
+catalogs, yet the ReAct agent still spends one or more Groq round-trips on
+them. FastPathRouter scores a query against a vocabulary of needs that map
+onto catalog entries. When every meaningful word in the query is explained by
+those needs (and nothing asks for current or location-specific details that
+only google_search can provide), it assembles the same structured summary
+the agent prompt asks for without calling the model.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from answer_cache import normalize_query
+
+# need -> vocabulary and the catalog entries that answer it. Catalog entries are
+# (category, resource) pairs; a resource of None means the whole category.
+NEED_PROFILES = {
+    'food': {
+        'terms': ['food', 'food stamps', 'snap', 'ebt', 'groceries', 'grocery', 'hungry',
+                  'hunger', 'meal', 'meals', 'nutrition', 'wic', 'pantry', 'food bank',
+                  'food banks', 'eat'],
+        'government': [('financial assistance', 'SNAP (Supplemental Nutrition Assistance Program)')],
+        'nonprofit': [('food assistance', None)],
+        'next_steps': [
+            "Apply for SNAP through your state's SNAP office or Benefits.gov.",
+            "Call 211 to find the closest food bank or pantry and its hours.",
+        ],
+    },
+    'housing': {
+        'terms': ['housing', 'rent', 'rental', 'apartment', 'shelter', 'homeless', 'home',
+                  'landlord', 'section 8', 'voucher', 'public housing'],
+        'government': [('housing', None)],
+        'nonprofit': [('housing assistance', None)],
+        'financial_topic': 'rent',
+        'next_steps': [
+            "Contact your local public housing agency to apply for a Housing Choice Voucher.",
+            "Call 211 for emergency rental assistance and shelter openings near you.",
+        ],
+    },
+    'energy': {
+        # "bill" alone is not an energy need ("my medical bill"); only utility bills count
+        'terms': ['energy', 'electric', 'electricity', 'power', 'power bill', 'utility',
+                  'utilities', 'heating', 'heat', 'cooling', 'gas bill', 'electric bill',
+                  'utility bill', 'heating bill', 'heat bill', 'light bill', 'water bill',
+                  'liheap'],
+        'government': [('financial assistance', 'Low Income Home Energy Assistance Program (LIHEAP)')],
+        'nonprofit': [('financial assistance', 'United Way Emergency Financial Assistance'),
+                      ('financial assistance', 'Salvation Army Financial Aid'),
+                      ('financial assistance', 'Catholic Charities Emergency Services')],
+        'financial_topic': 'bills',
+        'next_steps': [
+            "Apply for LIHEAP through your state LIHEAP office; bring ID, a recent bill and proof of income.",
+            "Ask your utility company about hardship programs or a payment plan.",
+        ],
+    },
+    'healthcare': {
+        'terms': ['health', 'healthcare', 'medical', 'doctor', 'clinic', 'medicine',
+                  'health insurance', 'medicaid', 'medicare', 'chip', 'dental', 'prescriptions'],
+        'government': [('healthcare', None)],
+        'nonprofit': [('healthcare', None)],
+        'next_steps': [
+            "Check Medicaid or CHIP eligibility through your state Medicaid office or HealthCare.gov.",
+            "Find a community health center with sliding-scale fees at findahealthcenter.hrsa.gov.",
+        ],
+    },
+    'employment': {
+        'terms': ['job', 'jobs', 'work', 'employment', 'unemployed', 'unemployment',
+                  'career', 'training', 'job training', 'laid off', 'lost my job'],
+        'government': [('employment', None)],
+        'nonprofit': [('employment', None)],
+        'next_steps': [
+            "File for Unemployment Insurance with your state labor department if you lost your job.",
+            "Visit your local American Job Center for free job training and placement.",
+        ],
+    },
+    'education': {
+        'terms': ['education', 'school', 'college', 'tuition', 'student', 'students',
+                  'student loans', 'ged', 'pell', 'pell grant', 'head start', 'preschool'],
+        'government': [('education', None)],
+        'nonprofit': [],
+        'next_steps': [
+            "Fill out the FAFSA at studentaid.gov for Pell Grants and federal student loans.",
+            "Ask your local school district about Head Start and adult education programs.",
+        ],
+    },
+    'money': {
+        'terms': ['money', 'cash', 'financial', 'financial assistance', 'cash assistance',
+                  'tanf', 'ssi', 'disability', 'budget', 'budgeting', 'bills', 'debt'],
+        'government': [('financial assistance', 'TANF (Temporary Assistance for Needy Families)'),
+                       ('financial assistance', 'SSI (Supplemental Security Income)')],
+        'nonprofit': [('financial assistance', None)],
+        'financial_topic': 'budget',
+        'next_steps': [
+            "Check TANF and SSI eligibility at Benefits.gov or your local social services office.",
+            "Call 211 for emergency financial assistance from local charities.",
+        ],
+    },
+    'mortgage': {
+        'terms': ['mortgage', 'mortgages', 'foreclosure', 'home loan'],
+        'government': [],
+        'nonprofit': [('housing assistance', 'Habitat for Humanity')],
+        'financial_topic': 'mortgage',
+        'next_steps': [
+            "Talk to a HUD-approved housing counselor for free mortgage advice.",
+        ],
+    },
+}
+
+# Words that carry no need of their own ("I need help with ...")
+FILLER_WORDS = frozenset("""
+a an and any are am at be can could do does for from get getting give got have having
+help helping hi hello i i'm im in is it looking me my need needs needed of on or our
+please some someone something the there to us want we with you your assistance find
+finding pay paying apply applying programs program options resources resource support
+hey thanks thank kind sort type kinds types info information about afford cover
+struggling trouble family kids children m s t ll ve re d explain how what
+works does mean means
+""".split())
+
+US_STATES = frozenset("""
+alabama alaska arizona arkansas california colorado connecticut delaware florida georgia
+hawaii idaho illinois indiana iowa kansas kentucky louisiana maine maryland massachusetts
+michigan minnesota mississippi missouri montana nebraska nevada ohio oklahoma oregon
+pennsylvania tennessee texas utah vermont virginia washington wisconsin wyoming
+""".split()) | frozenset(["new hampshire", "new jersey", "new mexico", "new york",
+                          "north carolina", "north dakota", "rhode island", "south carolina",
+                          "south dakota", "west virginia", "district of columbia"])
+
+# Requests for current, contact or local details need google_search; never fast-path them
+SPECIFIC_INFO_WORDS = frozenset("""
+latest current currently update updated updates new contact phone number address
+hours open deadline deadlines nearest closest near nearby website site email
+when where eligible eligibility qualify qualifies status appeal denied why compare
+""".split())
+
+# "I don't need food stamps, I need housing" names a need the caller does not have;
+# word overlap cannot tell which need is negated, so leave these to the LLM
+NEGATION_WORDS = frozenset("""
+not no never dont don doesnt doesn didnt didn isnt isn arent aren wont instead
+except without neither nor
+""".split())
+
+_ZIP = re.compile(r"^\d{5}$")
+
+
+class FastPathRouter:
+    """Answers catalog-covered queries directly when confidence clears the threshold"""
+
+    def __init__(self, government_categories: Dict[str, List[str]],
+                 nonprofit_categories: Dict[str, List[str]],
+                 financial_explainer: Optional[Callable[[str], str]] = None,
+                 threshold: float = 0.75, max_items: int = 6):
+        self.threshold = threshold
+        self.max_items = max_items
+        self.financial_explainer = financial_explainer
+
+        self._profiles = {}
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        self._max_phrase = max(len(state.split()) for state in US_STATES)
+        for need, profile in NEED_PROFILES.items():
+            self._profiles[need] = {
+                'government': self._resolve(government_categories, profile['government']),
+                'nonprofit': self._resolve(nonprofit_categories, profile['nonprofit']),
+                'financial': financial_explainer(profile['financial_topic'])
+                             if financial_explainer and 'financial_topic' in profile else None,
+                'next_steps': profile['next_steps'],
+            }
+            for term in profile['terms']:
+                words = tuple(term.split())
+                self._phrases[words] = need
+                self._max_phrase = max(self._max_phrase, len(words))
+
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.declined = 0
+
+    @staticmethod
+    def _resolve(categories: Dict[str, List[str]], entries) -> List[str]:
+        """Expand (category, resource) references into catalog lines, failing loudly on drift"""
+        lines = []
+        for category, resource in entries:
+            if category not in categories:
+                raise ValueError(f"Fast-path profile references unknown category '{category}'")
+            if resource is None:
+                lines.extend(categories[category])
+            elif resource in categories[category]:
+                lines.append(resource)
+            else:
+                raise ValueError(f"Fast-path profile references unknown resource '{resource}'")
+        return lines
+
+    def score(self, query: str) -> Tuple[float, List[str]]:
+        """
+        Return (confidence, needs) for a query.
+
+        Confidence is the share of meaningful words explained by need terms;
+        filler words, state names and ZIP codes are neutral. Any request for
+        current or local details, and any negation, scores zero.
+        """
+        words = normalize_query(query).split()
+        needs: List[str] = []
+        matched = unknown = 0
+        i = 0
+        while i < len(words):
+            for size in range(min(self._max_phrase, len(words) - i), 0, -1):
+                phrase = tuple(words[i:i + size])
+                need = self._phrases.get(phrase)
+                if need is not None:
+                    if need not in needs:
+                        needs.append(need)
+                    matched += size
+                    i += size
+                    break
+                if size > 1 and " ".join(phrase) in US_STATES:
+                    i += size
+                    break
+            else:
+                word = words[i]
+                if word in SPECIFIC_INFO_WORDS or word in NEGATION_WORDS:
+                    return 0.0, needs
+                if word not in FILLER_WORDS and word not in US_STATES and not _ZIP.match(word):
+                    unknown += 1
+                i += 1
+
+        if not matched:
+            return 0.0, needs
+        return matched / (matched + unknown), needs
+
+    def route(self, query: str) -> Optional[str]:
+        """Return a structured answer, or None if the query should go to the LLM"""
+        confidence, needs = self.score(query)
+        if confidence < self.threshold:
+            with self._lock:
+                self.declined += 1
+            return None
+        with self._lock:
+            self.routed += 1
+        return self.build_answer(needs)
+
+    def build_answer(self, needs: List[str]) -> str:
+        """Assemble the Government / Nonprofit / Financial Info / Next Steps summary"""
+        government, nonprofit, financial, next_steps = [], [], [], []
+        for need in needs:
+            profile = self._profiles[need]
+            government += [r for r in profile['government'] if r not in government]
+            nonprofit += [r for r in profile['nonprofit'] if r not in nonprofit]
+            if profile['financial'] and profile['financial'] not in financial:
+                financial.append(profile['financial'])
+            next_steps += [s for s in profile['next_steps'] if s not in next_steps]
+
+        sections = []
+        if government:
+            sections.append("**Government Resources**\n" +
+                            "\n".join(f"- {r}" for r in government[:self.max_items]))
+        if nonprofit:
+            sections.append("**Nonprofit Resources**\n" +
+                            "\n".join(f"- {r}" for r in nonprofit[:self.max_items]))
+        if financial:
+            sections.append("**Financial Info**\n" + "\n\n".join(financial))
+        if not any("211" in step for step in next_steps):
+            next_steps.append("Dial 2-1-1 any time to reach a local resource specialist.")
+        sections.append("**Next Steps**\n" +
+                        "\n".join(f"{i}. {s}" for i, s in enumerate(next_steps, 1)))
+        return "\n\n".join(sections)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.routed + self.declined
+            return {
+                'routed': self.routed,
+                'declined': self.declined,
+                'bypass_rate': self.routed / total if total else 0.0,
+                'threshold': self.threshold,
+            }
@@ -1,24 +1,38 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import atexit
 import json
 import logging
 from datetime import datetime
 import os
 import sys
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 # Add the parent directory to the path to import our agent
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from Untapped_Resource_Agent import ResourceAgent
+from Untapped_Resource_Agent import ResourceAgent, resource_retriever
+from call_analytics import CallAnalytics
+from call_state import CallStateStore, create_call_state_store
+from chat_sessions import SessionLimiter, SessionSlot, new_session_id, session_id_from
+from eligibility import EligibilityEngine, ProgramShortlist, state_from_location
+from idempotency import IdempotentResponses, TurnNumbers, payload_digest
+from keyword_matcher import TurnAnalysis, analyze_turn
+from message_catalog import MessageCatalog, default_catalog
+from spatial_index import SpatialIndex, load_resource_locations
+from speculative_lookup import SpeculativeLookups
+import structured_log
+from structured_log import configure_logging, log_fields, logging_stats, sample_payload
 from utils import format_resource_response, truncate_for_voice, extract_user_intent, log_conversation_turn
 
 app = Flask(__name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: JSON lines written by a background thread (see structured_log.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize the resource agent
+# Initialize the resource agent (the LLM client and graph are built lazily)
 try:
     resource_agent = ResourceAgent()
     logger.info("Resource agent initialized successfully")
@@ -26,208 +40,270 @@ except Exception as e:
     logger.error(f"Failed to initialize resource agent: {e}")
     resource_agent = None
 
+# Resource locations, indexed for nearest-resource lookups on first use
+_resource_locations = None
+_resource_locations_lock = threading.Lock()
+
+def get_resource_locations() -> Optional[SpatialIndex]:
+    """Spatial index over the resource records, or None if they could not be loaded"""
+    global _resource_locations
+    if _resource_locations is None:
+        with _resource_locations_lock:
+            if _resource_locations is None:
+                try:
+                    _resource_locations = SpatialIndex(load_resource_locations())
+                    logger.info(f"Indexed {len(_resource_locations)} resource locations")
+                except Exception as e:
+                    logger.error(f"Failed to load resource locations: {e}")
+                    return None
+    return _resource_locations
+
+# Program eligibility rules (compiled to arrays on the first screen)
+eligibility_engine = EligibilityEngine()
+
+# Anthony's translated replies and per-language keywords (anthony_messages.json, validated at load)
+message_catalog = default_catalog()
+
+# Location categories matching each detected need type
+NEED_LOCATION_CATEGORIES = {
+    'energy': 'Utility Assistance',
+    'food': 'Food Assistance',
+    'housing': 'Housing Assistance',
+    'health': 'Healthcare',
+    'employment': 'Employment',
+}
+
+# Turns and call events, written to daily SQLite files by a background thread
+# (see call_analytics.py; `python call_analytics.py report` to query them)
+call_analytics = CallAnalytics()
+atexit.register(call_analytics.flush)
+
+# Web chat (/chat): messages each session may have in flight, and the browser origins allowed
+# to call it (comma-separated, * for any)
+CHAT_MAX_CONCURRENT_PER_SESSION = int(os.environ.get('CHAT_MAX_CONCURRENT_PER_SESSION', 1))
+CHAT_ALLOWED_ORIGINS = {origin.strip() for origin in os.environ.get('CHAT_ALLOWED_ORIGINS', '*').split(',')}
+CHAT_ERROR_REPLY = "Sorry, I couldn't finish that answer. Please try again."
+chat_limiter = SessionLimiter(CHAT_MAX_CONCURRENT_PER_SESSION)
+
+# Webhook responses replayed to Retell's retries instead of handling a delivery twice;
+# 5xx responses are not kept, so a retry after a failure runs again
+webhook_responses = IdempotentResponses(keep=lambda response: response[1] < 500)
+webhook_turns = TurnNumbers()
+# Events Retell sends once per call; any other event is told apart by its payload
+CALL_LIFECYCLE_EVENTS = frozenset({'call_started', 'call_ended', 'call_analyzed'})
+
+# Intake questions asked after the location, by conversation step
+INTAKE_QUESTIONS = {
+    'collecting_name': 'ask_name',
+    'collecting_age': 'ask_age',
+    'collecting_income': 'ask_income',
+}
+
+class ResourceLookup(NamedTuple):
+    """What the final turn needs that depends only on need and location"""
+    programs: ProgramShortlist      # eligibility screened on state; age and income still to apply
+    nearby: List                    # closest (resource, miles) pairs
+
+# Set once prepare_for_serving() has built everything the first request would otherwise wait for
+_serving_ready = threading.Event()
+_serving_components: Dict[str, bool] = {}
+
+def prepare_for_serving() -> Dict[str, float]:
+    """
+    Build the agent, catalog indexes and eligibility rules now. Under the
+    prefork server this runs once in the master, before workers are forked,
+    so every worker shares the built structures copy-on-write.
+    Returns seconds spent per component.
+    """
+    steps = {
+        'agent': lambda: resource_agent is not None and resource_agent.warmup() is not None,
+        'catalog_index': lambda: resource_retriever.search("warm up") is not None,
+        'eligibility': lambda: eligibility_engine.screen() is not None,
+        'resource_locations': lambda: get_resource_locations() is not None,
+    }
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            _serving_components[name] = bool(step())
+        except Exception as e:
+            # The webhook flow still works without the agent (e.g. no GROQ_API_KEY)
+            logger.error(f"Failed to prepare {name}: {e}")
+            _serving_components[name] = False
+        timings[name] = time.perf_counter() - start
+    _serving_ready.set()
+    logger.info("Ready to serve: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+    return timings
+
+def after_fork():
+    """Reopen per-process resources in a worker forked from a preloaded master"""
+    if resource_agent is not None:
+        resource_agent.after_fork()
+    anthony.call_states.after_fork()
+    anthony.lookups.after_fork()
+    call_analytics.after_fork()
+    structured_log.after_fork()
+
 # Anthony persona conversation management
 class AnthonyPersona:
-    def __init__(self):
-        self.conversation_states = {}  # Track conversation state per call
-        self.supported_languages = {
-            'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
-            'hi': 'Hindi', 'ru': 'Russian', 'pt': 'Portuguese', 'ja': 'Japanese',
-            'it': 'Italian', 'nl': 'Dutch'
-        }
+    def __init__(self, call_states: Optional[CallStateStore] = None,
+                 messages: Optional[MessageCatalog] = None,
+                 lookups: Optional[SpeculativeLookups] = None,
+                 analytics: Optional[CallAnalytics] = None):
+        # Conversation state per call, expired/evicted by TTL and LRU; CALL_STATE_BACKEND=sqlite
+        # shares it between worker processes
+        self.call_states = call_states if call_states is not None else create_call_state_store()
+        # Translated replies, loaded once from anthony_messages.json
+        self.messages = messages if messages is not None else message_catalog
+        self.supported_languages = self.messages.language_names
+        # Resource lookups started as soon as need and location are known, while the
+        # name, age and income questions are still being asked
+        self.lookups = lookups if lookups is not None else SpeculativeLookups()
+        # Where each turn and the end of each call are recorded; None records nothing
+        self.analytics = analytics
     
     def get_call_state(self, call_id: str) -> Dict:
         """Get or create conversation state for a call"""
-        if call_id not in self.conversation_states:
-            self.conversation_states[call_id] = {
+        state = self.call_states.get(call_id)
+        if state is None:
+            state = {
                 'step': 'greeting',
                 'language': 'en',
                 'user_info': {},
-                'need_type': None,
-                'conversation_history': []
+                'need_type': None
             }
-        return self.conversation_states[call_id]
+        return state
+    
+    def end_call(self, call_id: str, **detail) -> bool:
+        """Forget a finished call's state, recording the step it ended at; True if there was any"""
+        self.lookups.cancel(call_id)
+        if self.analytics is not None:
+            state = self.call_states.get(call_id) or {}
+            self.analytics.record('call_ended', call_id, step=state.get('step'),
+                                  language=state.get('language'), need=state.get('need_type'), **detail)
+        return self.call_states.delete(call_id)
     
     def detect_language(self, text: str) -> str:
         """Simple language detection based on common words"""
-        text_lower = text.lower()
-        
-        # Spanish indicators
-        if any(word in text_lower for word in ['hola', 'gracias', 'ayuda', 'necesito', 'por favor']):
-            return 'es'
-        # French indicators  
-        elif any(word in text_lower for word in ['bonjour', 'merci', 'aide', 'besoin', 's\'il vous plaît']):
-            return 'fr'
-        # German indicators
-        elif any(word in text_lower for word in ['hallo', 'danke', 'hilfe', 'brauche', 'bitte']):
-            return 'de'
-        # Hindi indicators
-        elif any(word in text_lower for word in ['नमस्ते', 'धन्यवाद', 'मदद', 'ज़रूरत']):
-            return 'hi'
-        # Russian indicators
-        elif any(word in text_lower for word in ['привет', 'спасибо', 'помощь', 'нужно']):
-            return 'ru'
-        # Portuguese indicators
-        elif any(word in text_lower for word in ['olá', 'obrigado', 'ajuda', 'preciso', 'por favor']):
-            return 'pt'
-        # Japanese indicators
-        elif any(word in text_lower for word in ['こんにちは', 'ありがとう', '助け', '必要']):
-            return 'ja'
-        # Italian indicators
-        elif any(word in text_lower for word in ['ciao', 'grazie', 'aiuto', 'bisogno', 'per favore']):
-            return 'it'
-        # Dutch indicators
-        elif any(word in text_lower for word in ['hallo', 'dank je', 'hulp', 'nodig', 'alsjeblieft']):
-            return 'nl'
-        
-        return 'en'  # Default to English
+        return analyze_turn(text).language
     
     def get_greeting(self, language: str = 'en') -> str:
         """Get greeting in specified language"""
-        greetings = {
-            'en': "Hi, I'm Anthony with Bridge—a free, confidential benefits line. What kind of help are you looking for today? Energy, housing, food, money, or something else?",
-            'es': "Hola, soy Anthony de Bridge—una línea gratuita y confidencial de beneficios. ¿Qué tipo de ayuda buscas hoy? ¿Energía, vivienda, comida, dinero, o algo más?",
-            'fr': "Salut, je suis Anthony avec Bridge—une ligne d'assistance gratuite et confidentielle. Quel type d'aide cherchez-vous aujourd'hui? Énergie, logement, nourriture, argent, ou autre chose?",
-            'de': "Hallo, ich bin Anthony von Bridge—eine kostenlose, vertrauliche Leistungslinie. Welche Art von Hilfe suchen Sie heute? Energie, Wohnen, Essen, Geld oder etwas anderes?",
-            'hi': "नमस्ते, मैं एंथनी हूं ब्रिज के साथ—एक मुफ्त, गोपनीय लाभ लाइन। आज आपको किस तरह की मदद चाहिए? ऊर्जा, आवास, भोजन, पैसा, या कुछ और?",
-            'ru': "Привет, я Энтони из Bridge—бесплатная, конфиденциальная линия помощи. Какую помощь вы ищете сегодня? Энергия, жилье, еда, деньги или что-то еще?",
-            'pt': "Olá, sou Anthony da Bridge—uma linha gratuita e confidencial de benefícios. Que tipo de ajuda você está procurando hoje? Energia, habitação, comida, dinheiro, ou algo mais?",
-            'ja': "こんにちは、私はブリッジのアンソニーです—無料の機密給付金ラインです。今日はどのような助けをお探しですか？エネルギー、住宅、食べ物、お金、またはその他？",
-            'it': "Ciao, sono Anthony con Bridge—una linea di benefici gratuita e confidenziale. Che tipo di aiuto stai cercando oggi? Energia, alloggio, cibo, denaro, o qualcos'altro?",
-            'nl': "Hallo, ik ben Anthony van Bridge—een gratis, vertrouwelijke voordelenlijn. Wat voor hulp zoekt u vandaag? Energie, huisvesting, voedsel, geld, of iets anders?"
-        }
-        return greetings.get(language, greetings['en'])
+        return self.messages.render(language, 'greeting')
     
     def process_user_input(self, call_id: str, user_input: str) -> str:
         """Process user input and return appropriate response"""
+        return ''.join(self.process_user_input_stream(call_id, user_input))
+    
+    def process_user_input_stream(self, call_id: str, user_input: str) -> Iterator[str]:
+        """process_user_input, yielding the reply in pieces as soon as each is ready"""
         state = self.get_call_state(call_id)
+        answered = state['step']
+        reply = []
+        start = time.perf_counter()
+        try:
+            for piece in self.respond_stream(state, user_input, call_id):
+                reply.append(piece)
+                yield piece
+        finally:
+            # Saved after every turn so any worker can serve the call's next turn
+            self.call_states.put(call_id, state)
+            self.prefetch_resources(call_id, state)
+            # The turn's transcript and reply are kept here rather than in the call state
+            if self.analytics is not None:
+                self.analytics.record('turn', call_id, step=answered, language=state['language'],
+                                      need=state['need_type'],
+                                      latency_ms=(time.perf_counter() - start) * 1000,
+                                      transcript=user_input, response=''.join(reply))
+    
+    def respond(self, state: Dict, user_input: str, call_id: Optional[str] = None) -> str:
+        """Advance one call's conversation state with the caller's input"""
+        return ''.join(self.respond_stream(state, user_input, call_id))
+    
+    def respond_stream(self, state: Dict, user_input: str, call_id: Optional[str] = None) -> Iterator[str]:
+        """respond, yielding the reply in pieces; only the resource summary has more than one"""
+        # Language, urgency and need type all come from one pass over the transcript
+        analysis = analyze_turn(user_input)
         
         # Detect language if not already set
         if state['step'] == 'greeting':
-            detected_lang = self.detect_language(user_input)
+            detected_lang = analysis.language
             state['language'] = detected_lang
             logger.info(f"Detected language: {detected_lang}")
         
-        # Add to conversation history
-        state['conversation_history'].append({
-            'user': user_input,
-            'timestamp': datetime.now().isoformat()
-        })
-        
         # Check for urgent situations
-        if self.check_urgent_situation(user_input, state['language']):
-            return self.handle_urgent_situation(state['language'])
+        if analysis.is_urgent(state['language']):
+            yield self.handle_urgent_situation(state['language'])
+        
+        # A changed need or location mid-intake: confirm and ask the same question again
+        elif state['step'] in INTAKE_QUESTIONS and self.apply_intake_correction(user_input, state, analysis):
+            yield (self.messages.render(state['language'], 'intake_updated') + " "
+                   + self.messages.render(state['language'], INTAKE_QUESTIONS[state['step']]))
         
         # Process based on conversation step
-        if state['step'] == 'greeting':
-            return self.handle_greeting_response(user_input, state)
+        elif state['step'] == 'greeting':
+            yield self.handle_greeting_response(user_input, state, analysis)
         elif state['step'] == 'collecting_location':
-            return self.handle_location_response(user_input, state)
+            yield self.handle_location_response(user_input, state)
         elif state['step'] == 'collecting_name':
-            return self.handle_name_response(user_input, state)
+            yield self.handle_name_response(user_input, state)
         elif state['step'] == 'collecting_age':
-            return self.handle_age_response(user_input, state)
+            yield self.handle_age_response(user_input, state)
         elif state['step'] == 'collecting_income':
-            return self.handle_income_response(user_input, state)
+            yield from self.handle_income_response_stream(user_input, state, call_id)
         elif state['step'] == 'providing_resources':
-            return self.handle_resource_followup(user_input, state)
-        
-        return self.get_greeting(state['language'])
+            yield self.handle_resource_followup(user_input, state)
+        else:
+            yield self.get_greeting(state['language'])
     
     def check_urgent_situation(self, user_input: str, language: str) -> bool:
         """Check if user mentions urgent situation"""
-        urgent_keywords = {
-            'en': ['shutoff', 'eviction', 'today', 'emergency', 'urgent', 'immediately'],
-            'es': ['corte', 'desalojo', 'hoy', 'emergencia', 'urgente', 'inmediatamente'],
-            'fr': ['coupure', 'expulsion', 'aujourd\'hui', 'urgence', 'urgent', 'immédiatement'],
-            'de': ['abgeschaltet', 'räumung', 'heute', 'notfall', 'dringend', 'sofort'],
-            'hi': ['बंद', 'बेदखली', 'आज', 'आपातकाल', 'तत्काल', 'तुरंत'],
-            'ru': ['отключение', 'выселение', 'сегодня', 'чрезвычайная ситуация', 'срочно', 'немедленно'],
-            'pt': ['corte', 'despejo', 'hoje', 'emergência', 'urgente', 'imediatamente'],
-            'ja': ['停止', '立ち退き', '今日', '緊急', '緊急', 'すぐに'],
-            'it': ['interruzione', 'sfratto', 'oggi', 'emergenza', 'urgente', 'immediatamente'],
-            'nl': ['afsluiting', 'ontruiming', 'vandaag', 'noodgeval', 'urgent', 'onmiddellijk']
-        }
-        
-        keywords = urgent_keywords.get(language, urgent_keywords['en'])
-        return any(keyword in user_input.lower() for keyword in keywords)
+        return analyze_turn(user_input).is_urgent(language)
     
     def handle_urgent_situation(self, language: str) -> str:
         """Handle urgent situations with empathy"""
-        responses = {
-            'en': "I'm really sorry you're going through that. I can connect you to a local live assistance line right now.",
-            'es': "Realmente lamento que estés pasando por eso. Puedo conectarte con una línea de asistencia local en vivo ahora mismo.",
-            'fr': "Je suis vraiment désolé que vous traversiez cela. Je peux vous connecter à une ligne d'assistance locale en direct maintenant.",
-            'de': "Es tut mir wirklich leid, dass Sie das durchmachen. Ich kann Sie jetzt mit einer lokalen Live-Hilfslinie verbinden.",
-            'hi': "मुझे वास्तव में खेद है कि आप इससे गुजर रहे हैं। मैं आपको अभी एक स्थानीय लाइव सहायता लाइन से जोड़ सकता हूं।",
-            'ru': "Мне очень жаль, что вы через это проходите. Я могу прямо сейчас подключить вас к местной линии живой помощи.",
-            'pt': "Realmente sinto muito que você esteja passando por isso. Posso conectá-lo a uma linha de assistência local ao vivo agora mesmo.",
-            'ja': "そのような状況に直面していることを本当に申し訳なく思います。今すぐ地元のライブアシスタンスラインに接続できます。",
-            'it': "Mi dispiace davvero che tu stia passando questo. Posso collegarti a una linea di assistenza locale dal vivo proprio ora.",
-            'nl': "Het spijt me echt dat je dit doormaakt. Ik kan je nu verbinden met een lokale live-assistentielijn."
-        }
-        return responses.get(language, responses['en'])
-    
-    def handle_greeting_response(self, user_input: str, state: Dict) -> str:
+        return self.messages.render(language, 'urgent_situation')
+    
+    def handle_greeting_response(self, user_input: str, state: Dict,
+                                 analysis: Optional[TurnAnalysis] = None) -> str:
         """Handle response to initial greeting"""
         # Detect need type
-        need_type = self.detect_need_type(user_input, state['language'])
+        need_type = analysis.need if analysis else self.detect_need_type(user_input, state['language'])
         state['need_type'] = need_type
         state['step'] = 'collecting_location'
         
         # Acknowledge need and ask for location
-        responses = {
-            'en': f"Got it, you need help with {need_type}. What state or ZIP code are you in?",
-            'es': f"Entendido, necesitas ayuda con {need_type}. ¿En qué estado o código postal estás?",
-            'fr': f"Compris, vous avez besoin d'aide avec {need_type}. Dans quel état ou code postal êtes-vous?",
-            'de': f"Verstanden, Sie brauchen Hilfe mit {need_type}. In welchem Bundesstaat oder Postleitzahl sind Sie?",
-            'hi': f"समझ गया, आपको {need_type} के साथ मदद चाहिए। आप किस राज्य या ज़िप कोड में हैं?",
-            'ru': f"Понял, вам нужна помощь с {need_type}. В каком штате или почтовом индексе вы находитесь?",
-            'pt': f"Entendi, você precisa de ajuda com {need_type}. Em que estado ou código postal você está?",
-            'ja': f"分かりました、{need_type}の助けが必要ですね。どの州または郵便番号にいますか？",
-            'it': f"Capito, hai bisogno di aiuto con {need_type}. In che stato o codice postale sei?",
-            'nl': f"Begrepen, je hebt hulp nodig met {need_type}. In welke staat of postcode ben je?"
-        }
-        return responses.get(state['language'], responses['en'])
+        return self.messages.render(state['language'], 'ask_location', need_type=need_type)
     
     def detect_need_type(self, user_input: str, language: str) -> str:
         """Detect the type of help needed"""
-        # Map keywords to need types
-        need_mapping = {
-            'energy': ['energy', 'electric', 'electricity', 'power', 'bill', 'heating', 'cooling', 'gas', 'utility'],
-            'housing': ['housing', 'rent', 'rental', 'apartment', 'home', 'shelter', 'homeless'],
-            'food': ['food', 'hungry', 'hunger', 'meal', 'nutrition', 'groceries', 'eat'],
-            'money': ['money', 'cash', 'financial', 'income', 'benefits', 'assistance', 'aid'],
-            'health': ['health', 'medical', 'doctor', 'healthcare', 'medicine', 'hospital'],
-            'employment': ['job', 'work', 'employment', 'unemployed', 'career', 'training']
-        }
-        
-        user_lower = user_input.lower()
-        
-        for need, keywords in need_mapping.items():
-            if any(keyword in user_lower for keyword in keywords):
-                return need
-        
-        return 'general'
+        return analyze_turn(user_input).need
+    
+    def apply_intake_correction(self, user_input: str, state: Dict, analysis: TurnAnalysis) -> bool:
+        """
+        Take a new location or need from a caller correcting themselves
+        ("actually, I'm in Macon, Georgia"); True if either changed.
+        """
+        if not analysis.correction:
+            return False
+        location = user_input.strip()
+        # A ZIP-like number here is more likely an age or income than a new location
+        if state_from_location(location, allow_zip=False) and location != state['user_info'].get('location'):
+            state['user_info']['location'] = location
+            return True
+        # A number at the age or income question is the answer, even after "actually"
+        if analysis.need not in ('general', state['need_type']) and (
+                state['step'] == 'collecting_name' or not re.search(r'\d', user_input)):
+            state['need_type'] = analysis.need
+            return True
+        return False
     
     def handle_location_response(self, user_input: str, state: Dict) -> str:
         """Handle location response"""
         state['user_info']['location'] = user_input.strip()
         state['step'] = 'collecting_name'
         
-        responses = {
-            'en': "Thanks. What's your name? You can skip this if you prefer.",
-            'es': "Gracias. ¿Cuál es tu nombre? Puedes omitir esto si prefieres.",
-            'fr': "Merci. Quel est votre nom? Vous pouvez ignorer cela si vous préférez.",
-            'de': "Danke. Wie ist Ihr Name? Sie können das überspringen, wenn Sie möchten.",
-            'hi': "धन्यवाद। आपका नाम क्या है? आप चाहें तो इसे छोड़ सकते हैं।",
-            'ru': "Спасибо. Как вас зовут? Вы можете пропустить это, если хотите.",
-            'pt': "Obrigado. Qual é o seu nome? Você pode pular isso se preferir.",
-            'ja': "ありがとう。お名前は何ですか？お好みでスキップできます。",
-            'it': "Grazie. Qual è il tuo nome? Puoi saltare questo se preferisci.",
-            'nl': "Bedankt. Wat is je naam? Je kunt dit overslaan als je wilt."
-        }
-        return responses.get(state['language'], responses['en'])
+        return self.messages.render(state['language'], 'ask_name')
     
     def handle_name_response(self, user_input: str, state: Dict) -> str:
         """Handle name response"""
@@ -236,19 +312,7 @@ class AnthonyPersona:
         
         state['step'] = 'collecting_age'
         
-        responses = {
-            'en': "What's your age?",
-            'es': "¿Cuál es tu edad?",
-            'fr': "Quel est votre âge?",
-            'de': "Wie alt sind Sie?",
-            'hi': "आपकी उम्र क्या है?",
-            'ru': "Сколько вам лет?",
-            'pt': "Qual é a sua idade?",
-            'ja': "お年はいくつですか？",
-            'it': "Quanti anni hai?",
-            'nl': "Hoe oud ben je?"
-        }
-        return responses.get(state['language'], responses['en'])
+        return self.messages.render(state['language'], 'ask_age')
     
     def handle_age_response(self, user_input: str, state: Dict) -> str:
         """Handle age response"""
@@ -259,22 +323,14 @@ class AnthonyPersona:
         
         state['step'] = 'collecting_income'
         
-        responses = {
-            'en': "What's your annual income in dollars?",
-            'es': "¿Cuál es tu ingreso anual en dólares?",
-            'fr': "Quel est votre revenu annuel en dollars?",
-            'de': "Wie hoch ist Ihr Jahreseinkommen in Dollar?",
-            'hi': "डॉलर में आपकी वार्षिक आय क्या है?",
-            'ru': "Какой у вас годовой доход в долларах?",
-            'pt': "Qual é a sua renda anual em dólares?",
-            'ja': "ドルでの年間収入はいくらですか？",
-            'it': "Qual è il tuo reddito annuo in dollari?",
-            'nl': "Wat is je jaarlijkse inkomen in dollars?"
-        }
-        return responses.get(state['language'], responses['en'])
-    
-    def handle_income_response(self, user_input: str, state: Dict) -> str:
+        return self.messages.render(state['language'], 'ask_income')
+    
+    def handle_income_response(self, user_input: str, state: Dict, call_id: Optional[str] = None) -> str:
         """Handle income response and provide resources"""
+        return ''.join(self.handle_income_response_stream(user_input, state, call_id))
+    
+    def handle_income_response_stream(self, user_input: str, state: Dict,
+                                      call_id: Optional[str] = None) -> Iterator[str]:
         # Extract income from input
         income_match = re.search(r'\d+', user_input.replace(',', ''))
         if income_match:
@@ -283,10 +339,17 @@ class AnthonyPersona:
         state['step'] = 'providing_resources'
         
         # Generate resources based on need and location
-        return self.generate_resources(state)
+        yield from self.generate_resources_stream(state, call_id)
     
-    def generate_resources(self, state: Dict) -> str:
+    def generate_resources(self, state: Dict, call_id: Optional[str] = None) -> str:
         """Generate appropriate resources based on user profile"""
+        return ''.join(self.generate_resources_stream(state, call_id))
+    
+    def generate_resources_stream(self, state: Dict, call_id: Optional[str] = None) -> Iterator[str]:
+        """
+        generate_resources, yielding the summary before screening and each section as it is built.
+        With a call_id, the lookup prefetched during intake is used if need and location still match.
+        """
         need = state['need_type']
         location = state['user_info'].get('location', '')
         age = state['user_info'].get('age', 0)
@@ -297,24 +360,32 @@ class AnthonyPersona:
         # Build confirmation summary
         name_part = f", {name}" if name else ""
         summary = f"Thanks{name_part}. I have {location}, age {age}, and income ${income}. You said you need help with {need}. Let me share a few options near you."
+        yield summary + "\n\n"
+        
+        lookup = self.lookups.take(call_id, (need, location)) if call_id is not None else None
+        if lookup is None:
+            lookup = self.lookup_resources(need, location)
         
         # Generate resources
         resources = []
         
-        # Always include LIHEAP
-        resources.append({
-            'name': 'LIHEAP (Energy Bill Help)',
-            'description': 'LIHEAP helps pay heating or cooling bills. Based on your ZIP and income, you may qualify. Apply through your state LIHEAP office—I can text the link.',
-            'link': 'https://www.acf.hhs.gov/ocs/energy-assistance',
-            'requirements': 'photo ID, proof of address, recent bill, income proof'
-        })
-        
-        # Always include Housing Resources
-        resources.append({
-            'name': 'Housing Resources',
-            'description': 'HUD helps people find rental and affordable housing in each state. You can search or apply on your state\'s HUD page.',
-            'link': 'https://www.hud.gov/states'
-        })
+        # Screen the caller against program income/age rules, their stated need first
+        for program in self.likely_programs(state, lookup.programs)[:2]:
+            resource = {
+                'name': program['name'],
+                'description': f"{program['description']} Based on what you shared, you may qualify—I can text the link.",
+                'link': program['link'],
+            }
+            if program.get('requirements'):
+                resource['requirements'] = program['requirements']
+            resources.append(resource)
+        
+        if not resources:
+            resources.append({
+                'name': 'Housing Resources',
+                'description': 'HUD helps people find rental and affordable housing in each state. You can search or apply on your state\'s HUD page.',
+                'link': 'https://www.hud.gov/states'
+            })
         
         # Always include Unclaimed Benefits Finder
         resources.append({
@@ -324,17 +395,64 @@ class AnthonyPersona:
         })
         
         # Format response
-        response = summary + "\n\n"
-        
         for i, resource in enumerate(resources, 1):
-            response += f"{i}. {resource['name']} — {resource['description']}\n"
+            response = f"{i}. {resource['name']} — {resource['description']}\n"
             if 'requirements' in resource:
                 response += f"   Requirements: {resource['requirements']}\n"
             response += f"   Link: {resource['link']}\n\n"
+            yield response
         
-        response += "Would you like me to text these links, or read them slowly?"
+        nearby = lookup.nearby
+        if nearby:
+            response = "Closest to you:\n"
+            for place, miles in nearby:
+                response += f"- {place['name']}, {place['address']} — about {miles:.1f} miles away. Phone: {place['phone']}\n"
+            yield response + "\n"
         
-        return response
+        yield "Would you like me to text these links, or read them slowly?"
+    
+    def likely_programs(self, state: Dict, shortlist: Optional[ProgramShortlist] = None) -> List[Dict]:
+        """Programs the caller likely qualifies for, those matching their need first"""
+        info = state['user_info']
+        if shortlist is not None:
+            programs = shortlist.refine(age=info.get('age'), income=info.get('income'))
+        else:
+            # Household size isn't asked on the call, so screening assumes a household of one
+            programs = eligibility_engine.screen(
+                age=info.get('age'),
+                income=info.get('income'),
+                state=state_from_location(info.get('location', '')),
+            )
+        return sorted(programs, key=lambda program: program['need'] != state.get('need_type'))
+    
+    def lookup_resources(self, need: Optional[str], location: str,
+                         cancelled: Optional[threading.Event] = None) -> Optional[ResourceLookup]:
+        """The eligibility shortlist for the caller's state and the resources nearest them"""
+        # Household of one, as in likely_programs()
+        programs = eligibility_engine.prefilter(state=state_from_location(location))
+        if cancelled is not None and cancelled.is_set():
+            return None
+        return ResourceLookup(programs, self.find_nearby_resources(location, need))
+    
+    def prefetch_resources(self, call_id: str, state: Dict):
+        """Start (or restart, if need or location changed) the call's lookup during intake"""
+        location = state['user_info'].get('location')
+        if state['step'] in INTAKE_QUESTIONS and location:
+            need = state['need_type']
+            self.lookups.start(call_id, (need, location),
+                               lambda cancelled: self.lookup_resources(need, location, cancelled))
+    
+    def find_nearby_resources(self, location: str, need: Optional[str], limit: int = 2,
+                              radius_miles: float = 25.0) -> List:
+        """Closest (resource, miles) pairs for a caller location containing a known ZIP"""
+        index = get_resource_locations()
+        if index is None:
+            return []
+        point = index.locate(location)
+        if point is None:
+            return []
+        return index.nearest(point[0], point[1], k=limit, radius_miles=radius_miles,
+                             category=NEED_LOCATION_CATEGORIES.get(need))
     
     def handle_resource_followup(self, user_input: str, state: Dict) -> str:
         """Handle follow-up questions about resources"""
@@ -350,7 +468,7 @@ class AnthonyPersona:
             return "Glad I could help today. You can call Bridge anytime for energy, housing, or benefit support. Take care."
 
 # Initialize Anthony persona
-anthony = AnthonyPersona()
+anthony = AnthonyPersona(analytics=call_analytics)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -358,9 +476,163 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "agent_available": resource_agent is not None
+        "agent_available": resource_agent is not None,
+        "agent_ready": resource_agent is not None and resource_agent.ready,
+        # Groq/SerpAPI breaker state and trip counts; answers degrade to catalogs while open
+        "breakers": resource_agent.breaker_stats() if resource_agent is not None else {},
+        # Identical concurrent questions answered by one shared agent run
+        "coalescing": resource_agent.coalescing_stats() if resource_agent is not None else {},
+        # Retried webhook deliveries answered with the first delivery's response
+        "webhook_dedupe": webhook_responses.stats(),
+        "call_states": anthony.call_states.stats(),
+        # Resource lookups prefetched during intake: used at the final turn, cancelled or missed
+        "speculative_lookups": anthony.lookups.stats(),
+        # Call analytics events buffered, written, and dropped because the buffer was full
+        "call_analytics": call_analytics.stats(),
+        # Web chat requests in flight and those refused for exceeding the per-session limit
+        "chat": chat_limiter.stats(),
+        # Background log writer: queue depth and records dropped because it was full
+        "logging": logging_stats()
+    })
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness gate: 503 until prepare_for_serving() has finished"""
+    ready = _serving_ready.is_set()
+    return jsonify({
+        "ready": ready,
+        "components": dict(_serving_components)
+    }), 200 if ready else 503
+
+@app.route('/resources/nearby', methods=['GET'])
+def resources_nearby():
+    """
+    Resources closest to a point: /resources/nearby?lat=&lng=&radius=&category=
+    radius is in miles (default 25); limit caps the results (default 10, max 50).
+    """
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius = float(request.args.get('radius', 25))
+        limit = int(request.args.get('limit', 10))
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat and lng are required; radius and limit must be numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or radius <= 0:
+        return jsonify({"error": "lat/lng out of range or non-positive radius"}), 400
+    
+    index = get_resource_locations()
+    if index is None:
+        return jsonify({"error": "Resource locations unavailable"}), 503
+    
+    category = request.args.get('category') or None
+    results = index.nearest(lat, lng, k=max(1, min(limit, 50)), radius_miles=radius, category=category)
+    return jsonify({
+        "count": len(results),
+        "radius_miles": radius,
+        "results": [dict(place, distance_miles=round(miles, 2)) for place, miles in results]
     })
 
+@app.route('/chat', methods=['POST', 'OPTIONS'])
+def chat():
+    """
+    Web chat with the resource agent. Body: {"message": str, "session_id": optional str}.
+    Earlier messages of the same session are part of the context; a new
+    session_id is issued when none is given.
+
+    Replies with JSON {"reply", "session_id"}, or with Server-Sent Events
+    when the client accepts text/event-stream (or sends "stream": true):
+        event: session    {"session_id"}                       sent first
+        event: token      {"content"}                          answer text as it is generated
+        event: tool_call  {"name", "args"}                     the agent is looking something up
+        event: done       {"reply", "session_id", "cached", "fast_path", "degraded",
+                           "time_to_first_token", "total_time"}
+        event: error      {"error"}
+    """
+    if request.method == 'OPTIONS':
+        return app.make_default_options_response()
+    
+    data = request.get_json(silent=True) or {}
+    message = data.get('message')
+    if not isinstance(message, str) or not message.strip():
+        return jsonify({"error": "No message provided"}), 400
+    if resource_agent is None:
+        return jsonify({"error": "Resource agent unavailable"}), 503
+    
+    session_id = session_id_from(data.get('session_id')) or new_session_id()
+    slot = chat_limiter.slot(session_id)
+    if slot is None:
+        response = jsonify({"error": "This chat already has a message in progress",
+                            "session_id": session_id})
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    
+    stream = data.get('stream') is True or request.accept_mimetypes.best_match(
+        ['application/json', 'text/event-stream']) == 'text/event-stream'
+    logger.info("chat_message", extra=log_fields(session_id=session_id, transcript=message, stream=stream))
+    # Namespaced so a chat session can never continue a phone call's history
+    agent_session = f"chat:{session_id}"
+    
+    if stream:
+        events = resource_agent.find_resources_stream(message.strip(), session_id=agent_session)
+        response = Response(chat_event_stream(events, session_id, slot), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        # Also frees the slot when the client goes away before the stream starts
+        response.call_on_close(slot.release)
+        return response
+    
+    try:
+        reply = resource_agent.find_resources(message.strip(), session_id=agent_session)
+        return jsonify({"reply": reply, "session_id": session_id})
+    except Exception as e:
+        logger.error(f"Error answering chat message: {e}")
+        return jsonify({"error": CHAT_ERROR_REPLY, "session_id": session_id}), 500
+    finally:
+        slot.release()
+
+def server_sent_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def chat_event_stream(events: Iterator[Dict], session_id: str, slot: SessionSlot) -> Iterator[str]:
+    """find_resources_stream events as SSE; the session's slot is held until the stream ends"""
+    try:
+        yield server_sent_event('session', {"session_id": session_id})
+        for event in events:
+            if event['type'] == 'token':
+                yield server_sent_event('token', {"content": event['content']})
+            elif event['type'] == 'interim':
+                # Text sent with a tool call: the tokens streamed so far were not the answer
+                yield server_sent_event('interim', {"content": event['content']})
+            elif event['type'] == 'tool_call':
+                yield server_sent_event('tool_call', {"name": event['name'], "args": event['args']})
+            elif event['type'] == 'final':
+                yield server_sent_event('done', {
+                    "reply": event['content'], "session_id": session_id,
+                    "cached": event['cached'], "fast_path": event['fast_path'],
+                    "degraded": event['degraded'],
+                    "time_to_first_token": round(event['time_to_first_token'], 4),
+                    "total_time": round(event['total_time'], 4)})
+    except Exception as e:
+        logger.error(f"Error streaming chat reply: {e}")
+        yield server_sent_event('error', {"error": CHAT_ERROR_REPLY})
+    finally:
+        events.close()
+        slot.release()
+
+@app.after_request
+def allow_chat_origins(response):
+    """CORS for /chat, which the web chatbot calls from its own origin"""
+    origin = request.headers.get('Origin')
+    if request.path == '/chat' and origin:
+        if '*' in CHAT_ALLOWED_ORIGINS:
+            response.headers['Access-Control-Allow-Origin'] = '*'
+        elif origin in CHAT_ALLOWED_ORIGINS:
+            response.headers['Access-Control-Allow-Origin'] = origin
+            response.headers['Vary'] = 'Origin'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Accept'
+        response.headers['Access-Control-Max-Age'] = '600'
+    return response
+
 @app.route('/retell/webhook', methods=['POST'])
 def retell_webhook():
     """
@@ -375,32 +647,73 @@ def retell_webhook():
             logger.warning("No JSON data received in webhook")
             return jsonify({"error": "No data received"}), 400
         
-        # Log the incoming event
-        logger.info(f"Received Retell webhook: {json.dumps(data, indent=2)}")
-        
         # Extract event type
         event_type = data.get('event')
         
-        if event_type == 'call_started':
-            return handle_call_started(data)
-        elif event_type == 'call_ended':
-            return handle_call_ended(data)
-        elif event_type == 'call_analyzed':
-            return handle_call_analyzed(data)
-        elif event_type == 'conversation_turn':
-            return handle_conversation_turn(data)
-        else:
-            logger.warning(f"Unknown event type: {event_type}")
-            return jsonify({"message": "Event received but not processed"}), 200
+        # Log the incoming event; the full payload only for sampled calls, serialized
+        # and redacted by the background writer
+        call_id = (data.get('call') or {}).get('call_id')
+        logger.info("retell_webhook", extra=log_fields(
+            event=event_type, call_id=call_id,
+            payload=data if sample_payload(call_id) else None))
+        
+        # A retried delivery (still running or already answered) gets the first one's response
+        (body, status, mimetype), duplicate = webhook_responses.run(
+            webhook_idempotency_key(data), lambda: handle_webhook_event(event_type, data))
+        if duplicate:
+            logger.info("retell_webhook_duplicate", extra=log_fields(event=event_type, call_id=call_id))
+        return Response(body, status, mimetype=mimetype)
             
     except Exception as e:
         logger.error(f"Error processing webhook: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+def webhook_idempotency_key(data: Dict) -> Optional[Tuple]:
+    """
+    Call ID and event, plus the turn's identity for conversation turns, or
+    None when the delivery names no call (it is then never deduplicated).
+    A turn is identified by an Idempotency-Key header or Retell's response_id
+    when the delivery has one. Otherwise it is the payload digest and its turn
+    number (see TurnNumbers), so a retry is the same turn whether it arrives
+    during or after the first delivery; the call's state is never consulted.
+    """
+    call_id = (data.get('call') or {}).get('call_id')
+    event_type = data.get('event')
+    if not call_id or not event_type:
+        return None
+    delivery_key = request.headers.get('Idempotency-Key')
+    if delivery_key:
+        return (call_id, event_type, delivery_key)
+    if event_type in CALL_LIFECYCLE_EVENTS:
+        return (call_id, event_type)
+    response_id = data.get('response_id')
+    if response_id is not None:
+        return (call_id, event_type, 'response', response_id)
+    digest = payload_digest(data)
+    return (call_id, event_type, 'turn', webhook_turns.number(call_id, digest), digest)
+
+def handle_webhook_event(event_type: str, data: Dict) -> Tuple[bytes, int, str]:
+    """Run the event's handler; (body, status, mimetype), so the response can be replayed"""
+    if event_type == 'call_started':
+        result = handle_call_started(data)
+    elif event_type == 'call_ended':
+        result = handle_call_ended(data)
+    elif event_type == 'call_analyzed':
+        result = handle_call_analyzed(data)
+    elif event_type == 'conversation_turn':
+        result = handle_conversation_turn(data)
+    else:
+        logger.warning(f"Unknown event type: {event_type}")
+        result = jsonify({"message": "Event received but not processed"}), 200
+    response = app.make_response(result)
+    return response.get_data(), response.status_code, response.mimetype
+
 def handle_call_started(data):
     """Handle call started event"""
-    call_id = data.get('call', {}).get('call_id')
+    call = data.get('call', {})
+    call_id = call.get('call_id')
     logger.info(f"Call started: {call_id}")
+    call_analytics.record('call_started', call_id, direction=call.get('direction'))
     
     return jsonify({
         "message": "Call started event received",
@@ -409,8 +722,13 @@ def handle_call_started(data):
 
 def handle_call_ended(data):
     """Handle call ended event"""
-    call_id = data.get('call', {}).get('call_id')
+    call = data.get('call', {})
+    call_id = call.get('call_id')
     logger.info(f"Call ended: {call_id}")
+    if call_id:
+        anthony.end_call(call_id, duration_ms=call_duration_ms(call),
+                         disconnection_reason=call.get('disconnection_reason'))
+        webhook_turns.forget(call_id)
     
     return jsonify({
         "message": "Call ended event received",
@@ -419,14 +737,25 @@ def handle_call_ended(data):
 
 def handle_call_analyzed(data):
     """Handle call analyzed event"""
-    call_id = data.get('call', {}).get('call_id')
+    call = data.get('call', {})
+    call_id = call.get('call_id')
     logger.info(f"Call analyzed: {call_id}")
+    analysis = call.get('call_analysis') or {}
+    call_analytics.record('call_analyzed', call_id, user_sentiment=analysis.get('user_sentiment'),
+                          call_successful=analysis.get('call_successful'))
     
     return jsonify({
         "message": "Call analyzed event received",
         "call_id": call_id
     })
 
+def call_duration_ms(call: Dict) -> Optional[int]:
+    """Length of a Retell call from its start/end timestamps (epoch ms), if both are present"""
+    start, end = call.get('start_timestamp'), call.get('end_timestamp')
+    if isinstance(start, (int, float)) and isinstance(end, (int, float)):
+        return int(end - start)
+    return None
+
 def handle_conversation_turn(data):
     """Handle conversation turn - this is where we process user input and generate responses"""
     try:
@@ -434,7 +763,7 @@ def handle_conversation_turn(data):
         user_input = data.get('transcript', '')
         call_id = data.get('call', {}).get('call_id', 'unknown')
         
-        logger.info(f"Processing conversation turn for call {call_id}: {user_input}")
+        logger.info("conversation_turn", extra=log_fields(call_id=call_id, transcript=user_input))
         
         if not user_input.strip():
             return jsonify({
@@ -448,7 +777,7 @@ def handle_conversation_turn(data):
             anthony_response = anthony.process_user_input(call_id, user_input)
             
             # Log the conversation turn
-            logger.info(f"Anthony response: {anthony_response}")
+            logger.info("anthony_response", extra=log_fields(call_id=call_id, response=anthony_response))
             
             return jsonify({
                 "response": anthony_response,
@@ -545,4 +874,5 @@ if __name__ == '__main__':
     debug = os.environ.get('DEBUG', 'False').lower() == 'true'
     
     logger.info(f"Starting Flask app on port {port}")
+    threading.Thread(target=prepare_for_serving, daemon=True).start()
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Time to first byte for /chat: JSON reply vs. Server-Sent Events.
+
+Serves the app in this process on a local port and asks two kinds of
+question, each in a new chat session:
+- catalog: answered by the fast-path router from the built-in catalogs
+  (the real ResourceAgent, no API keys needed)
+- model: answered by a stand-in chat model that streams a 60-word answer
+  at --token-ms per word, standing in for Groq
+
+The JSON client only has something to show once the whole reply has
+arrived. The SSE client is timed at its first `token` event and again at
+`done`. Reports p50/p99 milliseconds.
+
+Usage:
+    python benchmark_chat.py [--requests 200] [--token-ms 5]
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from werkzeug.serving import make_server
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from evaluate_fast_path import SAMPLE_QUERIES  # noqa: E402
+from run_agent import percentile  # noqa: E402
+
+MODEL_ANSWER = " ".join(["Here is what I found for you in your area."] * 6)
+
+
+class StreamingModel(GenericFakeChatModel):
+    """Takes token_delay seconds per word of its answer, streamed word by word or returned whole"""
+    token_delay: float = 0.0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        time.sleep(self.token_delay * len(result.generations[0].message.content.split()))
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = super()._generate(messages, stop=stop, **kwargs).generations[0].message
+        for word in re.findall(r'\S+\s*', message.content):
+            time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word, id=message.id))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def ask_json(connection, message):
+    start = time.perf_counter()
+    connection.request('POST', '/chat', body=json.dumps({'message': message}),
+                       headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    assert json.loads(response.read())['reply']
+    return time.perf_counter() - start
+
+
+def ask_sse(connection, message):
+    start = time.perf_counter()
+    connection.request('POST', '/chat', body=json.dumps({'message': message}),
+                       headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'})
+    response = connection.getresponse()
+    first = None
+    while True:
+        line = response.readline()
+        if not line or line.startswith(b'event: done'):
+            break
+        if first is None and line.startswith(b'event: token'):
+            first = time.perf_counter() - start
+    done = time.perf_counter() - start
+    response.read()
+    return first, done
+
+
+def run(port, kind, requests, catalog_queries):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    queries = itertools.cycle(catalog_queries)
+    json_times, first_times, done_times = [], [], []
+    for i in range(requests):
+        if kind == 'catalog':
+            json_message = sse_message = next(queries)
+        else:
+            # Unique questions, so every one reaches the model
+            json_message, sse_message = (f"Question {i}{suffix}: what is a notice to quit?"
+                                         for suffix in 'ab')
+        json_times.append(ask_json(connection, json_message))
+        first, done = ask_sse(connection, sse_message)
+        first_times.append(first)
+        done_times.append(done)
+    connection.close()
+    return json_times, first_times, done_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--token-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    import app as app_module
+    from answer_cache import AnswerCache
+    from Untapped_Resource_Agent import ResourceAgent
+    logging.getLogger().setLevel(logging.WARNING)
+    app_module.prepare_for_serving()
+
+    model = StreamingModel(messages=(AIMessage(content=MODEL_ANSWER) for _ in itertools.count()),
+                           token_delay=args.token_ms / 1000)
+    # Labeled catalog questions the router does answer at its current threshold
+    catalog_queries = [query for query, fast_path, _ in SAMPLE_QUERIES
+                       if fast_path and app_module.resource_agent.router.route(query) is not None]
+    # Exact repeats only: near-duplicate matching would answer the numbered questions from cache
+    model_agent = ResourceAgent(model=model, search=None, answer_cache=AnswerCache(near_duplicates=False))
+    agents = {'catalog': app_module.resource_agent, 'model': model_agent}
+
+    port = free_port()
+    server = make_server('127.0.0.1', port, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"💬 /chat time to first byte ({args.requests} requests each, p50 / p99 ms)")
+    print("-" * 74)
+    print(f"{'question':10s} {'json reply':>16s} {'sse first token':>16s} {'sse done':>16s} {'speedup':>8s}")
+    for kind, agent in agents.items():
+        app_module.resource_agent = agent
+        run(port, kind, 10, catalog_queries)   # warm up
+        timings = run(port, kind, args.requests, catalog_queries)
+        cells = [f"{percentile(sorted(t), 50) * 1e3:6.2f} / {percentile(sorted(t), 99) * 1e3:6.2f}"
+                 for t in timings]
+        speedup = percentile(sorted(timings[0]), 50) / percentile(sorted(timings[1]), 50)
+        print(f"{kind:10s} {cells[0]:>16s} {cells[1]:>16s} {cells[2]:>16s} {speedup:>7.1f}x")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Anthony's per-turn keyword analysis: four substring passes vs. one.
+
+The old persona scanned each transcript four times (detect_language,
+check_urgent_situation, detect_need_type, extract_user_intent), each pass an
+`any(keyword in text.lower() ...)` over its own keyword lists. The legacy
+functions are reproduced below as the reference. KeywordMatcher tokenizes
+once and looks words up in a single precompiled table.
+
+Reports microseconds per turn for both and lists the transcripts where the
+answers differ (substring hits such as "aid" in "said" that whole-word
+matching no longer reports, and inflected words it now recognizes).
+
+Usage:
+    python benchmark_keyword_matcher.py [--turns 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+from keyword_matcher import (INTENT_CATEGORY_KEYWORDS, INTENT_URGENCY_KEYWORDS,  # noqa: E402
+                             NEED_KEYWORDS, KeywordMatcher)
+from message_catalog import default_catalog  # noqa: E402
+
+LANGUAGE_KEYWORDS = default_catalog().keywords['detect']
+URGENT_KEYWORDS = default_catalog().keywords['urgent']
+
+TRANSCRIPTS = [
+    "I need help with my electric bill",
+    "Hi, I'm calling because I can't pay my bills this month and I have two kids",
+    "They said my power gets shut off today, what do I do",
+    "I'm behind on rent and my landlord gave me an eviction notice",
+    "I lost my job last week and I'm looking for work or training",
+    "We don't have enough food for the kids, can you help us find groceries",
+    "My mother needs a doctor but she doesn't have insurance",
+    "I'm a veteran and I heard there's financial assistance I might qualify for",
+    "Atlanta, GA 30303",
+    "My name is Maria",
+    "34",
+    "About eighteen thousand a year",
+    "Can you text me those links?",
+    "Hola, necesito ayuda con la renta por favor",
+    "Bonjour, j'ai besoin d'aide pour mon loyer",
+    "Hallo, ich brauche Hilfe mit meiner Stromrechnung",
+    "नमस्ते, मुझे बिजली बिल के लिए मदद चाहिए",
+    "Привет, мне нужно помощь с едой",
+    "Olá, preciso de ajuda com comida",
+    "こんにちは、家賃の助けが必要です",
+    "Ciao, ho bisogno di aiuto per favore",
+    "Hallo, ik heb hulp nodig met huur",
+    "It's urgent, I need something right now",
+    "Is there anything I can do soon about the heating before winter",
+    "That's great, thank you so much, you've been really helpful",
+]
+
+
+def legacy_detect_language(text: str) -> str:
+    text_lower = text.lower()
+    for language, keywords in LANGUAGE_KEYWORDS.items():
+        if any(word in text_lower for word in keywords):
+            return language
+    return 'en'
+
+
+def legacy_check_urgent(text: str, language: str) -> bool:
+    keywords = URGENT_KEYWORDS.get(language, URGENT_KEYWORDS['en'])
+    return any(keyword in text.lower() for keyword in keywords)
+
+
+def legacy_detect_need(text: str) -> str:
+    user_lower = text.lower()
+    for need, keywords in NEED_KEYWORDS.items():
+        if any(keyword in user_lower for keyword in keywords):
+            return need
+    return 'general'
+
+
+def legacy_intent(text: str) -> dict:
+    text_lower = text.lower()
+    intent = {'category': 'general', 'urgency': 'normal', 'specific_need': None}
+    for category, keywords in INTENT_CATEGORY_KEYWORDS.items():
+        if any(word in text_lower for word in keywords):
+            intent['category'] = category
+            break
+    for urgency, keywords in INTENT_URGENCY_KEYWORDS.items():
+        if any(word in text_lower for word in keywords):
+            intent['urgency'] = urgency
+            break
+    return intent
+
+
+def legacy_turn(text: str):
+    language = legacy_detect_language(text)
+    return language, legacy_check_urgent(text, language), legacy_detect_need(text), legacy_intent(text)
+
+
+def single_pass_turn(matcher: KeywordMatcher, text: str):
+    analysis = matcher.analyze(text)
+    return analysis.language, analysis.is_urgent(analysis.language), analysis.need, analysis.intent
+
+
+def time_turns(func, turns, repeats: int = 5):
+    """Best-of-repeats total time, plus per-transcript latencies from the best run"""
+    best, best_latencies = None, None
+    for _ in range(repeats):
+        latencies = []
+        start = time.perf_counter()
+        for text in turns:
+            t0 = time.perf_counter()
+            func(text)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best, best_latencies = elapsed, latencies
+    return best, sorted(best_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--turns', type=int, default=200000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher.from_catalog(default_catalog())
+    build = time.perf_counter() - start
+
+    rng = random.Random(18)
+    turns = [rng.choice(TRANSCRIPTS) for _ in range(args.turns)]
+
+    print(f"🔤 Keyword analysis ({args.turns} turns, {len(TRANSCRIPTS)} distinct transcripts, "
+          f"matcher built in {build * 1e3:.2f} ms)")
+    print("-" * 64)
+    print(f"{'approach':14s} {'total s':>9s} {'µs/turn':>9s} {'p50 µs':>9s} {'p99 µs':>9s}")
+    results = {}
+    for name, func in (('four-pass', legacy_turn),
+                       ('single-pass', lambda text: single_pass_turn(matcher, text))):
+        elapsed, latencies = time_turns(func, turns)
+        results[name] = elapsed
+        print(f"{name:14s} {elapsed:>9.3f} {elapsed / len(turns) * 1e6:>9.2f} "
+              f"{percentile(latencies, 50) * 1e6:>9.2f} {percentile(latencies, 99) * 1e6:>9.2f}")
+    print(f"Speedup: {results['four-pass'] / results['single-pass']:.2f}x")
+
+    print("\nTranscripts where the answers differ (language, urgent, need, intent):")
+    differences = 0
+    for text in TRANSCRIPTS:
+        old, new = legacy_turn(text), single_pass_turn(matcher, text)
+        if old != new:
+            differences += 1
+            print(f"  {text!r}\n    four-pass:   {old}\n    single-pass: {new}")
+    print(f"{differences} of {len(TRANSCRIPTS)} transcripts differ")
+
+
+if __name__ == '__main__':
+    main()
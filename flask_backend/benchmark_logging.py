@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Request-thread cost of logging one Retell conversation turn: old vs. new.
+
+The old webhook logged json.dumps(payload, indent=2) plus two f-string
+lines at INFO through a synchronous StreamHandler. The new path logs three
+structured records into structured_log's bounded queue; a background
+thread redacts, serializes and writes them, and samples full payloads at
+LOG_PAYLOAD_SAMPLE_RATE.
+
+Both write to a temporary file. The slow-sink run adds a delay to every
+write, standing in for a blocked pipe or disk, to show what request threads
+wait for.
+
+Usage:
+    python benchmark_logging.py [--turns 5000] [--words 400] [--sample-rate 0.01]
+                                [--slow-write-ms 1]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+from structured_log import AsyncLogging, log_fields, sample_payload  # noqa: E402
+
+RESPONSE = "Thanks. What's your name? You can skip this if you prefer."
+
+
+def retell_payload(call: int, words: int) -> dict:
+    """A conversation_turn payload shaped like Retell's, with a transcript of about `words` words"""
+    utterance = "I need help with my electric bill and my number is 404 555 0199 and I live at 12 Peachtree St"
+    tokens = (utterance.split() * (words // len(utterance.split()) + 1))[:words]
+    transcript_object = [{'role': 'user' if i % 2 else 'agent', 'content': ' '.join(tokens[i:i + 20]),
+                          'words': [{'word': w, 'start': j * 0.3, 'end': j * 0.3 + 0.25}
+                                    for j, w in enumerate(tokens[i:i + 20])]}
+                         for i in range(0, len(tokens), 20)]
+    return {
+        'event': 'conversation_turn',
+        'transcript': ' '.join(tokens[-20:]),
+        'call': {
+            'call_id': f'call-{call}', 'agent_id': 'agent-anthony', 'call_status': 'ongoing',
+            'from_number': '+14045550199', 'to_number': '+18005550100', 'direction': 'inbound',
+            'start_timestamp': 1760000000000 + call, 'transcript': ' '.join(tokens),
+            'transcript_object': transcript_object,
+            'metadata': {}, 'retell_llm_dynamic_variables': {'customer_name': 'Maria'},
+        },
+    }
+
+
+class SlowFile(io.TextIOWrapper):
+    """A file whose every write takes at least delay seconds"""
+
+    def __init__(self, path: str, delay: float):
+        super().__init__(open(path, 'wb'), encoding='utf-8')
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return super().write(text)
+
+
+def old_logging(logger, data):
+    user_input = data.get('transcript', '')
+    call_id = data.get('call', {}).get('call_id', 'unknown')
+    logger.info(f"Received Retell webhook: {json.dumps(data, indent=2)}")
+    logger.info(f"Processing conversation turn for call {call_id}: {user_input}")
+    logger.info(f"Anthony response: {RESPONSE}")
+
+
+def new_logging(logger, data):
+    event_type = data.get('event')
+    call_id = (data.get('call') or {}).get('call_id')
+    logger.info("retell_webhook", extra=log_fields(
+        event=event_type, call_id=call_id, payload=data if sample_payload(call_id) else None))
+    logger.info("conversation_turn", extra=log_fields(call_id=call_id, transcript=data.get('transcript', '')))
+    logger.info("anthony_response", extra=log_fields(call_id=call_id, response=RESPONSE))
+
+
+def run(kind: str, payloads, stream):
+    logger = logging.getLogger(f'bench.{kind}')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    async_logging = None
+    if kind == 'old':
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+        log_turn = old_logging
+    else:
+        async_logging = AsyncLogging(stream=stream)
+        handler = async_logging.handler
+        log_turn = new_logging
+    logger.handlers = [handler]
+
+    latencies = []
+    start = time.perf_counter()
+    for data in payloads:
+        t0 = time.perf_counter()
+        log_turn(logger, data)
+        latencies.append(time.perf_counter() - t0)
+    request_side = time.perf_counter() - start
+    dropped = 0
+    if async_logging is not None:
+        async_logging.flush(timeout=600)
+        dropped = async_logging.handler.dropped
+        async_logging.stop()
+    stream.flush()
+    return sorted(latencies), request_side, time.perf_counter() - start, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--turns', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=400, help='Words in each call transcript')
+    parser.add_argument('--sample-rate', type=float, default=0.01, help='LOG_PAYLOAD_SAMPLE_RATE')
+    parser.add_argument('--slow-write-ms', type=float, default=1.0)
+    parser.add_argument('--slow-turns', type=int, default=500)
+    args = parser.parse_args()
+
+    import structured_log
+    structured_log.LOG_PAYLOAD_SAMPLE_RATE = args.sample_rate
+
+    payloads = [retell_payload(call, args.words) for call in range(args.turns)]
+    print(f"🪵 Logging one webhook turn ({args.turns} turns, {args.words}-word transcripts, "
+          f"{len(json.dumps(payloads[0])) / 1024:.1f} KB payloads, payload sample rate {args.sample_rate})")
+    print("-" * 84)
+    print(f"{'sink':10s} {'approach':9s} {'µs/turn':>9s} {'p50 µs':>8s} {'p99 µs':>9s} "
+          f"{'drained s':>10s} {'dropped':>8s} {'log MB':>8s}")
+    with tempfile.TemporaryDirectory() as directory:
+        for sink, turns in (('file', args.turns), ('slow', args.slow_turns)):
+            for kind in ('old', 'new'):
+                path = os.path.join(directory, f'{sink}-{kind}.log')
+                stream = (open(path, 'w', encoding='utf-8') if sink == 'file'
+                          else SlowFile(path, args.slow_write_ms / 1000))
+                latencies, request_side, total, dropped = run(kind, payloads[:turns], stream)
+                stream.close()
+                print(f"{sink:10s} {kind:9s} {request_side / turns * 1e6:>9.1f} "
+                      f"{percentile(latencies, 50) * 1e6:>8.1f} {percentile(latencies, 99) * 1e6:>9.1f} "
+                      f"{total:>10.2f} {dropped:>8d} {os.path.getsize(path) / 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
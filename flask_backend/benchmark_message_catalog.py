@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Anthony's translated replies: per-turn dicts vs. the catalog.
+
+The old handle_* methods built a dict of all ten translations on every turn
+(f-string formatting all ten where the message had a placeholder) and then
+picked one. That is reproduced here from the same anthony_messages.json
+data. MessageCatalog.render() looks up one precompiled template and
+formats only that one.
+
+Reports microseconds per reply and the bytes allocated per reply (traced
+peak above the baseline) for each approach.
+
+Usage:
+    python benchmark_message_catalog.py [--replies 200000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+from message_catalog import DEFAULT_MESSAGES_PATH, MessageCatalog  # noqa: E402
+
+NEEDS = ['energy', 'housing', 'food', 'money', 'health', 'employment', 'general']
+
+
+def legacy_renderer(catalog: dict):
+    """render(language, key, **values) as the old methods did it: all languages, then .get()"""
+    languages = {code: entry['messages'] for code, entry in catalog.items()}
+
+    def render(language, key, **values):
+        if values:
+            responses = {code: messages[key].format(**values) for code, messages in languages.items()}
+        else:
+            responses = {code: messages[key] for code, messages in languages.items()}
+        return responses.get(language, responses['en'])
+    return render
+
+
+def replies(count: int, languages, keys):
+    rng = random.Random(19)
+    return [(rng.choice(languages), rng.choice(keys), rng.choice(NEEDS)) for _ in range(count)]
+
+
+def run(render, workload):
+    latencies = []
+    start = time.perf_counter()
+    for language, key, need in workload:
+        t0 = time.perf_counter()
+        if key == 'ask_location':
+            render(language, key, need_type=need)
+        else:
+            render(language, key)
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def bytes_per_reply(render, workload, sample: int = 2000):
+    """Average traced allocation peak of one reply, above what is already held"""
+    total = 0
+    tracemalloc.start()
+    for language, key, need in workload[:sample]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = render(language, key, need_type=need) if key == 'ask_location' else render(language, key)
+        total += tracemalloc.get_traced_memory()[1] - before
+        del result
+    tracemalloc.stop()
+    return total / min(sample, len(workload))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--replies', type=int, default=200000)
+    parser.add_argument('--path', default=DEFAULT_MESSAGES_PATH)
+    args = parser.parse_args()
+
+    with open(args.path, encoding='utf-8') as f:
+        data = json.load(f)
+    start = time.perf_counter()
+    catalog = MessageCatalog(data)
+    load = time.perf_counter() - start
+
+    workload = replies(args.replies, list(data), list(catalog.message_keys))
+    renderers = {'per-turn dict': legacy_renderer(data), 'catalog': catalog.render}
+
+    # Both must say the same thing
+    legacy = renderers['per-turn dict']
+    for language, key, need in workload[:1000]:
+        assert legacy(language, key, need_type=need) == catalog.render(language, key, need_type=need)
+
+    print(f"🌐 Anthony replies ({args.replies} replies, {len(data)} languages, "
+          f"catalog built in {load * 1e3:.2f} ms)")
+    print("-" * 66)
+    print(f"{'approach':15s} {'µs/reply':>9s} {'p50 µs':>8s} {'p99 µs':>8s} {'bytes/reply':>12s}")
+    results = {}
+    for name, render in renderers.items():
+        run(render, workload[:10000])   # warm up
+        elapsed, latencies = run(render, workload)
+        results[name] = elapsed
+        print(f"{name:15s} {elapsed / len(workload) * 1e6:>9.2f} {percentile(latencies, 50) * 1e6:>8.2f} "
+              f"{percentile(latencies, 99) * 1e6:>8.2f} {bytes_per_reply(render, workload):>12.0f}")
+    print(f"Speedup: {results['per-turn dict'] / results['catalog']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
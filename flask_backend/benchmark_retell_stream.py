@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Time to first speakable text per turn: /retell/webhook vs. the LLM WebSocket.
+
+A fake Retell client plays whole calls (need, location, name, age, income,
+follow-up) against both paths, served in this process on local ports.
+- Webhook: one keep-alive HTTP POST per turn. Retell can only start speaking
+  once the whole JSON reply has arrived, so the first chunk arrives with the
+  complete reply.
+- WebSocket: one connection per call, with a response_required event per
+  turn. Timing stops at the first non-empty `response` chunk, and again at
+  content_complete.
+
+Reports p50/p99 milliseconds per conversation step.
+
+Usage:
+    python benchmark_retell_stream.py [--calls 200]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from websockets.sync.client import connect
+from werkzeug.serving import make_server
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+
+TURNS = [('need', "I need help with my electric bill"), ('location', "Atlanta, GA 30303"),
+         ('name', "Maria"), ('age', "34"), ('income', "18000"), ('follow-up', "Can you text me those links?")]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def webhook_calls(port: int, calls: int):
+    timings = defaultdict(list)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for call in range(calls):
+        for step, text in TURNS:
+            body = json.dumps({'event': 'conversation_turn', 'transcript': text,
+                               'call': {'call_id': f'webhook-{call}'}})
+            start = time.perf_counter()
+            connection.request('POST', '/retell/webhook', body=body,
+                               headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            assert json.loads(response.read())['response']
+            timings[step].append(time.perf_counter() - start)
+    connection.close()
+    return timings
+
+
+def websocket_calls(port: int, calls: int):
+    first, complete = defaultdict(list), defaultdict(list)
+    for call in range(calls):
+        with connect(f'ws://127.0.0.1:{port}/llm-websocket/ws-{call}', compression=None) as websocket:
+            # config, then the greeting (response_id 0)
+            while not json.loads(websocket.recv()).get('content_complete'):
+                pass
+            transcript = []
+            for response_id, (step, text) in enumerate(TURNS, 1):
+                transcript.append({'role': 'user', 'content': text})
+                start = time.perf_counter()
+                websocket.send(json.dumps({'interaction_type': 'response_required',
+                                           'response_id': response_id, 'transcript': transcript}))
+                reply = ''
+                while True:
+                    event = json.loads(websocket.recv())
+                    if event.get('response_id') != response_id:
+                        continue
+                    if event['content'] and not reply:
+                        first[step].append(time.perf_counter() - start)
+                    reply += event['content']
+                    if event['content_complete']:
+                        complete[step].append(time.perf_counter() - start)
+                        break
+                transcript.append({'role': 'agent', 'content': reply})
+    return first, complete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    from app import app, prepare_for_serving
+    import retell_ws
+    logging.getLogger().setLevel(logging.WARNING)
+    prepare_for_serving()
+
+    http_port, ws_port = free_port(), free_port()
+    server = make_server('127.0.0.1', http_port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    retell_ws.start_in_thread('127.0.0.1', ws_port)
+
+    webhook_calls(http_port, 10)   # warm up both paths
+    websocket_calls(ws_port, 10)
+    webhook = webhook_calls(http_port, args.calls)
+    first, complete = websocket_calls(ws_port, args.calls)
+    server.shutdown()
+
+    print(f"🎙️  Time to first speakable text per turn ({args.calls} calls, p50 / p99 ms)")
+    print("-" * 74)
+    print(f"{'step':10s} {'webhook reply':>16s} {'ws first chunk':>16s} {'ws complete':>16s} {'speedup':>8s}")
+    for step, _ in TURNS:
+        cells = [f"{percentile(sorted(t[step]), 50) * 1e3:6.2f} / {percentile(sorted(t[step]), 99) * 1e3:6.2f}"
+                 for t in (webhook, first, complete)]
+        speedup = percentile(sorted(webhook[step]), 50) / percentile(sorted(first[step]), 50)
+        print(f"{step:10s} {cells[0]:>16s} {cells[1]:>16s} {cells[2]:>16s} {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for /retell/webhook: development server vs. prefork server.
+
+Starts each server as a subprocess on a free port, waits for /ready, then
+replays Retell conversation turns (need, location, name, age, income and a
+follow-up per call) from concurrent keep-alive clients, and reports
+requests per second and latency percentiles for each.
+
+Usage:
+    python benchmark_server.py [--requests 3000] [--concurrency 16]
+                               [--workers N] [--threads 8] [--servers dev,prefork]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TURNS = ["I need help with my electric bill", "Atlanta, GA 30303", "Maria", "34",
+         "18000", "Can you text me those links?"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind: str, port: int, workers: int, threads: int, state_dir: str):
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', WEB_CONCURRENCY=str(workers),
+               THREADS=str(threads), LOG_LEVEL='warning',
+               CALL_STATE_PATH=os.path.join(state_dir, f'{kind}.db'))
+    command = [sys.executable, 'run_server.py'] + (['--production'] if kind == 'prefork' else [])
+    process = subprocess.Popen(command, cwd=HERE, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/ready')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not become ready on port {port}")
+
+
+def run_load(port: int, total: int, concurrency: int):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def client(client_id: int):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine, call = [], 0
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                break
+            turn = n % len(TURNS)
+            if turn == 0:
+                call += 1
+            body = json.dumps({'event': 'conversation_turn', 'transcript': TURNS[turn],
+                               'call': {'call_id': f'bench-{client_id}-{call}'}})
+            start = time.perf_counter()
+            try:
+                connection.request('POST', '/retell/webhook', body=body,
+                                   headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(type(e).__name__)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sorted(latencies), errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--servers', default='dev,prefork')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as state_dir:
+        for kind in args.servers.split(','):
+            port = free_port()
+            process = start_server(kind, port, args.workers, args.threads, state_dir)
+            try:
+                run_load(port, min(200, args.requests), args.concurrency)   # warm connections and caches
+                results[kind] = run_load(port, args.requests, args.concurrency)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    print(f"📊 /retell/webhook load ({args.requests} turns, {args.concurrency} clients, "
+          f"prefork {args.workers} workers x {args.threads} threads, {os.cpu_count()} CPUs)")
+    print("-" * 72)
+    print(f"{'server':10s} {'req/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'max ms':>9s} {'errors':>7s}")
+    for kind, (latencies, errors, elapsed) in results.items():
+        print(f"{kind:10s} {len(latencies) / elapsed:>9.0f} {percentile(latencies, 50) * 1e3:>9.1f} "
+              f"{percentile(latencies, 99) * 1e3:>9.1f} {latencies[-1] * 1e3:>9.1f} {len(errors):>7d}")
+
+
+if __name__ == '__main__':
+    main()
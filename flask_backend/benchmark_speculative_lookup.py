@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Latency of Anthony's final intake turn with and without the speculative lookup.
+
+Plays whole calls (need, location, name, age, income) through
+AnthonyPersona.process_user_input. A short pause after each turn stands in
+for the seconds Retell spends speaking the next question; the pause is
+where the prefetched lookup runs. The baseline persona never prefetches,
+so its income turn does the eligibility screen and the nearby search
+inline. Reports p50/p99 microseconds per turn.
+
+Usage:
+    python benchmark_speculative_lookup.py [--calls 2000] [--pause-ms 2]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run_agent import percentile  # noqa: E402
+
+TURNS = [('need', "I need help with my electric bill"), ('location', "Atlanta, GA 30303"),
+         ('name', "Maria"), ('age', "34"), ('income', "18000")]
+
+
+def play_calls(persona, calls: int, pause: float, prefix: str):
+    timings = defaultdict(list)
+    for call in range(calls):
+        call_id = f'{prefix}-{call}'
+        for step, text in TURNS:
+            start = time.perf_counter()
+            persona.process_user_input(call_id, text)
+            timings[step].append(time.perf_counter() - start)
+            time.sleep(pause)
+        persona.end_call(call_id)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--pause-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    from app import AnthonyPersona, prepare_for_serving
+    from call_state import MemoryCallStateStore
+    logging.getLogger().setLevel(logging.WARNING)
+    prepare_for_serving()
+
+    speculative = AnthonyPersona(call_states=MemoryCallStateStore())
+    baseline = AnthonyPersona(call_states=MemoryCallStateStore())
+    baseline.prefetch_resources = lambda call_id, state: None
+
+    pause = args.pause_ms / 1000
+    play_calls(baseline, 50, pause, 'warm')
+    play_calls(speculative, 50, pause, 'warm')
+    results = {'inline': play_calls(baseline, args.calls, pause, 'inline'),
+               'speculative': play_calls(speculative, args.calls, pause, 'speculative')}
+
+    print(f"🔮 Anthony turn latency ({args.calls} calls, p50 / p99 µs)")
+    print("-" * 52)
+    print(f"{'step':10s} {'inline':>18s} {'speculative':>18s}")
+    for step, _ in TURNS:
+        cells = [f"{percentile(sorted(t[step]), 50) * 1e6:7.1f} / {percentile(sorted(t[step]), 99) * 1e6:7.1f}"
+                 for t in results.values()]
+        print(f"{step:10s} {cells[0]:>18s} {cells[1]:>18s}")
+    print(f"\nLookups: {speculative.lookups.stats()}")
+
+
+if __name__ == '__main__':
+    main()
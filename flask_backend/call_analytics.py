@@ -0,0 +1,348 @@
+"""
+Write-behind store for call analytics: conversation turns and call events.
+
+record() is called on the webhook path. It appends a tuple to a bounded
+in-memory ring buffer and returns; nothing is serialized or written on the
+request thread. A background thread drains the buffer every flush_seconds
+(sooner once batch_size events are waiting) and writes each batch to SQLite
+in one transaction. When the buffer is full, the oldest unwritten event is
+overwritten and counted as dropped instead of blocking the request.
+
+Events go to one append-only file per UTC day, so the files rotate
+without renaming anything a prefork worker may still have open:
+
+    call_analytics.db  ->  call_analytics-2026-10-17.db, call_analytics-2026-10-18.db, ...
+
+Files older than keep_days are deleted when a new day's file is opened.
+Each row is one event:
+
+    turn           the step the caller answered, language, need and reply latency
+    call_started   Retell's call_started webhook
+    call_ended     the step the call was at when it ended, duration and disconnection reason
+    call_analyzed  Retell's post-call sentiment and success flag
+
+Transcripts and replies kept with turns are redacted by the writer the
+same way as the logs (LOG_TRANSCRIPTS).
+
+Usage:
+    python call_analytics.py report [--path call_analytics.db] [--days 7]
+    python call_analytics.py history CALL_ID [--path call_analytics.db] [--days 7]
+
+Environment variables:
+    CALL_ANALYTICS_PATH           base path of the daily files; empty disables recording
+                                  (default: call_analytics.db next to this file)
+    CALL_ANALYTICS_BUFFER_SIZE    events held in memory before the oldest are dropped (default: 10000)
+    CALL_ANALYTICS_BATCH_SIZE     events written per transaction (default: 500)
+    CALL_ANALYTICS_FLUSH_SECONDS  longest an event waits in memory (default: 1)
+    CALL_ANALYTICS_KEEP_DAYS      daily files kept (default: 30)
+"""
+
+import argparse
+import atexit
+import glob
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from structured_log import redact
+
+logger = logging.getLogger(__name__)
+
+CALL_ANALYTICS_PATH = os.environ.get(
+    'CALL_ANALYTICS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'call_analytics.db')
+)
+CALL_ANALYTICS_BUFFER_SIZE = int(os.environ.get('CALL_ANALYTICS_BUFFER_SIZE', 10000))
+CALL_ANALYTICS_BATCH_SIZE = int(os.environ.get('CALL_ANALYTICS_BATCH_SIZE', 500))
+CALL_ANALYTICS_FLUSH_SECONDS = float(os.environ.get('CALL_ANALYTICS_FLUSH_SECONDS', 1.0))
+CALL_ANALYTICS_KEEP_DAYS = int(os.environ.get('CALL_ANALYTICS_KEEP_DAYS', 30))
+
+# Anthony's conversation steps in the order a call goes through them
+STEPS = ['greeting', 'collecting_location', 'collecting_name', 'collecting_age',
+         'collecting_income', 'providing_resources']
+
+COLUMNS = ('ts', 'event', 'call_id', 'step', 'language', 'need', 'latency_ms', 'detail')
+_DAY_SUFFIX = re.compile(r'-(\d{4}-\d{2}-\d{2})$')
+
+
+def day_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+
+
+def daily_path(path: str, day: str) -> str:
+    """call_analytics.db -> call_analytics-<day>.db"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{day}{ext}"
+
+
+def analytics_files(path: str = CALL_ANALYTICS_PATH) -> Dict[str, str]:
+    """day -> file for every daily file of this base path, oldest first"""
+    stem, ext = os.path.splitext(path)
+    files = {}
+    for name in glob.glob(f"{glob.escape(stem)}-*{ext}"):
+        match = _DAY_SUFFIX.search(os.path.splitext(name)[0])
+        if match:
+            files[match.group(1)] = name
+    return dict(sorted(files.items()))
+
+
+class CallAnalytics:
+    """Ring buffer of call events and the background thread that writes them out"""
+
+    def __init__(self, path: str = CALL_ANALYTICS_PATH, buffer_size: int = CALL_ANALYTICS_BUFFER_SIZE,
+                 batch_size: int = CALL_ANALYTICS_BATCH_SIZE,
+                 flush_seconds: float = CALL_ANALYTICS_FLUSH_SECONDS,
+                 keep_days: int = CALL_ANALYTICS_KEEP_DAYS, clock: Callable[[], float] = time.time):
+        if buffer_size < 1 or batch_size < 1:
+            raise ValueError("buffer_size and batch_size must be at least 1")
+        self.path = path
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.keep_days = keep_days
+        self.clock = clock
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._buffer: deque = deque(maxlen=self.buffer_size)
+        # Events taken from the buffer and not yet committed
+        self._writing = 0
+        self._wake = threading.Event()
+        # Started on the first event, so a preloading master forks before any thread exists
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._day: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, event: str, call_id: Optional[str], step: Optional[str] = None,
+               language: Optional[str] = None, need: Optional[str] = None,
+               latency_ms: Optional[float] = None, **detail):
+        """Queue one event; returns at once. detail is serialized (and redacted) by the writer"""
+        if not self.path:
+            return
+        row = (self.clock(), event, call_id, step, language, need, latency_ms, detail or None)
+        with self._lock:
+            if len(self._buffer) == self.buffer_size:
+                self.dropped += 1
+            self._buffer.append(row)
+            self.recorded += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='call-analytics', daemon=True)
+                self._thread.start()
+            batch_ready = len(self._buffer) >= self.batch_size
+        if batch_ready:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                self._writing = len(batch)
+            if not batch:
+                return
+            try:
+                self._write(batch)
+                with self._lock:
+                    self.written += len(batch)
+                    self.batches += 1
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(batch)} call analytics events: {e}")
+                with self._lock:
+                    self.failed += len(batch)
+            finally:
+                with self._lock:
+                    self._writing = 0
+
+    def _write(self, batch: List[tuple]):
+        # A batch can straddle midnight; each day's events go to that day's file
+        for day, rows in itertools.groupby(batch, key=lambda row: day_of(row[0])):
+            conn = self._connection(day)
+            conn.executemany(
+                "INSERT INTO call_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row[:7] + (json.dumps(redact(row[7]), ensure_ascii=False, separators=(',', ':'),
+                                       default=str) if row[7] else None,)
+                 for row in rows]
+            )
+            conn.commit()
+
+    def _connection(self, day: str) -> sqlite3.Connection:
+        if day == self._day:
+            return self._conn
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = open_day(daily_path(self.path, day))
+        self._day = day
+        self._remove_expired(day)
+        return self._conn
+
+    def _remove_expired(self, today: str):
+        oldest = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=self.keep_days - 1)).strftime('%Y-%m-%d')
+        for day, name in analytics_files(self.path).items():
+            if day < oldest:
+                for leftover in (name, name + '-wal', name + '-shm'):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until every event recorded so far has been written (or failed)"""
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._thread is None or (not self._buffer and not self._writing):
+                    return
+            time.sleep(0.001)
+
+    def after_fork(self):
+        """Forget the parent's buffer, writer and connection; threads do not survive fork()"""
+        self._reset()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'enabled': self.enabled, 'buffered': len(self._buffer),
+                    'buffer_size': self.buffer_size, 'recorded': self.recorded,
+                    'written': self.written, 'dropped': self.dropped, 'failed': self.failed,
+                    'batches': self.batches}
+
+
+def open_day(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) one day's file; WAL lets several workers append at once"""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS call_events ("
+        " ts REAL NOT NULL,"
+        " event TEXT NOT NULL,"
+        " call_id TEXT,"
+        " step TEXT,"
+        " language TEXT,"
+        " need TEXT,"
+        " latency_ms REAL,"
+        " detail TEXT)"
+    )
+    conn.commit()
+    return conn
+
+
+def read_events(path: str = CALL_ANALYTICS_PATH, days: Optional[int] = None,
+                call_id: Optional[str] = None) -> Iterator[Dict]:
+    """Events from the daily files (the last `days` of them, if given), oldest file first"""
+    files = list(analytics_files(path).values())
+    if days is not None:
+        files = files[-days:]
+    for name in files:
+        conn = sqlite3.connect(f"file:{name}?mode=ro", uri=True)
+        try:
+            query = f"SELECT {', '.join(COLUMNS)} FROM call_events"
+            rows = (conn.execute(query + " WHERE call_id = ? ORDER BY ts", (call_id,)) if call_id
+                    else conn.execute(query + " ORDER BY ts"))
+            for row in rows:
+                event = dict(zip(COLUMNS, row))
+                event['detail'] = json.loads(event['detail']) if event['detail'] else {}
+                yield event
+        finally:
+            conn.close()
+
+
+def summarize(events) -> Dict:
+    """Per-step drop-off, language mix and per-step reply latencies"""
+    reached = defaultdict(set)
+    ended_at = {}
+    languages = {}
+    latencies = defaultdict(list)
+    counts = Counter()
+    for event in events:
+        counts[event['event']] += 1
+        call_id, step = event['call_id'], event['step']
+        if event['event'] == 'turn':
+            if step:
+                reached[step].add(call_id)
+                if event['latency_ms'] is not None:
+                    latencies[step].append(event['latency_ms'])
+            if event['language']:
+                languages[call_id] = event['language']
+        elif event['event'] == 'call_ended' and step:
+            reached[step].add(call_id)
+            ended_at[call_id] = step
+    calls = set().union(*reached.values()) if reached else set()
+    drop_off = {}
+    for step in STEPS:
+        ended = sum(1 for s in ended_at.values() if s == step)
+        drop_off[step] = {'reached': len(reached[step]), 'ended': ended}
+    return {
+        'calls': len(calls),
+        'events': dict(counts),
+        'drop_off': drop_off,
+        'languages': dict(Counter(languages.values()).most_common()),
+        'latency_ms': {step: sorted(values) for step, values in latencies.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the call analytics store")
+    parser.add_argument('command', choices=['report', 'history'])
+    parser.add_argument('call_id', nargs='?', help='call to show (history)')
+    parser.add_argument('--path', default=CALL_ANALYTICS_PATH, help='base path of the daily files')
+    parser.add_argument('--days', type=int, default=None, help='only the most recent daily files')
+    args = parser.parse_args()
+
+    if args.command == 'history':
+        if not args.call_id:
+            parser.error("history needs a CALL_ID")
+        for event in read_events(args.path, args.days, call_id=args.call_id):
+            ts = datetime.fromtimestamp(event['ts'], timezone.utc).isoformat(timespec='milliseconds')
+            latency = f" {event['latency_ms']:.1f}ms" if event['latency_ms'] is not None else ""
+            print(f"{ts} {event['event']:13s} {event['step'] or '-':20s}{latency} "
+                  f"{json.dumps(event['detail'], ensure_ascii=False)}")
+        return
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from run_agent import percentile
+
+    summary = summarize(read_events(args.path, args.days))
+    print(f"📊 {summary['calls']} calls, events: {summary['events']}")
+    print("\nDrop-off by step")
+    print(f"{'step':22s} {'reached':>8s} {'ended':>8s} {'drop-off':>9s}")
+    for step, row in summary['drop_off'].items():
+        rate = f"{row['ended'] / row['reached']:.0%}" if row['reached'] else "-"
+        print(f"{step:22s} {row['reached']:8d} {row['ended']:8d} {rate:>9s}")
+    print("\nLanguages")
+    total = sum(summary['languages'].values()) or 1
+    for language, calls in summary['languages'].items():
+        print(f"{language:22s} {calls:8d} {calls / total:9.0%}")
+    print("\nReply latency by step (ms)")
+    print(f"{'step':22s} {'turns':>8s} {'p50':>8s} {'p90':>8s} {'p99':>8s} {'max':>8s}")
+    for step in STEPS:
+        values = summary['latency_ms'].get(step)
+        if values:
+            cells = ' '.join(f"{percentile(values, pct):8.2f}" for pct in (50, 90, 99, 100))
+            print(f"{step:22s} {len(values):8d} {cells}")
+
+
+if __name__ == '__main__':
+    main()
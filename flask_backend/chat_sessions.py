@@ -0,0 +1,89 @@
+"""
+Session IDs and per-session concurrency limits for the /chat endpoint.
+
+A web chat is identified by a session ID that the client sends back with
+every message. The ID carries the conversation's history in
+ResourceAgent's ConversationMemory. A client that sends no ID (or an
+unusable one) is given a new one.
+
+Two messages from the same session running at once would interleave
+their turns in that history. SessionLimiter caps how many requests each
+session may have in flight; requests over the cap are turned away (429)
+instead of queued, so a stuck client cannot tie up server threads.
+"""
+
+import re
+import threading
+import uuid
+from typing import Dict, Optional
+
+_SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def session_id_from(value) -> Optional[str]:
+    """The client's session ID if it is well formed, else None"""
+    if isinstance(value, str) and _SESSION_ID.match(value):
+        return value
+    return None
+
+
+class SessionLimiter:
+    """Counts in-flight requests per session and refuses those over max_concurrent"""
+
+    def __init__(self, max_concurrent: int = 1):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self.rejected = 0
+
+    def acquire(self, session_id: str) -> bool:
+        """Take one of the session's slots; False (and nothing taken) if they are all in use"""
+        with self._lock:
+            active = self._active.get(session_id, 0)
+            if active >= self.max_concurrent:
+                self.rejected += 1
+                return False
+            self._active[session_id] = active + 1
+            return True
+
+    def release(self, session_id: str):
+        with self._lock:
+            active = self._active.get(session_id, 0) - 1
+            if active > 0:
+                self._active[session_id] = active
+            else:
+                self._active.pop(session_id, None)
+
+    def slot(self, session_id: str) -> Optional['SessionSlot']:
+        """A held slot to release when the request is done, or None if the session is at its cap"""
+        return SessionSlot(self, session_id) if self.acquire(session_id) else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'active_sessions': len(self._active),
+                    'in_flight': sum(self._active.values()),
+                    'max_concurrent_per_session': self.max_concurrent,
+                    'rejected': self.rejected}
+
+
+class SessionSlot:
+    """One acquired slot; release() is safe to call more than once"""
+
+    def __init__(self, limiter: SessionLimiter, session_id: str):
+        self._limiter = limiter
+        self.session_id = session_id
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._limiter.release(self.session_id)
@@ -0,0 +1,82 @@
+"""
+Gunicorn configuration for serving the Flask backend in production.
+
+    python run_server.py --production
+    # or, from flask_backend/: gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app) and prepare_for_serving()
+builds the agent graph, catalog index, eligibility rules and resource
+locations there before any worker is forked. Workers share those structures
+copy-on-write and take traffic as soon as they start, so the first call does
+not pay for the build.
+
+Tuning (environment variables):
+    WEB_CONCURRENCY   worker processes, one per CPU by default; more than one switches
+                      call state to the shared SQLite store, which costs a commit per turn
+    THREADS           threads per worker; agent turns mostly wait on Groq/SerpAPI (default: 8)
+    WORKER_TIMEOUT    seconds before a silent worker is killed and replaced (default: 60)
+    GRACEFUL_TIMEOUT  seconds in-flight requests get to finish on reload/stop (default: 30)
+    MAX_REQUESTS      recycle a worker after this many requests, 0 = never (default: 0)
+
+Per-process state:
+    Only call state is shared between workers. Each worker keeps its own /chat
+    session memory, speculative resource lookups and webhook dedupe window, so
+    with more than one worker:
+      - a /chat follow-up that reaches another worker is answered without the
+        session's earlier turns
+      - a call turn that reaches another worker redoes the resource lookup
+        instead of using the one started during intake
+      - a retried webhook that reaches another worker is handled again
+    Route each session_id and each Retell call_id to the same worker (sticky
+    routing at the load balancer), or run a single worker and scale THREADS.
+
+Reloading:
+    kill -HUP <master>    re-read this file and gracefully replace the workers
+    kill -USR2 <master>   start a new master with new code (it preloads and warms up);
+                          once its /ready returns 200, kill -QUIT the old master
+"""
+
+import gc
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'app:app'
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}"
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('THREADS', 8))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+
+# Agent runs are already cut off at AGENT_TIMEOUT_SECONDS, well inside this
+timeout = int(os.environ.get('WORKER_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.environ.get('MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+# Workers only share a call's state through the SQLite store; this runs before the app is imported
+if workers > 1:
+    os.environ.setdefault('CALL_STATE_BACKEND', 'sqlite')
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before the first worker is forked
+    from app import prepare_for_serving
+    prepare_for_serving()
+    # Keep the garbage collector from writing to (and so un-sharing) every preloaded object
+    gc.freeze()
+    server.log.info(f"Serving with {workers} workers x {threads} threads")
+    if workers > 1:
+        server.log.warning("Chat sessions, speculative lookups and webhook dedupe are per worker; "
+                           "route each session and call to one worker (see gunicorn.conf.py)")
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    after_fork()
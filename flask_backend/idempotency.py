@@ -0,0 +1,178 @@
+"""
+At-most-once webhook handling within a time window.
+
+Retell retries a webhook that times out. A retried conversation_turn
+would otherwise advance the caller's conversation twice (their age
+recorded as their income) and redo the work. IdempotentResponses runs the
+handler once per idempotency key and hands every duplicate the first
+delivery's response:
+
+- A duplicate that arrives while the first delivery is still running waits
+  for it (single_flight.SingleFlight) instead of running concurrently.
+- A completed response is kept for window_seconds in an LRU bounded to
+  max_entries, so later retries are answered from memory.
+- Failed deliveries (exceptions, 5xx) are not kept, so a retry runs again.
+
+Conversation turns without their own identity (Retell's response_id or an
+Idempotency-Key header) are numbered per call by TurnNumbers: a delivery
+whose payload matches the call's latest turn is a retry of that turn.
+
+The window is per process. Under the prefork server a retry that reaches
+another worker is not deduplicated.
+
+Environment variables:
+    WEBHOOK_DEDUPE_WINDOW_SECONDS  how long a response is replayed to duplicates (default: 120)
+    WEBHOOK_DEDUPE_MAX_ENTRIES     responses kept at most (default: 10000)
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from single_flight import SingleFlight  # noqa: E402
+
+WEBHOOK_DEDUPE_WINDOW_SECONDS = float(os.environ.get('WEBHOOK_DEDUPE_WINDOW_SECONDS', 120))
+WEBHOOK_DEDUPE_MAX_ENTRIES = int(os.environ.get('WEBHOOK_DEDUPE_MAX_ENTRIES', 10000))
+
+
+def payload_digest(payload: Any) -> str:
+    """Stable digest of a JSON payload; a redelivered body has the same one whatever its key order"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+class IdempotentResponses:
+    """Runs a handler once per key and replays its response to duplicates for window_seconds"""
+
+    def __init__(self, window_seconds: float = WEBHOOK_DEDUPE_WINDOW_SECONDS,
+                 max_entries: int = WEBHOOK_DEDUPE_MAX_ENTRIES,
+                 keep: Callable[[Any], bool] = lambda response: True,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        # Whether a response may be replayed (e.g. not a 5xx)
+        self.keep = keep
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, response), least recently stored first
+        self._responses: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._flights = SingleFlight()
+        self.executed = 0
+        self.replayed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _get(self, key: Hashable) -> Optional[Tuple[Any]]:
+        """(response,) if a live response is stored for key"""
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._responses[key]
+                self.expired += 1
+                return None
+            return (entry[1],)
+
+    def _put(self, key: Hashable, response: Any):
+        now = self._clock()
+        with self._lock:
+            self._responses[key] = (now + self.window_seconds, response)
+            self._responses.move_to_end(key)
+            # Entries are stored in expiry order, so expired ones are always at the front
+            while self._responses:
+                oldest_key, (expires_at, _) = next(iter(self._responses.items()))
+                if expires_at > now and len(self._responses) <= self.max_entries:
+                    break
+                del self._responses[oldest_key]
+                if expires_at > now:
+                    self.evicted += 1
+                else:
+                    self.expired += 1
+
+    def run(self, key: Optional[Hashable], handler: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(response, duplicate): handler's response, run at most once per key within the window"""
+        if key is None:
+            return handler(), False
+        stored = self._get(key)
+        if stored is not None:
+            with self._lock:
+                self.replayed += 1
+            return stored[0], True
+
+        def first_delivery():
+            # A delivery that finished between the check above and this flight starting
+            stored = self._get(key)
+            if stored is not None:
+                return stored[0], True
+            response = handler()
+            with self._lock:
+                self.executed += 1
+            # Stored before the flight ends, so no later duplicate can miss both
+            if self.keep(response):
+                self._put(key, response)
+            return response, False
+
+        (response, duplicate), shared = self._flights.run(key, first_delivery)
+        if shared or duplicate:
+            with self._lock:
+                self.replayed += 1
+        return response, shared or duplicate
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'window_seconds': self.window_seconds, 'stored': len(self._responses),
+                    'max_entries': self.max_entries, 'executed': self.executed,
+                    'replayed': self.replayed, 'expired': self.expired, 'evicted': self.evicted,
+                    'in_flight': self._flights.stats()['in_flight']}
+
+
+class TurnNumbers:
+    """
+    Numbers each call's conversation turns by payload digest, for deliveries
+    that carry no turn identity of their own. A delivery with the same digest
+    as the call's latest turn gets that turn's number (it is a retry, however
+    far the first delivery has moved the call on); any other digest starts
+    the next turn. The same answer given twice in a row is therefore one
+    turn unless the deliveries are told apart by a response_id.
+    """
+
+    def __init__(self, max_calls: int = WEBHOOK_DEDUPE_MAX_ENTRIES):
+        if max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        self.max_calls = max_calls
+        self._lock = threading.Lock()
+        # call_id -> (digest, number) of its latest turn, least recently seen first
+        self._latest: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+
+    def number(self, call_id: Hashable, digest: str) -> int:
+        """The turn number for a delivery of digest in call_id"""
+        with self._lock:
+            latest = self._latest.get(call_id)
+            if latest is None:
+                latest = (digest, 0)
+            elif latest[0] != digest:
+                latest = (digest, latest[1] + 1)
+            self._latest[call_id] = latest
+            self._latest.move_to_end(call_id)
+            while len(self._latest) > self.max_calls:
+                self._latest.popitem(last=False)
+            return latest[1]
+
+    def forget(self, call_id: Hashable):
+        with self._lock:
+            self._latest.pop(call_id, None)
+
+    def __len__(self) -> int:
+        return len(self._latest)
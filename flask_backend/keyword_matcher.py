@@ -0,0 +1,179 @@
+"""
+Single-pass keyword analysis of a caller's transcript.
+
+Every Anthony turn needs the caller's language, whether they describe an
+urgent situation, what kind of help they need, whether they are correcting
+something they said earlier, and the coarse intent used for logging. The
+per-language keywords (language detection, urgency, corrections) come from
+each language's entry in anthony_messages.json; need and intent keywords are
+listed here. KeywordMatcher compiles all of those keyword lists once into a
+single table from word to tags, splits the lowercased transcript into words
+once, and intersects those words with the table; the few multi-word
+keywords ("por favor", "right now") are checked only where their first word
+occurs.
+
+Matching is on whole words, so "aid" no longer matches "said" and "eat" no
+longer matches "great"; plural and -ing/-ed endings are accepted ("bills",
+"renting", "worked"), and elided words are split ("d'aide"). Japanese
+has no spaces between words, so its keywords are found as substrings
+instead.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from message_catalog import DEFAULT_LANGUAGE, MessageCatalog, default_catalog
+
+# Need types Anthony screens for, checked in order
+NEED_KEYWORDS = {
+    'energy': ['energy', 'electric', 'electricity', 'power', 'bill', 'heating', 'cooling', 'gas', 'utility'],
+    'housing': ['housing', 'rent', 'rental', 'apartment', 'home', 'shelter', 'homeless'],
+    'food': ['food', 'hungry', 'hunger', 'meal', 'nutrition', 'groceries', 'eat'],
+    'money': ['money', 'cash', 'financial', 'income', 'benefits', 'assistance', 'aid'],
+    'health': ['health', 'medical', 'doctor', 'healthcare', 'medicine', 'hospital'],
+    'employment': ['job', 'work', 'employment', 'unemployed', 'unemployment', 'career', 'training'],
+}
+
+# Coarse intent categories reported by utils.extract_user_intent, checked in order
+INTENT_CATEGORY_KEYWORDS = {
+    'housing': ['housing', 'rent', 'apartment', 'home'],
+    'food': ['food', 'hungry', 'meal', 'nutrition'],
+    'healthcare': ['health', 'medical', 'doctor', 'healthcare'],
+    'employment': ['job', 'work', 'employment', 'unemployed'],
+    'financial': ['money', 'financial', 'bills', 'debt'],
+}
+
+INTENT_URGENCY_KEYWORDS = {
+    'high': ['urgent', 'emergency', 'immediately', 'asap', 'right now'],
+    'medium': ['soon', 'quickly', 'fast'],
+}
+
+# Word characters plus combining marks, so Devanagari vowel signs and viramas stay inside
+# their word; apostrophes split words, so "d'aide" is read as "d aide"
+_WORD = re.compile(r"[\w\u0300-\u036f\u0900-\u097f]+")
+# Scripts written without spaces between words (kana and CJK ideographs)
+_UNSPACED = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]")
+# Inflections accepted for single-word keywords: "bills", "lunches", "renting", "worked"
+# (plus "-ies" for keywords ending in "y": "utilities")
+_SUFFIXES = ('s', 'es', 'ing', 'ed')
+
+
+class TurnAnalysis(NamedTuple):
+    language: str                       # detected language, 'en' if nothing matched
+    urgent_languages: FrozenSet[str]    # languages whose urgent keywords appear
+    need: str                           # need type, 'general' if nothing matched
+    correction: bool                    # the caller is taking back an earlier answer
+    intent: Dict                        # {'category', 'urgency', 'specific_need'}
+    urgent_keyword_languages: FrozenSet[str] = frozenset()  # languages with urgent keywords
+
+    def is_urgent(self, language: str) -> bool:
+        """Whether the transcript is urgent for a conversation held in `language`
+
+        Languages without their own urgent keywords use the English ones.
+        """
+        if language not in self.urgent_keyword_languages:
+            language = DEFAULT_LANGUAGE
+        return language in self.urgent_languages
+
+
+class KeywordMatcher:
+    """All of Anthony's keyword lists compiled into one lookup table"""
+
+    def __init__(self, languages: Optional[Dict[str, Sequence[str]]] = None,
+                 urgent: Optional[Dict[str, Sequence[str]]] = None,
+                 needs: Dict[str, Sequence[str]] = NEED_KEYWORDS,
+                 corrections: Optional[Dict[str, Sequence[str]]] = None,
+                 intent_categories: Dict[str, Sequence[str]] = INTENT_CATEGORY_KEYWORDS,
+                 intent_urgency: Dict[str, Sequence[str]] = INTENT_URGENCY_KEYWORDS):
+        languages, urgent, corrections = languages or {}, urgent or {}, corrections or {}
+        self._language_order = list(languages)
+        self._urgent_keyword_languages = frozenset(urgent)
+        self._need_order = list(needs)
+        self._category_order = list(intent_categories)
+        self._urgency_order = list(intent_urgency)
+
+        # word -> {(group, label)} for single words and their inflections,
+        # first word -> [(words, tags)] for phrases, keyword -> tags for unspaced scripts
+        words: Dict[str, set] = defaultdict(set)
+        phrases: Dict[str, List[Tuple[Tuple[str, ...], set]]] = defaultdict(list)
+        unspaced: Dict[str, set] = defaultdict(set)
+        for group, mapping in (('language', languages), ('urgent', urgent), ('need', needs),
+                               ('correction', corrections), ('category', intent_categories),
+                               ('urgency', intent_urgency)):
+            for label, keywords in mapping.items():
+                for keyword in keywords:
+                    keyword = keyword.lower()
+                    tag = (group, label)
+                    if _UNSPACED.search(keyword):
+                        unspaced[keyword].add(tag)
+                        continue
+                    parts = tuple(_WORD.findall(keyword))
+                    if len(parts) > 1:
+                        phrases[parts[0]].append((parts, {tag}))
+                        continue
+                    words[keyword].add(tag)
+                    if len(keyword) > 2:
+                        for suffix in _SUFFIXES:
+                            words[keyword + suffix].add(tag)
+                        if keyword.endswith('y'):
+                            words[keyword[:-1] + 'ies'].add(tag)
+        self._words = {word: frozenset(tags) for word, tags in words.items()}
+        self._phrases = dict(phrases)
+        self._unspaced = dict(unspaced)
+        self._unspaced_pattern = (re.compile("|".join(sorted(map(re.escape, unspaced), key=len, reverse=True)))
+                                  if unspaced else None)
+
+    def tags(self, text: str) -> set:
+        """(group, label) pairs whose keywords appear in the text, e.g. ('need', 'food')"""
+        lowered = (text or "").lower()
+        words = _WORD.findall(lowered)
+        vocabulary = set(words)
+        found = set()
+        for word in self._words.keys() & vocabulary:
+            found |= self._words[word]
+        for first in self._phrases.keys() & vocabulary:
+            for parts, tags in self._phrases[first]:
+                n = len(parts)
+                if any(tuple(words[i:i + n]) == parts for i, word in enumerate(words) if word == first):
+                    found |= tags
+        if self._unspaced_pattern is not None and not lowered.isascii() and _UNSPACED.search(lowered):
+            for match in self._unspaced_pattern.finditer(lowered):
+                found |= self._unspaced[match.group()]
+        return found
+
+    @classmethod
+    def from_catalog(cls, catalog: MessageCatalog, **keywords) -> "KeywordMatcher":
+        """A matcher using the catalog's per-language keywords; other lists may be passed"""
+        return cls(languages=catalog.keywords['detect'], urgent=catalog.keywords['urgent'],
+                   corrections=catalog.keywords['corrections'], **keywords)
+
+    @staticmethod
+    def _first(group: str, order: List[str], found: set, default: str) -> str:
+        for label in order:
+            if (group, label) in found:
+                return label
+        return default
+
+    def analyze(self, text: str) -> TurnAnalysis:
+        found = self.tags(text)
+        return TurnAnalysis(
+            language=self._first('language', self._language_order, found, 'en'),
+            urgent_languages=frozenset(label for group, label in found if group == 'urgent'),
+            need=self._first('need', self._need_order, found, 'general'),
+            correction=any(group == 'correction' for group, _ in found),
+            intent={
+                'category': self._first('category', self._category_order, found, 'general'),
+                'urgency': self._first('urgency', self._urgency_order, found, 'normal'),
+                'specific_need': None,
+            },
+            urgent_keyword_languages=self._urgent_keyword_languages,
+        )
+
+
+keyword_matcher = KeywordMatcher.from_catalog(default_catalog())
+
+
+def analyze_turn(text: str) -> TurnAnalysis:
+    """Language, urgency, need type and intent of a transcript in one pass"""
+    return keyword_matcher.analyze(text)
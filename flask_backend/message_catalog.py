@@ -0,0 +1,121 @@
+"""
+Translated messages for the Anthony voice persona.
+
+The persona's replies live in anthony_messages.json, one entry per language:
+
+    "es": {"name": "Spanish",
+           "messages": {"ask_location": "Entendido, necesitas ayuda con {need_type}. ...", ...},
+           "keywords": {"detect": ["hola", ...], "urgent": ["desalojo", ...],
+                        "corrections": ["en realidad", ...]}}
+
+The file is read once at startup. Templates are checked against the English
+ones, so a translation cannot drop or invent a {placeholder}. At runtime
+render() picks one template and formats only that one. The keywords are what
+keyword_matcher uses to recognize the language (tried in file order),
+urgent situations and corrections. Adding a language means adding an entry
+to the file; a language missing a message falls back to the English text
+for it, and one without urgent keywords uses the English ones.
+
+Usage:
+    python message_catalog.py [--path anthony_messages.json]   # validate and list languages
+"""
+
+import argparse
+import json
+import os
+import string
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_MESSAGES_PATH = os.environ.get(
+    'ANTHONY_MESSAGES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'anthony_messages.json')
+)
+DEFAULT_LANGUAGE = 'en'
+KEYWORD_GROUPS = ('detect', 'urgent', 'corrections')
+
+
+def _fields(template: str) -> frozenset:
+    return frozenset(field for _, field, _, _ in string.Formatter().parse(template) if field is not None)
+
+
+class MessageCatalog:
+    """Per-language message templates, with English as the fallback"""
+
+    def __init__(self, catalog: Dict[str, Dict], default_language: str = DEFAULT_LANGUAGE):
+        if default_language not in catalog:
+            raise ValueError(f"Message catalog has no {default_language!r} entry")
+        self.default_language = default_language
+        self.language_names = {sys.intern(code): entry.get('name', code) for code, entry in catalog.items()}
+
+        default = catalog[default_language]['messages']
+        self.message_keys = tuple(default)
+        self._fields = {key: _fields(template) for key, template in default.items()}
+        # language -> key -> (template, whether it has placeholders); every key is filled,
+        # falling back to the default language's template
+        self._templates: Dict[str, Dict[str, tuple]] = {}
+        for code, entry in catalog.items():
+            messages = entry.get('messages', {})
+            unknown = set(messages) - set(default)
+            if unknown:
+                raise ValueError(f"{code}: messages not in {default_language!r}: {sorted(unknown)}")
+            templates = {}
+            for key, fields in self._fields.items():
+                template = messages.get(key, default[key])
+                if _fields(template) != fields:
+                    raise ValueError(f"{code}.{key} uses {sorted(_fields(template))}, expected {sorted(fields)}")
+                templates[sys.intern(key)] = (sys.intern(template), bool(fields))
+            self._templates[sys.intern(code)] = templates
+
+        # group -> language -> keywords, languages in file order
+        self.keywords: Dict[str, Dict[str, List[str]]] = {group: {} for group in KEYWORD_GROUPS}
+        for code, entry in catalog.items():
+            keywords = entry.get('keywords', {})
+            unknown = set(keywords) - set(KEYWORD_GROUPS)
+            if unknown:
+                raise ValueError(f"{code}: unknown keyword groups {sorted(unknown)}")
+            for group, words in keywords.items():
+                if not isinstance(words, list) or not all(isinstance(word, str) and word for word in words):
+                    raise ValueError(f"{code}.keywords.{group} must be a list of non-empty strings")
+                self.keywords[group][code] = words
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MESSAGES_PATH) -> "MessageCatalog":
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def render(self, language: Optional[str], key: str, **values) -> str:
+        """The message in `language` (or English), with its placeholders filled from values"""
+        templates = self._templates.get(language) or self._templates[self.default_language]
+        template, has_fields = templates[key]
+        return template.format_map(values) if has_fields else template
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._templates
+
+
+_default_catalog: Optional[MessageCatalog] = None
+
+
+def default_catalog() -> MessageCatalog:
+    """The catalog at DEFAULT_MESSAGES_PATH, loaded once per process"""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = MessageCatalog.load()
+    return _default_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the Anthony message catalog")
+    parser.add_argument('--path', default=DEFAULT_MESSAGES_PATH)
+    args = parser.parse_args()
+
+    catalog = MessageCatalog.load(args.path)
+    print(f"🌐 {len(catalog.language_names)} languages, {len(catalog.message_keys)} messages each in {args.path}")
+    for code, name in catalog.language_names.items():
+        counts = ", ".join(f"{len(catalog.keywords[group].get(code, []))} {group}" for group in KEYWORD_GROUPS)
+        print(f"  {code}: {name} ({counts} keywords)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Retell custom-LLM WebSocket server for the Anthony persona.
+
+With a custom LLM, Retell opens one WebSocket per call to
+ws://host:port/llm-websocket/{call_id}. It sends the live transcript and
+asks for a reply with `response_required` (or `reminder_required` after a
+silence). Replies are streamed back as `response` events that share the
+request's response_id, and the last one sets content_complete.
+
+Each reply is cut into sentences (utils.sentence_chunks), and each sentence
+is sent as soon as the persona has produced it, so Retell can start
+speaking the first one while the rest is being built. The resource summary
+in particular goes out before eligibility screening and the nearby lookup
+run. When a newer response_id arrives, the reply still being streamed is
+abandoned.
+
+Conversation state goes through the same AnthonyPersona and call-state
+store as /retell/webhook. With CALL_STATE_BACKEND=sqlite, both servers can
+share it.
+
+Usage:
+    python retell_ws.py [--host 0.0.0.0] [--port 8080]
+    # or alongside the development server: python run_server.py --websocket
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from app import AnthonyPersona, anthony, prepare_for_serving
+from structured_log import log_fields
+from utils import sentence_chunks
+
+logger = logging.getLogger(__name__)
+
+RETELL_WS_HOST = os.environ.get('RETELL_WS_HOST', os.environ.get('HOST', '0.0.0.0'))
+RETELL_WS_PORT = int(os.environ.get('RETELL_WS_PORT', 8080))
+LLM_WEBSOCKET_PATH = re.compile(r'^/llm-websocket/([^/?#]+)')
+NO_INPUT_REPLY = "I didn't catch that. Could you please repeat what you said?"
+# Longest the persona thread pauses after a reply's first sentence for it to be sent
+FIRST_CHUNK_HANDOFF_SECONDS = 0.005
+ERROR_REPLY = "I'm sorry, I'm having trouble processing your request right now. Could you please try again?"
+
+
+def latest_user_utterance(transcript: List[Dict]) -> str:
+    """The caller's most recent utterance in a Retell transcript list"""
+    for utterance in reversed(transcript or []):
+        if utterance.get('role') == 'user':
+            return utterance.get('content', '')
+    return ''
+
+
+class RetellCallSession:
+    """One call's WebSocket: replies to Retell's requests, one streaming reply at a time"""
+
+    def __init__(self, call_id: str, websocket: ServerConnection, persona: AnthonyPersona):
+        self.call_id = call_id
+        self.websocket = websocket
+        self.persona = persona
+        self._reply: Optional[asyncio.Task] = None
+        self._reply_cancelled: Optional[threading.Event] = None
+        self.turns = 0
+        self.abandoned = 0
+
+    async def send(self, event: Dict):
+        await self.websocket.send(json.dumps(event, ensure_ascii=False, separators=(',', ':')))
+
+    async def run(self):
+        await self.send({'response_type': 'config',
+                         'config': {'auto_reconnect': True, 'call_details': False}})
+        # Anthony speaks first: response_id 0 is the greeting
+        language = self.persona.get_call_state(self.call_id)['language']
+        await self.send_reply(0, [self.persona.get_greeting(language)])
+        try:
+            async for message in self.websocket:
+                await self.handle(json.loads(message))
+        finally:
+            await self._abandon_reply()
+
+    async def handle(self, event: Dict):
+        interaction = event.get('interaction_type')
+        if interaction == 'ping_pong':
+            await self.send({'response_type': 'ping_pong', 'timestamp': event.get('timestamp')})
+        elif interaction in ('response_required', 'reminder_required'):
+            # A newer request supersedes whatever is still being said
+            await self._abandon_reply()
+            cancelled = threading.Event()
+            self._reply_cancelled = cancelled
+            self._reply = asyncio.create_task(self.reply(event, cancelled))
+            self._reply.add_done_callback(self._reply_done)
+        # update_only and call_details carry nothing that needs an answer
+
+    @staticmethod
+    def _reply_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            if not isinstance(task.exception(), ConnectionClosed):
+                logger.error(f"Error streaming reply: {task.exception()}")
+
+    async def _abandon_reply(self):
+        if self._reply is not None and not self._reply.done():
+            self.abandoned += 1
+            self._reply_cancelled.set()
+            self._reply.cancel()
+            try:
+                # The persona thread finishes its step first, so the next turn sees settled state
+                await self._reply
+            except asyncio.CancelledError:
+                pass
+
+    async def reply(self, event: Dict, cancelled: threading.Event):
+        response_id = event.get('response_id')
+        self.turns += 1
+        if event.get('interaction_type') == 'reminder_required':
+            language = self.persona.get_call_state(self.call_id)['language']
+            await self.send_reply(response_id, [self.persona.messages.render(language, 'reminder')])
+            return
+
+        user_input = latest_user_utterance(event.get('transcript'))
+        logger.info("retell_ws_turn", extra=log_fields(call_id=self.call_id, response_id=response_id,
+                                                        transcript=user_input))
+        if not user_input.strip():
+            await self.send_reply(response_id, [NO_INPUT_REPLY])
+            return
+
+        # Run the persona in a thread, handing each sentence to the event loop as it is ready
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        first_sent = threading.Event()
+
+        def produce():
+            pieces = self.persona.process_user_input_stream(self.call_id, user_input)
+            try:
+                for n, chunk in enumerate(sentence_chunks(pieces)):
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+                    if n == 0:
+                        # Let the event loop put the first sentence on the wire before building the
+                        # rest, instead of it waiting out a GIL switch interval behind this thread
+                        first_sent.wait(FIRST_CHUNK_HANDOFF_SECONDS)
+            except Exception as e:
+                logger.error(f"Error processing with Anthony persona: {e}")
+                loop.call_soon_threadsafe(chunks.put_nowait, ERROR_REPLY)
+            finally:
+                pieces.close()   # saves the call state even when abandoned
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while (chunk := await chunks.get()) is not None:
+                await self.send_chunk(response_id, chunk)
+                first_sent.set()
+            await self.send_chunk(response_id, '', complete=True)
+        finally:
+            # Also reached when Retell hangs up mid-reply; the call state is still saved
+            cancelled.set()
+            await asyncio.shield(producer)
+
+    async def send_chunk(self, response_id, content: str, complete: bool = False):
+        await self.send({'response_type': 'response', 'response_id': response_id,
+                         'content': content, 'content_complete': complete, 'end_call': False})
+
+    async def send_reply(self, response_id, chunks: List[str]):
+        for chunk in chunks:
+            await self.send_chunk(response_id, chunk)
+        await self.send_chunk(response_id, '', complete=True)
+
+
+def reject_other_paths(connection: ServerConnection, request):
+    if not LLM_WEBSOCKET_PATH.match(request.path):
+        return connection.respond(HTTPStatus.NOT_FOUND, "Expected /llm-websocket/{call_id}\n")
+    return None
+
+
+def make_handler(persona: AnthonyPersona = anthony):
+    async def handler(websocket: ServerConnection):
+        call_id = LLM_WEBSOCKET_PATH.match(websocket.request.path).group(1)
+        session = RetellCallSession(call_id, websocket, persona)
+        started = time.perf_counter()
+        logger.info("retell_ws_connected", extra=log_fields(call_id=call_id))
+        try:
+            await session.run()
+        except ConnectionClosed:
+            pass
+        finally:
+            logger.info("retell_ws_closed", extra=log_fields(
+                call_id=call_id, turns=session.turns, abandoned=session.abandoned,
+                seconds=round(time.perf_counter() - started, 1)))
+    return handler
+
+
+async def serve_forever(host: str = RETELL_WS_HOST, port: int = RETELL_WS_PORT,
+                        persona: AnthonyPersona = anthony, started: Optional[threading.Event] = None):
+    # Per-message compression costs more than it saves on sentence-sized messages
+    async with serve(make_handler(persona), host, port, process_request=reject_other_paths,
+                     compression=None) as server:
+        logger.info(f"Retell LLM WebSocket listening on ws://{host}:{port}/llm-websocket/{{call_id}}")
+        if started is not None:
+            started.set()
+        await server.serve_forever()
+
+
+def start_in_thread(host: str = RETELL_WS_HOST, port: int = RETELL_WS_PORT,
+                    persona: AnthonyPersona = anthony) -> threading.Thread:
+    """Run the WebSocket server on its own event loop in a daemon thread"""
+    started = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(serve_forever(host, port, persona, started),),
+                              name='retell-ws', daemon=True)
+    thread.start()
+    started.wait(timeout=10)
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Anthony over Retell's custom LLM WebSocket")
+    parser.add_argument('--host', default=RETELL_WS_HOST)
+    parser.add_argument('--port', type=int, default=RETELL_WS_PORT)
+    args = parser.parse_args()
+
+    print(f"🎙️  Retell LLM WebSocket: ws://{args.host}:{args.port}/llm-websocket/{{call_id}}")
+    threading.Thread(target=prepare_for_serving, daemon=True).start()
+    try:
+        asyncio.run(serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped by user")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,43 @@
 """
 Flask server runner for Retell AI integration
 This script starts the Flask backend server
+
+    python run_server.py                 # Werkzeug development server
+    python run_server.py --websocket     # ...plus the Retell LLM WebSocket (retell_ws.py)
+    python run_server.py --production    # Gunicorn prefork server (gunicorn.conf.py)
 """
 
+import argparse
 import os
 import sys
-from app import app
+import threading
+
+GUNICORN_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+
+def run_production():
+    """Replace this process with a Gunicorn master using gunicorn.conf.py"""
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("❌ Gunicorn is not installed: pip install -r requirements.txt")
+        sys.exit(1)
+    print("🚀 Starting Gunicorn (prefork) for Retell AI integration...")
+    # exec keeps the master's argv, so `kill -USR2` can re-exec it for zero-downtime upgrades
+    os.execv(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', GUNICORN_CONFIG])
 
 def main():
     """Main function to run the Flask server"""
+    parser = argparse.ArgumentParser(description="Run the Flask backend")
+    parser.add_argument('--production', action='store_true',
+                        help='Serve with Gunicorn workers instead of the development server')
+    parser.add_argument('--websocket', action='store_true',
+                        help='Also serve the Retell custom LLM WebSocket on RETELL_WS_PORT')
+    args = parser.parse_args()
+    if args.production:
+        run_production()
+
+    from app import app, prepare_for_serving
+
     print("🚀 Starting Flask backend for Retell AI integration...")
     print("📞 Voice call webhook endpoint: /retell/webhook")
     print("🔍 Test endpoint: /test-agent")
@@ -25,6 +54,14 @@ def main():
     print(f"🐛 Debug mode: {debug}")
     print("-" * 50)
     
+    # Build the agent graph and indexes in the background; /ready reports when done
+    threading.Thread(target=prepare_for_serving, daemon=True).start()
+
+    if args.websocket:
+        from retell_ws import RETELL_WS_HOST, RETELL_WS_PORT, start_in_thread
+        start_in_thread()
+        print(f"🎙️  Retell LLM WebSocket: ws://{RETELL_WS_HOST}:{RETELL_WS_PORT}/llm-websocket/{{call_id}}")
+
     try:
         app.run(host=host, port=port, debug=debug)
     except KeyboardInterrupt:
@@ -0,0 +1,141 @@
+"""
+Background lookups started before their result is needed.
+
+Anthony knows a caller's need and location three turns before it lists
+resources. The name, age and income questions still to come take several
+seconds of speech. A lookup that depends only on need and location (the
+nearby search and the state-level eligibility shortlist) can run in that
+time, and the income turn then only refines a result that is already there.
+
+Each call has at most one lookup, tagged with the key it was computed from
+(need, location). Starting a lookup under a different key cancels the old
+one, which is what happens when the caller changes their mind. The
+function receives a threading.Event that is set on cancellation, and it
+should check it between steps. take() hands over the result only when its
+key still matches; otherwise it returns None and the caller computes the
+answer inline. A lookup started in another worker process is a miss in
+this one, so correctness never depends on it.
+
+Environment variables:
+    SPECULATIVE_LOOKUP_WORKERS       threads running lookups (default: 2)
+    SPECULATIVE_LOOKUP_WAIT_SECONDS  how long take() waits for a lookup still running (default: 1)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+SPECULATIVE_LOOKUP_WORKERS = int(os.environ.get('SPECULATIVE_LOOKUP_WORKERS', 2))
+SPECULATIVE_LOOKUP_WAIT_SECONDS = float(os.environ.get('SPECULATIVE_LOOKUP_WAIT_SECONDS', 1.0))
+
+
+class _Lookup:
+    __slots__ = ('key', 'cancelled', 'future')
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()
+
+
+class SpeculativeLookups:
+    """At most one background lookup per call, keyed by the inputs it was started from"""
+
+    def __init__(self, workers: int = SPECULATIVE_LOOKUP_WORKERS,
+                 wait_seconds: float = SPECULATIVE_LOOKUP_WAIT_SECONDS, max_calls: int = 10000):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self.max_calls = max_calls
+        self._lock = threading.Lock()
+        # call_id -> _Lookup, least recently started first
+        self._lookups: "OrderedDict[str, _Lookup]" = OrderedDict()
+        # Created on first use, so a preloading master forks before any thread exists
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.started = 0
+        self.used = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.missed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='speculative-lookup')
+        return self._executor
+
+    def start(self, call_id: str, key: Hashable, lookup: Callable[[threading.Event], Any]) -> bool:
+        """
+        Run lookup(cancelled) in the background for this call unless one with the
+        same key is already there. A lookup under another key is cancelled.
+        True if a new lookup was started.
+        """
+        with self._lock:
+            current = self._lookups.get(call_id)
+            if current is not None and current.key == key:
+                return False
+            if current is not None:
+                current.cancel()
+                self.cancelled += 1
+            pending = _Lookup(key)
+            pending.future = self._pool().submit(lookup, pending.cancelled)
+            self._lookups[call_id] = pending
+            self._lookups.move_to_end(call_id)
+            self.started += 1
+            # Calls that never reach their final turn (or end without end_call) age out
+            while len(self._lookups) > self.max_calls:
+                _, oldest = self._lookups.popitem(last=False)
+                oldest.cancel()
+                self.cancelled += 1
+            return True
+
+    def take(self, call_id: str, key: Hashable) -> Optional[Any]:
+        """The call's lookup result if it was started under this key, else None"""
+        with self._lock:
+            pending = self._lookups.pop(call_id, None)
+            if pending is None:
+                self.missed += 1
+                return None
+            if pending.key != key:
+                pending.cancel()
+                self.stale += 1
+                return None
+        try:
+            result = pending.future.result(timeout=self.wait_seconds)
+        except (CancelledError, Exception):
+            # A slow or failed lookup is redone inline by the caller
+            pending.cancel()
+            with self._lock:
+                self.missed += 1
+            return None
+        with self._lock:
+            self.used += 1
+        return result
+
+    def cancel(self, call_id: str) -> bool:
+        """Drop a call's lookup (e.g. when the call ends); True if there was one"""
+        with self._lock:
+            pending = self._lookups.pop(call_id, None)
+            if pending is None:
+                return False
+            pending.cancel()
+            self.cancelled += 1
+            return True
+
+    def after_fork(self):
+        """Forget the parent's lookups and pool; worker threads do not survive fork()"""
+        self._lock = threading.Lock()
+        self._lookups = OrderedDict()
+        self._executor = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'pending': len(self._lookups), 'started': self.started, 'used': self.used,
+                    'cancelled': self.cancelled, 'stale': self.stale, 'missed': self.missed}
@@ -0,0 +1,257 @@
+"""
+Non-blocking, structured logging for the webhook path.
+
+configure_logging() routes every log record through a bounded in-memory
+queue. A background thread formats each record as one compact JSON line
+and writes it out, so a request thread only builds the LogRecord and
+enqueues it. Serializing payloads and writing to a slow disk or pipe both
+happen off the request thread. When the queue is full, records are dropped
+and counted instead of blocking the request.
+
+Structured fields go in `extra={'fields': {...}}`; log_fields() builds that:
+
+    logger.info("conversation_turn", extra=log_fields(call_id=call_id, transcript=text))
+
+Before anything is written, fields named like transcripts ('transcript',
+'user_input', 'content', 'response', ...) are redacted according to
+LOG_TRANSCRIPTS, and phone numbers are masked. This applies at any
+nesting depth, including inside full Retell payloads.
+
+Full webhook payloads are logged only for a sample of calls
+(LOG_PAYLOAD_SAMPLE_RATE). Sampling is by call ID, so a sampled call is
+logged on every turn.
+
+Environment variables:
+    LOG_LEVEL                 root level (default: INFO)
+    LOG_FORMAT                json (default) or text
+    LOG_QUEUE_SIZE            records buffered before new ones are dropped (default: 10000)
+    LOG_PAYLOAD_SAMPLE_RATE   fraction of calls whose full payloads are logged (default: 0.01)
+    LOG_TRANSCRIPTS           redacted (default), omit or full
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0.01))
+LOG_TRANSCRIPTS = os.environ.get('LOG_TRANSCRIPTS', 'redacted').lower()
+
+# Fields whose values are caller speech (or replies that echo it back)
+TRANSCRIPT_FIELDS = frozenset({
+    'transcript', 'transcript_object', 'transcript_with_tool_calls', 'user_input',
+    'content', 'words', 'response', 'anthony_response', 'agent_response', 'voice_response',
+})
+PHONE_FIELDS = frozenset({'from_number', 'to_number', 'phone', 'phone_number'})
+MAX_FIELD_CHARS = 2000
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_SSN = re.compile(r"(?<!\d)\d{3}-\d{2}-\d{4}(?!\d)")
+_PHONE = re.compile(r"(?<!\w)\+?\(?\d[\d\s().-]{8,}\d(?!\w)")
+# Ages, incomes, ZIPs, street and account numbers
+_NUMBER = re.compile(r"\d[\d,.]*\d")
+
+
+def redact_text(text: str, mode: str = None) -> str:
+    """Caller speech masked ('redacted'), reduced to its length ('omit') or as is ('full')"""
+    mode = mode or LOG_TRANSCRIPTS
+    if mode == 'full':
+        return text
+    if mode == 'omit':
+        return f"<{len(text)} chars>"
+    text = _EMAIL.sub('<email>', text)
+    text = _SSN.sub('<ssn>', text)
+    text = _PHONE.sub('<phone>', text)
+    return _NUMBER.sub('<num>', text)
+
+
+def redact(value: Any, mode: str = None, _field: Optional[str] = None) -> Any:
+    """A copy of value with transcript fields redacted and phone fields masked, at any depth"""
+    if isinstance(value, dict):
+        return {key: redact(item, mode, key) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item, mode, _field) for item in value]
+    if isinstance(value, str):
+        if _field in TRANSCRIPT_FIELDS:
+            value = redact_text(value, mode)
+        elif _field in PHONE_FIELDS:
+            value = '<phone>' if value else value
+        if len(value) > MAX_FIELD_CHARS:
+            value = value[:MAX_FIELD_CHARS] + f"...<{len(value) - MAX_FIELD_CHARS} more chars>"
+    return value
+
+
+def log_fields(**fields) -> Dict:
+    """`extra` for a structured record: logger.info("event", extra=log_fields(call_id=...))"""
+    return {'fields': fields}
+
+
+def sample_payload(call_id: Optional[str], rate: float = None) -> bool:
+    """Whether to log this call's full payloads; the same answer for every turn of a call"""
+    rate = LOG_PAYLOAD_SAMPLE_RATE if rate is None else rate
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    return zlib.crc32(str(call_id).encode()) % 10000 < rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, redacted fields, exception"""
+
+    def __init__(self, transcripts: str = None):
+        super().__init__()
+        self.transcripts = transcripts
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(redact(fields, self.transcripts))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The usual single-line text format, with redacted fields appended as key=value"""
+
+    def __init__(self, transcripts: str = None):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        self.transcripts = transcripts
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={json.dumps(value, ensure_ascii=False, default=str)}"
+                                   for key, value in redact(fields, self.transcripts).items())
+        return line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them; drops (and counts) records when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue stays in this process, so nothing needs pickling; only merge
+        # %-style args now, since they may be mutated after this returns
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class AsyncLogging:
+    """The queue, its background writer and their counters"""
+
+    def __init__(self, stream=None, level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                 queue_size: int = LOG_QUEUE_SIZE, transcripts: str = None):
+        self.stream = stream if stream is not None else sys.stderr
+        self.level = level
+        self.fmt = fmt
+        self.queue_size = queue_size
+        self.transcripts = transcripts
+        self.listener = None
+        self.handler = None
+        self._start()
+
+    def _start(self):
+        output = logging.StreamHandler(self.stream)
+        output.setFormatter(JsonFormatter(self.transcripts) if self.fmt == 'json'
+                            else TextFormatter(self.transcripts))
+        log_queue = queue.Queue(self.queue_size)
+        self.handler = DroppingQueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, output)
+        self.listener.start()
+
+    def install(self, root: logging.Logger = None):
+        root = root or logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+
+    def after_fork(self):
+        """Start a fresh queue and writer thread in a forked worker; threads do not survive fork()"""
+        old = self.handler
+        self._start()
+        root = logging.getLogger()
+        if old in root.handlers:
+            root.removeHandler(old)
+            root.addHandler(self.handler)
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until the writer has written everything enqueued so far"""
+        deadline = time.monotonic() + timeout
+        # QueueListener marks each record done after its handlers have run
+        while self.handler.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self) -> Dict:
+        return {
+            'format': self.fmt,
+            'queued': self.handler.queue.qsize(),
+            'queue_size': self.queue_size,
+            'enqueued': self.handler.enqueued,
+            'dropped': self.handler.dropped,
+            'payload_sample_rate': LOG_PAYLOAD_SAMPLE_RATE,
+            'transcripts': self.transcripts or LOG_TRANSCRIPTS,
+        }
+
+
+_async_logging: Optional[AsyncLogging] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(**kwargs) -> AsyncLogging:
+    """Install queue-based logging on the root logger once per process; kwargs go to AsyncLogging"""
+    global _async_logging
+    with _configure_lock:
+        if _async_logging is None:
+            _async_logging = AsyncLogging(**kwargs)
+            _async_logging.install()
+            atexit.register(_async_logging.stop)
+    return _async_logging
+
+
+def after_fork():
+    if _async_logging is not None:
+        _async_logging.after_fork()
+
+
+def logging_stats() -> Dict:
+    return _async_logging.stats() if _async_logging is not None else {}
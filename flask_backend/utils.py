@@ -4,7 +4,10 @@ Utility functions for the Flask backend
 
 import re
 import logging
-from typing import str
+from typing import Iterable, Iterator
+
+from keyword_matcher import analyze_turn
+from structured_log import log_fields
 
 logger = logging.getLogger(__name__)
 
@@ -85,44 +88,45 @@ def truncate_for_voice(text: str, max_length: int = 500, max_sentences: int = 3)
     
     return text[:max_length] + "..."
 
+# End of a sentence: ., ! or ? followed by a space, a CJK or Devanagari full stop, or a line break
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|(?<=[。！？])\s*|(?<=।)\s+|\n+')
+_LIST_MARKER = re.compile(r'\d+\.')
+
+def sentence_chunks(pieces: Iterable[str], min_chars: int = 12) -> Iterator[str]:
+    """
+    Regroup streamed text into sentence-sized chunks for speech, yielding each
+    sentence (with its trailing whitespace) as soon as it is complete.
+    Sentences shorter than min_chars are joined to the next one.
+    """
+    buffer = ''
+    for piece in pieces:
+        buffer += piece
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            line = buffer[buffer.rfind('\n', 0, match.start()) + 1:match.start()].strip()
+            if _LIST_MARKER.fullmatch(line):
+                continue  # "1. " opening a numbered item
+            if match.end() - start >= min_chars and buffer[start:match.start()].strip():
+                yield buffer[start:match.end()]
+                start = match.end()
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer
+
 def extract_user_intent(text: str) -> dict:
     """
     Extract user intent from the transcribed text
     """
-    text_lower = text.lower()
-    
-    intent = {
-        'category': 'general',
-        'urgency': 'normal',
-        'specific_need': None
-    }
-    
-    # Category detection
-    if any(word in text_lower for word in ['housing', 'rent', 'apartment', 'home']):
-        intent['category'] = 'housing'
-    elif any(word in text_lower for word in ['food', 'hungry', 'meal', 'nutrition']):
-        intent['category'] = 'food'
-    elif any(word in text_lower for word in ['health', 'medical', 'doctor', 'healthcare']):
-        intent['category'] = 'healthcare'
-    elif any(word in text_lower for word in ['job', 'work', 'employment', 'unemployed']):
-        intent['category'] = 'employment'
-    elif any(word in text_lower for word in ['money', 'financial', 'bills', 'debt']):
-        intent['category'] = 'financial'
-    
-    # Urgency detection
-    if any(word in text_lower for word in ['urgent', 'emergency', 'immediately', 'asap', 'right now']):
-        intent['urgency'] = 'high'
-    elif any(word in text_lower for word in ['soon', 'quickly', 'fast']):
-        intent['urgency'] = 'medium'
-    
-    return intent
+    return analyze_turn(text).intent
 
 def log_conversation_turn(call_id: str, user_input: str, agent_response: str, voice_response: str):
     """
     Log conversation turn for debugging and analytics
     """
-    logger.info(f"Conversation Turn - Call ID: {call_id}")
-    logger.info(f"User Input: {user_input}")
-    logger.info(f"Agent Response: {agent_response[:200]}...")
-    logger.info(f"Voice Response: {voice_response[:200]}...")
-    logger.info("-" * 50)
+    # One structured record; the background writer redacts the transcript fields
+    logger.info("conversation_turn", extra=log_fields(
+        call_id=call_id,
+        user_input=user_input,
+        agent_response=agent_response[:200],
+        voice_response=voice_response[:200],
+    ))
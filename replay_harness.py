@@ -0,0 +1,245 @@
+"""
+Offline record/replay for ResourceAgent.
+
+Record mode wraps the live Groq model and SerpAPI wrapper and writes every
+model response and search result to a fixture directory. Replay mode swaps
+in ReplayChatModel and ReplaySearch, which serve those fixtures back with a
+configurable injected latency, so the agent can be exercised and
+benchmarked without API keys or network access.
+
+Model responses are keyed by the turn they answer: the text of the last
+user message plus how many model steps came after it. That key does not
+depend on call order, so fixtures replay the same way under concurrency.
+
+Fixture directory layout:
+    <sha1 of query>.json   {"query": ..., "steps": [serialized AIMessage, ...]}
+    search.json            {search query: result}
+
+StageTimer is a callback handler that records how long each model call and
+tool call takes; benchmark_agent.py uses it to report per-stage timings.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+SEARCH_FILE = 'search.json'
+
+
+def turn_key(messages: List[BaseMessage]) -> Tuple[str, int]:
+    """(last user message, model steps since it) for a model call's input"""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].type == 'human':
+            steps = sum(1 for message in messages[i + 1:] if message.type == 'ai')
+            return messages[i].content, steps
+    return '', 0
+
+
+class FixtureStore:
+    """Recorded model steps and search results, loaded from and saved to a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # query -> {step: serialized message}
+        self.steps: Dict[str, Dict[int, dict]] = defaultdict(dict)
+        self.search: Dict[str, str] = {}
+        if os.path.isdir(directory):
+            self._load()
+
+    @staticmethod
+    def _filename(query: str) -> str:
+        return hashlib.sha1(query.encode('utf-8')).hexdigest()[:16] + '.json'
+
+    def _load(self):
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(self.directory, name)) as f:
+                data = json.load(f)
+            if name == SEARCH_FILE:
+                self.search.update(data)
+            else:
+                self.steps[data['query']] = dict(enumerate(data['steps']))
+
+    @property
+    def queries(self) -> List[str]:
+        """Every recorded turn's user message"""
+        return sorted(self.steps)
+
+    def record_step(self, key: Tuple[str, int], message: BaseMessage):
+        query, step = key
+        with self._lock:
+            self.steps[query][step] = message_to_dict(message)
+
+    def record_search(self, query: str, result: str):
+        with self._lock:
+            self.search[query] = result
+
+    def step(self, key: Tuple[str, int]) -> BaseMessage:
+        query, step = key
+        try:
+            data = self.steps[query][step]
+        except KeyError:
+            raise ValueError(f"No recorded model response for {query!r} (step {step}); "
+                             f"re-record the fixtures") from None
+        return messages_from_dict([data])[0]
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for query, steps in self.steps.items():
+                ordered = [steps[i] for i in sorted(steps)]
+                with open(os.path.join(self.directory, self._filename(query)), 'w') as f:
+                    json.dump({'query': query, 'steps': ordered}, f, indent=2)
+            with open(os.path.join(self.directory, SEARCH_FILE), 'w') as f:
+                json.dump(self.search, f, indent=2, sort_keys=True)
+
+
+class ModelRecorder(BaseCallbackHandler):
+    """Callback handler that stores each chat model response under its turn key"""
+
+    def __init__(self, fixtures: FixtureStore):
+        self.fixtures = fixtures
+        self._keys: Dict[Any, Tuple[str, int]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._keys[run_id] = turn_key(messages[0])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        key = self._keys.pop(run_id, None)
+        if key is not None:
+            self.fixtures.record_step(key, response.generations[0][0].message)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._keys.pop(run_id, None)
+
+
+class RecordingSearch:
+    """Wraps a live search wrapper and stores every result"""
+
+    def __init__(self, backend, fixtures: FixtureStore):
+        self.backend = backend
+        self.fixtures = fixtures
+
+    def run(self, query: str) -> str:
+        result = self.backend.run(query)
+        self.fixtures.record_search(query, result)
+        return result
+
+
+class ReplaySearch:
+    """Serves recorded search results after an injected delay"""
+
+    def __init__(self, fixtures: FixtureStore, latency: float = 0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+
+    def run(self, query: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return self.fixtures.search[query]
+        except KeyError:
+            raise ValueError(f"No recorded search result for {query!r}; re-record the fixtures") from None
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that answers from recorded fixtures after an injected delay"""
+
+    fixtures: Any
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'replay'
+
+    def bind_tools(self, tools, **kwargs):
+        # Recorded responses already contain the tool calls the live model made
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self.fixtures.step(turn_key(messages))
+        if not isinstance(message, AIMessage):
+            raise ValueError(f"Recorded step is a {message.type} message, expected an AI message")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class StageTimer(BaseCallbackHandler):
+    """Callback handler that collects per-call durations for model and tool calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Dict[Any, Tuple[str, float]] = {}
+        # stage name ('llm', 'tool:<name>') -> durations in seconds
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def _start(self, run_id, stage: str):
+        with self._lock:
+            self._started[run_id] = (stage, time.perf_counter())
+
+    def _end(self, run_id):
+        # Failed calls are timed too; the agent still waited for them
+        end = time.perf_counter()
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None:
+                stage, start = started
+                self.durations[stage].append(end - start)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, 'llm')
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, f"tool:{serialized.get('name', 'unknown')}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def record(self, stage: str, seconds: float):
+        """Add a duration measured outside LangChain (e.g. post-processing)"""
+        with self._lock:
+            self.durations[stage].append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._started.clear()
+            self.durations.clear()
+
+
+def attach_callbacks(agent, handlers: List[BaseCallbackHandler]):
+    """Attach callback handlers to an agent's model and tools (builds the graph if needed)"""
+    agent.warmup()
+    agent.model.callbacks = list(agent.model.callbacks or []) + handlers
+    for tool in agent.tools:
+        tool.callbacks = list(tool.callbacks or []) + handlers
+
+
+def replay_components(fixtures_dir: str, llm_latency: float = 0.0,
+                      search_latency: float = 0.0) -> Tuple[ReplayChatModel, ReplaySearch]:
+    """(model, search) stand-ins for ResourceAgent(model=..., search=...)"""
+    fixtures = FixtureStore(fixtures_dir)
+    if not fixtures.steps:
+        raise ValueError(f"No fixtures found in {fixtures_dir}; record some first")
+    return (ReplayChatModel(fixtures=fixtures, latency=llm_latency),
+            ReplaySearch(fixtures, latency=search_latency))
@@ -0,0 +1,182 @@
+"""
+Ranked retrieval over the built-in resource catalogs.
+
+The category tools in Untapped_Resource_Agent.py return every resource of
+each matched category, unranked and capped, and the same program (Medicaid,
+the Housing Choice Voucher Program) can appear under several categories.
+ResourceRetriever indexes every government, nonprofit and financial
+explainer entry once, merging duplicates, and scores queries with BM25.
+
+The index is an inverted file held in NumPy arrays (CSR layout: per-term
+slices of document ids and precomputed BM25 weights), so scoring a query is
+a gather plus one bincount over the postings of its terms and a partial
+sort of those postings, independent of how many entries match nothing.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from answer_cache import normalize_query
+
+# NumPy is imported when the index is first built so importing the agent module stays fast
+np = None
+
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+
+# Words that would otherwise match entries like "Dress for Success" on grammar alone
+STOP_WORDS = frozenset("""
+a an and are am at be by can could do does for from get have help i i'm im in is it
+me my need needs of on or our please the to us we what with you your how m s t
+""".split())
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words without stop words, lightly de-pluralized ("grants" -> "grant")"""
+    return [word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+            for word in normalize_query(text).split() if word not in STOP_WORDS]
+
+
+class ResourceEntry(NamedTuple):
+    name: str
+    source: str                     # 'government', 'nonprofit' or 'explainer'
+    categories: Tuple[str, ...]
+    text: str = ""
+
+
+class ResourceRetriever:
+    """BM25 index over deduplicated catalog entries"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._entries: List[ResourceEntry] = []
+        # dedupe key (name without parentheticals) -> entry position
+        self._positions: Dict[str, int] = {}
+        self._index = None
+
+    @staticmethod
+    def _dedupe_key(name: str) -> str:
+        return normalize_query(_PARENTHETICAL.sub("", name))
+
+    def add(self, name: str, source: str, category: str, text: str = ""):
+        """Add an entry; a name already indexed gains the category instead of a duplicate"""
+        key = self._dedupe_key(name)
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                self._positions[key] = len(self._entries)
+                self._entries.append(ResourceEntry(name, source, (category,), text))
+            else:
+                entry = self._entries[position]
+                self._entries[position] = entry._replace(
+                    # Keep the more descriptive name, e.g. "... Program (Section 8)"
+                    name=max(entry.name, name, key=len),
+                    categories=entry.categories + ((category,) if category not in entry.categories else ()),
+                    text=entry.text or text,
+                )
+            self._index = None
+
+    def add_catalog(self, categories: Dict[str, Iterable[str]], source: str):
+        for category, resources in categories.items():
+            for resource in resources:
+                self.add(resource, source, category)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _build(self):
+        """Compile the inverted index: CSR postings of (entry id, BM25 weight) per term"""
+        np = _load_numpy()
+        vocabulary: Dict[str, int] = {}
+        term_ids, doc_ids, lengths = [], [], []
+        for doc, entry in enumerate(self._entries):
+            words = tokenize(" ".join((entry.name, entry.source, *entry.categories, entry.text)))
+            lengths.append(len(words))
+            for word in words:
+                term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+                doc_ids.append(doc)
+
+        n_docs = len(self._entries)
+        pairs = np.unique(np.array(term_ids, dtype=np.int64) * max(n_docs, 1)
+                          + np.array(doc_ids, dtype=np.int64), return_counts=True)
+        terms, docs = np.divmod(pairs[0], max(n_docs, 1))
+        docs = docs.astype(np.int32)
+        tf = pairs[1].astype(np.float64)
+
+        lengths = np.array(lengths, dtype=np.float64)
+        df = np.bincount(terms, minlength=len(vocabulary))
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths[docs] / max(lengths.mean(), 1.0))
+        weights = idf[terms] * tf * (self.k1 + 1) / (tf + norm)
+
+        # np.unique sorted the pairs by term, so each term's postings are contiguous
+        pointers = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=pointers[1:])
+        sources = sorted({entry.source for entry in self._entries})
+        source_ids = np.array([sources.index(entry.source) for entry in self._entries], dtype=np.int64)
+        return {
+            'vocabulary': vocabulary,
+            'pointers': pointers,
+            'docs': docs,
+            'weights': weights,
+            'sources': sources,
+            'source_ids': source_ids,
+        }
+
+    def _compiled(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build()
+                index = self._index
+        return index
+
+    def search(self, query: str, k: int = 10,
+               sources: Optional[Iterable[str]] = None) -> List[Tuple[ResourceEntry, float]]:
+        """Top-k (entry, score) pairs for a query, best first; ties keep catalog order"""
+        index = self._compiled()
+        np = _load_numpy()
+        pointers = index['pointers']
+        slices = []
+        for term in set(tokenize(query)):
+            term_id = index['vocabulary'].get(term)
+            if term_id is not None:
+                slices.append(slice(pointers[term_id], pointers[term_id + 1]))
+        if not slices:
+            return []
+
+        docs = np.concatenate([index['docs'][s] for s in slices])
+        weights = np.concatenate([index['weights'][s] for s in slices])
+        # Dense accumulation avoids sorting the postings; one pass over both arrays
+        totals = np.bincount(docs, weights=weights, minlength=len(self._entries))
+        if sources is not None:
+            allowed = [index['sources'].index(s) for s in sources if s in index['sources']]
+            totals[~np.isin(index['source_ids'], allowed)] = 0.0
+        scores = totals[docs]
+
+        # Each entry appears at most once per query term, so the (k * terms)-th best
+        # posting score is a threshold that still leaves at least k distinct entries
+        depth = k * len(slices)
+        if len(scores) > depth:
+            threshold = np.partition(scores, len(scores) - depth)[len(scores) - depth]
+            selected = scores >= max(threshold, 1e-12)
+        else:
+            selected = scores > 0
+        # Dedupe through a flag array rather than np.unique, which sorts or hashes
+        flags = np.zeros(len(self._entries), dtype=bool)
+        flags[docs[selected]] = True
+        candidates = np.flatnonzero(flags)
+        scores = totals[candidates]
+        order = np.lexsort((candidates, -scores))[:k]
+        return [(self._entries[candidates[i]], float(scores[i])) for i in order]
@@ -1,42 +1,142 @@
-# run_agent.py
 from Untapped_Resource_Agent import ResourceAgent
+import argparse
+import json
+import os
 import sys
+import time
+
+
+def run_interactive(agent):
+    while True:
+        # --- Get User Input ---
+        user_input = input("\nWhat resources are you looking for? (Type 'exit' to quit): ")
+
+        if user_input.lower() == 'exit':
+            print("Exiting Resource Agent. Goodbye!")
+            break
+
+        if not user_input.strip():
+            print("Please enter a query.")
+            continue
+
+        print(f"\n--- Running Query: '{user_input}' ---")
+
+        # --- Invoke the Agent ---
+        try:
+            response = agent.find_resources(user_input)
+            print("\n--- Agent Response ---")
+            print(response)
+            print("----------------------")
+
+        except ValueError as e:
+            # Catches the ValueError raised by find_resources if query is empty
+            print(f"Error: {e}", file=sys.stderr)
+        except Exception as e:
+            # Catches potential errors during tool execution or LLM interaction
+            print(f"An error occurred during agent execution: {e}", file=sys.stderr)
+
+
+def load_completed_ids(out_path):
+    """
+    IDs answered successfully by a previous (possibly crashed) run; queries
+    that failed there (e.g. a Groq or SerpAPI outage) are run again
+    """
+    completed = set()
+    if not os.path.exists(out_path):
+        return completed
+    with open(out_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if not record.get('error'):
+                    completed.add(str(record['id']))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # A crash can leave a partial last line; that query is simply re-run
+                continue
+    return completed
+
+
+def read_batch_queries(in_path, completed):
+    """Yield (id, query) pairs from a JSONL file, skipping IDs already completed"""
+    with open(in_path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            query_id = str(record.get('id', line_number))
+            if query_id not in completed:
+                yield query_id, record['query']
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_batch(agent, in_path, out_path, max_concurrency, use_cache):
+    completed = load_completed_ids(out_path)
+    if completed:
+        print(f"Resuming: {len(completed)} queries already in {out_path}")
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    with open(out_path, 'a') as out:
+        # Terminate a partial line left behind by a crash before appending
+        if out.tell() > 0:
+            with open(out_path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b'\n':
+                    out.write('\n')
+
+        queries = read_batch_queries(in_path, completed)
+        for result in agent.find_resources_batch(queries, max_concurrency=max_concurrency,
+                                                 use_cache=use_cache):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            latencies.append(result['latency_seconds'])
+            if result['error']:
+                errors += 1
+            if len(latencies) % 100 == 0:
+                print(f"  {len(latencies)} queries done...")
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print("\n--- Batch Summary ---")
+    print(f"Queries run:  {len(latencies)} ({errors} errors, {len(completed)} skipped)")
+    print(f"Elapsed:      {elapsed:.1f}s")
+    print(f"Throughput:   {len(latencies) / elapsed if elapsed else 0.0:.2f} queries/s")
+    print(f"Latency p50:  {percentile(latencies, 50):.2f}s")
+    print(f"Latency p95:  {percentile(latencies, 95):.2f}s")
+    print("---------------------")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the Untapped Resource Agent")
+    parser.add_argument('--batch', metavar='IN_JSONL',
+                        help='Run queries from a JSONL file of {"id": ..., "query": ...} records')
+    parser.add_argument('--out', metavar='OUT_JSONL', help='Where batch results are appended')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent queries in batch mode')
+    parser.add_argument('--use-cache', action='store_true',
+                        help='Answer batch queries from the answer cache when possible '
+                             '(off by default, so every answer is re-checked)')
+    args = parser.parse_args()
+    if args.batch and not args.out:
+        parser.error("--batch requires --out")
+
     print("--- Initializing Resource Agent ---")
     try:
         # Initialize the agent class
         agent = ResourceAgent()
         print("Agent initialized successfully.")
-        
-        while True:
-            # --- Get User Input ---
-            user_input = input("\nWhat resources are you looking for? (Type 'exit' to quit): ")
-            
-            if user_input.lower() == 'exit':
-                print("Exiting Resource Agent. Goodbye!")
-                break
-            
-            if not user_input.strip():
-                print("Please enter a query.")
-                continue
 
-            print(f"\n--- Running Query: '{user_input}' ---")
-            
-            # --- Invoke the Agent ---
-            try:
-                response = agent.find_resources(user_input)      
-                print("\n--- Agent Response ---")
-                print(response)
-                print("----------------------")
-            
-            except ValueError as e:
-                # Catches the ValueError raised by find_resources if query is empty
-                print(f"Error: {e}", file=sys.stderr)
-            except Exception as e:
-                # Catches potential errors during tool execution or LLM interaction
-                print(f"An error occurred during agent execution: {e}", file=sys.stderr)
+        if args.batch:
+            run_batch(agent, args.batch, args.out, args.concurrency, args.use_cache)
+        else:
+            run_interactive(agent)
 
     except ValueError as e:
         # Catches the initial error if API keys are missing
@@ -45,4 +145,4 @@ def main():
         print(f"An unexpected error occurred during setup: {e}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
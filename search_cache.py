@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite cache for the google_search (SerpAPI) tool.
+
+Every eligibility or contact lookup through SerpAPI is a paid, slow network
+round-trip, so SearchCache wraps the search backend with:
+
+- a SQLite result store that survives restarts, with a TTL per entry
+- background refresh of entries that are close to expiring
+- single-flight misses, so concurrent lookups of the same query make one call
+- a bulk warm-up command to pre-fill the cache from a list of common queries
+
+Usage:
+    python search_cache.py warm common_queries.txt [--ttl 86400] [--force]
+    python search_cache.py stats
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from answer_cache import normalize_query
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'SEARCH_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_cache.db')
+)
+
+
+class SearchCache:
+    """SQLite-backed read-through cache around a search backend callable"""
+
+    def __init__(self, backend: Callable[[str], str], path: str = DEFAULT_CACHE_PATH,
+                 ttl_seconds: float = 24 * 3600, refresh_ahead: float = 0.1,
+                 refresh_workers: int = 2, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # Entries with less than this fraction of their TTL left are refreshed in the background
+        self.refresh_ahead = refresh_ahead
+        self.clock = clock
+        self.refresh_workers = refresh_workers
+        self._open()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def _open(self):
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            " key TEXT PRIMARY KEY,"
+            " query TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " ttl REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+        # Guards the counters and the set of keys being refreshed
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                             thread_name_prefix='search-refresh')
+
+    def after_fork(self):
+        """
+        Give a forked worker process its own connection, locks and refresh pool;
+        SQLite connections and thread pools must not be shared across fork().
+        """
+        self._open()
+
+    def _load(self, key: str):
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT result, ttl, expires_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _store(self, key: str, query: str, result: str, ttl: float):
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, query, result, ttl, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, query, result, ttl, self.clock() + ttl)
+            )
+            self._conn.commit()
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the cached result if it has not expired, without calling the backend"""
+        row = self._load(normalize_query(query))
+        if row and row[2] > self.clock():
+            return row[0]
+        return None
+
+    def run(self, query: str, ttl_seconds: Optional[float] = None) -> str:
+        """Drop-in replacement for SerpAPIWrapper.run"""
+        key = normalize_query(query)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        row = self._load(key)
+        if row:
+            result, entry_ttl, expires_at = row
+            remaining = expires_at - self.clock()
+            if remaining > 0:
+                with self._lock:
+                    self.hits += 1
+                if remaining < entry_ttl * self.refresh_ahead:
+                    self._schedule_refresh(key, query, entry_ttl)
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return self._fetch(key, query, ttl)
+
+    def _fetch(self, key: str, query: str, ttl: float) -> str:
+        """Call the backend once per key, however many callers are waiting on it"""
+        def lead() -> str:
+            # A previous leader may have stored the result since our lookup missed
+            row = self._load(key)
+            if row and row[2] > self.clock():
+                return row[0]
+            try:
+                result = self.backend(query)
+            except BaseException:
+                with self._lock:
+                    self.errors += 1
+                raise
+            self._store(key, query, result, ttl)
+            return result
+
+        result, shared = self._flights.run(key, lead)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return result
+
+    def _schedule_refresh(self, key: str, query: str, ttl: float):
+        with self._lock:
+            if key in self._refreshing or key in self._flights:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key, query, ttl)
+
+    def _refresh(self, key: str, query: str, ttl: float):
+        try:
+            self._store(key, query, self.backend(query), ttl)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            # The current entry stays valid until it expires; the next hit retries
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Background refresh failed for '{query}': {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def warm(self, queries: Iterable[str], ttl_seconds: Optional[float] = None,
+             force: bool = False) -> Dict[str, int]:
+        """Pre-fill the cache; existing fresh entries are skipped unless force is set"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        counts = {'fetched': 0, 'skipped': 0, 'failed': 0}
+        for query in queries:
+            query = query.strip()
+            if not query:
+                continue
+            if not force and self.get(query) is not None:
+                counts['skipped'] += 1
+                continue
+            try:
+                self._store(normalize_query(query), query, self.backend(query), ttl)
+                counts['fetched'] += 1
+            except Exception as e:
+                counts['failed'] += 1
+                logger.warning(f"Warm-up failed for '{query}': {e}")
+        return counts
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed"""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM search_results WHERE expires_at <= ?", (self.clock(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        with self._db_lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+        with self._lock:
+            return {
+                'size': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+            }
+
+    def close(self):
+        self._refresher.shutdown(wait=True)
+        with self._db_lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the google_search result cache")
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH, help='SQLite cache file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    warm_parser = subparsers.add_parser('warm', help='Pre-fill the cache from a file of queries')
+    warm_parser.add_argument('queries_file', help='One query per line')
+    warm_parser.add_argument('--ttl', type=float, default=None, help='TTL in seconds')
+    warm_parser.add_argument('--force', action='store_true', help='Refetch queries already cached')
+
+    subparsers.add_parser('stats', help='Show cache size')
+    subparsers.add_parser('purge', help='Delete expired entries')
+    args = parser.parse_args()
+
+    if args.command == 'warm':
+        from dotenv import load_dotenv
+        from langchain_community.utilities import SerpAPIWrapper
+
+        load_dotenv()
+        serp_api_key = os.getenv("SERP_API_KEY")
+        if not serp_api_key:
+            print("❌ SERP_API_KEY is required in .env file.", file=sys.stderr)
+            sys.exit(1)
+
+        cache = SearchCache(SerpAPIWrapper(serpapi_api_key=serp_api_key).run, path=args.path)
+        with open(args.queries_file) as f:
+            counts = cache.warm(f, ttl_seconds=args.ttl, force=args.force)
+        print(f"✅ Warm-up complete: {counts['fetched']} fetched, "
+              f"{counts['skipped']} already cached, {counts['failed']} failed")
+    else:
+        cache = SearchCache(backend=None, path=args.path)
+        if args.command == 'purge':
+            print(f"🧹 Removed {cache.purge_expired()} expired entries")
+        print(f"📦 {cache.stats()['size']} entries in {args.path}")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
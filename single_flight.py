@@ -0,0 +1,123 @@
+"""
+Single-flight execution of identical concurrent work.
+
+During an outage or a news spike many callers ask the same question at the
+same moment. SingleFlight lets the first caller for a key (the leader) run
+the work while every caller that arrives before it finishes waits for, and
+shares, the leader's result or exception.
+
+run() is for threads (the Flask dev server, find_resources_batch); arun() is
+for coroutines on an event loop. Async flights are cancellation-safe: a
+waiter that is cancelled stops waiting without disturbing the others, the
+shared run is cancelled only once nobody is waiting for it, and if the shared
+run itself is cancelled every waiter sees CancelledError.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    """A threaded call that other callers for the same key can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncFlight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        # Keyed by (event loop, key): a task can only be awaited on its own loop
+        self._async_flights: Dict[Tuple[Any, Hashable], _AsyncFlight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Call func once per in-flight key; returns (result, shared) for every caller"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a threaded call for key is running now"""
+        with self._lock:
+            return key in self._flights
+
+    async def arun(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Await factory() once per in-flight key on this loop; returns (result, shared)"""
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        with self._lock:
+            flight = self._async_flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _AsyncFlight(loop.create_task(factory()))
+                self._async_flights[flight_key] = flight
+                flight.task.add_done_callback(lambda _: self._forget(flight_key, flight))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            # shield() keeps one waiter's cancellation from cancelling the shared run
+            return await asyncio.shield(flight.task), not leader
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                # Last one waiting: stop the run and let new callers start a fresh one
+                self._forget(flight_key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, flight_key, flight: _AsyncFlight):
+        with self._lock:
+            if self._async_flights.get(flight_key) is flight:
+                del self._async_flights[flight_key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                'executions': self.leaders,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights) + len(self._async_flights),
+                # Share of calls that were served by another caller's execution
+                'coalescing_ratio': self.coalesced / total if total else 0.0,
+            }
@@ -0,0 +1,226 @@
+"""
+Nearest-resource lookup over geocoded resource records.
+
+Resource locations live as static lat/lng in the webapp's
+placeholderResources.js, keyed by exact ZIP. SpatialIndex maps records to
+unit vectors on the sphere and builds a KD-tree over them (flat node lists,
+records reordered so every leaf is one contiguous slice). k-nearest and
+radius queries descend the tree nearest side first, score whole leaves with
+one vectorized dot product and skip any subtree whose splitting plane is
+farther than the current k-th result.
+
+Distances are in miles.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# NumPy is imported on first use so importing the Flask app stays fast
+np = None
+
+EARTH_RADIUS_MILES = 3958.8
+
+DEFAULT_LOCATIONS_PATH = os.environ.get(
+    'RESOURCE_LOCATIONS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'webapp', 'my-app', 'src', 'app', 'data', 'placeholderResources.js'),
+)
+
+_JS_COMMENT = re.compile(r"^\s*//.*$", re.MULTILINE)
+_JS_KEY = re.compile(r"^(\s*)([A-Za-z_]\w*)\s*:", re.MULTILINE)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def load_resource_locations(path: str = DEFAULT_LOCATIONS_PATH) -> List[Dict]:
+    """
+    Load resource records from a JSON list or from the webapp's
+    placeholderResources.js ({zip: [record, ...]}); each record gets its 'zip'.
+    """
+    with open(path) as f:
+        text = f.read()
+    if path.endswith('.json'):
+        return json.loads(text)
+
+    # The JS file is an object literal: drop comments, quote keys, strip trailing commas
+    text = _JS_COMMENT.sub("", text)
+    text = text[text.index('{', text.index('=')):text.rindex('}') + 1]
+    text = _TRAILING_COMMA.sub(r"\1", _JS_KEY.sub(r'\1"\2":', text))
+    records = []
+    for zip_code, entries in json.loads(text).items():
+        for entry in entries:
+            records.append(dict(entry, zip=entry.get('zip', zip_code)))
+    return records
+
+
+def extract_zip(text: str) -> Optional[str]:
+    match = _ZIP.search(text or "")
+    return match.group(1) if match else None
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles; array arguments broadcast"""
+    np = _load_numpy()
+    lat1, lng1, lat2, lng2 = (np.radians(v) for v in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """KD-tree k-nearest and radius search over records with 'lat'/'lng'"""
+
+    def __init__(self, records: Iterable[Dict], leaf_size: int = 32):
+        np = _load_numpy()
+        self.records = [r for r in records if r.get('lat') is not None and r.get('lng') is not None]
+        self.leaf_size = leaf_size
+
+        lat = np.radians(np.array([float(r['lat']) for r in self.records], dtype=np.float64))
+        lng = np.radians(np.array([float(r['lng']) for r in self.records], dtype=np.float64))
+        points = np.column_stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)))
+
+        categories = sorted({self._category_key(r.get('category')) for r in self.records})
+        self._category_ids = {c: i for i, c in enumerate(categories)}
+        category = np.array([self._category_ids[self._category_key(r.get('category'))]
+                             for r in self.records], dtype=np.int64)
+
+        # Flat node arrays; a leaf has axis -1 and owns points[start:end]
+        self._axis: List[int] = []
+        self._split: List[float] = []
+        self._children: List[Tuple[int, int]] = []
+        self._bounds: List[Tuple[int, int]] = []
+        order = np.arange(len(self.records))
+        if len(order):
+            self._build(points, order, 0, len(order))
+        self._order = order
+        self._points = points[order]
+        self._category = category[order]
+
+        self._zip_centroids = self._build_zip_centroids()
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def _build(self, points, order, start: int, end: int) -> int:
+        """Split order[start:end] in place at the median of its widest axis"""
+        np = _load_numpy()
+        node = len(self._axis)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._children.append((-1, -1))
+        self._bounds.append((start, end))
+        if end - start <= self.leaf_size:
+            return node
+
+        subset = points[order[start:end]]
+        axis = int(np.argmax(subset.max(axis=0) - subset.min(axis=0)))
+        middle = (end - start) // 2
+        partition = np.argpartition(subset[:, axis], middle)
+        order[start:end] = order[start:end][partition]
+        self._axis[node] = axis
+        self._split[node] = float(points[order[start + middle], axis])
+        left = self._build(points, order, start, start + middle)
+        right = self._build(points, order, start + middle, end)
+        self._children[node] = (left, right)
+        return node
+
+    @staticmethod
+    def _category_key(category: Optional[str]) -> str:
+        return (category or "").strip().lower()
+
+    def _build_zip_centroids(self) -> Dict[str, Tuple[float, float]]:
+        sums: Dict[str, List[float]] = {}
+        for record in self.records:
+            if record.get('zip'):
+                total = sums.setdefault(str(record['zip']), [0.0, 0.0, 0])
+                total[0] += float(record['lat'])
+                total[1] += float(record['lng'])
+                total[2] += 1
+        return {z: (lat / n, lng / n) for z, (lat, lng, n) in sums.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def locate(self, text: str) -> Optional[Tuple[float, float]]:
+        """Approximate (lat, lng) for a caller location containing a known ZIP"""
+        zip_code = extract_zip(text)
+        return self._zip_centroids.get(zip_code) if zip_code else None
+
+    def nearest(self, lat: float, lng: float, k: int = 5, radius_miles: Optional[float] = None,
+                category: Optional[str] = None) -> List[Tuple[Dict, float]]:
+        """Up to k (record, distance in miles) pairs, closest first"""
+        np = _load_numpy()
+        with self._lock:
+            self.queries += 1
+        if not self.records or k < 1:
+            return []
+        category_id = None
+        if category:
+            category_id = self._category_ids.get(self._category_key(category))
+            if category_id is None:
+                return []
+
+        # Work in squared chord length between unit vectors, which orders points
+        # exactly like great-circle distance and needs no trigonometry per point
+        phi, lam = math.radians(lat), math.radians(lng)
+        query = np.array([math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)])
+        limit = math.inf
+        if radius_miles is not None:
+            angle = radius_miles / EARTH_RADIUS_MILES
+            limit = (2 * math.sin(angle / 2)) ** 2 if angle < math.pi else math.inf
+        bound = limit
+
+        best = np.empty(0, dtype=np.int64)
+        best_d2 = np.empty(0, dtype=np.float64)
+        stack = [(0, 0.0)]
+        while stack:
+            node, plane_d2 = stack.pop()
+            if plane_d2 > bound:
+                continue
+            axis = self._axis[node]
+            if axis >= 0:
+                diff = query[axis] - self._split[node]
+                left, right = self._children[node]
+                near, far = (left, right) if diff < 0 else (right, left)
+                # The near side inherits the parent's bound; the far side is at least |diff| away
+                stack.append((far, max(plane_d2, diff * diff)))
+                stack.append((near, plane_d2))
+                continue
+
+            start, end = self._bounds[node]
+            d2 = np.maximum(2.0 - 2.0 * (self._points[start:end] @ query), 0.0)
+            keep = d2 <= bound
+            if category_id is not None:
+                keep &= self._category[start:end] == category_id
+            if not keep.any():
+                continue
+            best = np.concatenate([best, np.flatnonzero(keep) + start])
+            best_d2 = np.concatenate([best_d2, d2[keep]])
+            if len(best) >= k:
+                if len(best) > k:
+                    top = np.argpartition(best_d2, k - 1)[:k]
+                    best, best_d2 = best[top], best_d2[top]
+                bound = min(limit, float(best_d2.max()))
+
+        order = np.argsort(best_d2, kind='stable')
+        miles = 2 * EARTH_RADIUS_MILES * np.arcsin(np.minimum(np.sqrt(best_d2[order]) / 2, 1.0))
+        return [(self.records[self._order[best[i]]], float(d)) for i, d in zip(order, miles)]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'records': len(self.records),
+                'nodes': len(self._axis),
+                'queries': self.queries,
+            }
@@ -0,0 +1,125 @@
+"""
+Tests for ResourceAgent.find_resources_stream and its async counterparts,
+using a scripted stand-in for the streaming chat model (no Groq or SerpAPI
+key needed).
+
+Run with: python -m pytest test_agent_stream.py
+"""
+
+import asyncio
+import itertools
+import re
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+import Untapped_Resource_Agent
+
+ANSWER = "LIHEAP can help pay your heating bill. Apply through your state energy office."
+
+
+class ScriptedStreamingModel(GenericFakeChatModel):
+    """Streams each scripted message word by word, then its tool calls, like a live model"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._generate(messages, stop=stop, **kwargs).generations[0].message
+        for word in re.findall(r'\S+\s*', message.content):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word, id=message.id))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+        for index, call in enumerate(message.tool_calls):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content="", id=message.id, tool_call_chunks=[
+                {'name': call['name'], 'args': '{"query": "%s"}' % call['args']['query'],
+                 'id': call['id'], 'index': index}]))
+            if run_manager:
+                run_manager.on_llm_new_token("", chunk=chunk)
+            yield chunk
+
+
+def scripted_turn():
+    return iter([
+        AIMessage(content="Let me look up energy programs for you first.", tool_calls=[
+            {'name': 'government_resource_search', 'args': {'query': 'energy bill'}, 'id': 'call-1'}]),
+        AIMessage(content=ANSWER),
+    ])
+
+
+@pytest.fixture
+def scripted_agent(make_agent):
+    return lambda messages: make_agent(model=ScriptedStreamingModel(messages=messages),
+                                       search=None, fast_path=False)
+
+
+@pytest.fixture
+def agent(scripted_agent):
+    return scripted_agent(scripted_turn())
+
+
+def answer_tokens(events):
+    """Tokens streamed after the last interim/tool_call event"""
+    tokens = []
+    for event in events:
+        if event['type'] in ('interim', 'tool_call'):
+            tokens = []
+        elif event['type'] == 'token':
+            tokens.append(event['content'])
+    return ''.join(tokens)
+
+
+def test_text_sent_with_tool_calls_is_not_the_answer(agent):
+    events = list(agent.find_resources_stream("I can't pay my heating bill", use_cache=False))
+    types = [event['type'] for event in events]
+    assert types.index('interim') < types.index('tool_call') < types.index('tool_result')
+    assert events[types.index('interim')]['content'] == "Let me look up energy programs for you first."
+
+    final = events[-1]
+    assert final['type'] == 'final' and final['content'] == ANSWER
+    assert answer_tokens(events) == ANSWER
+    # The preamble never appears in the tokens streamed after the tool call
+    assert "look up" not in ''.join(e['content'] for e in events[types.index('tool_call'):]
+                                    if e['type'] == 'token')
+
+
+def test_async_stream_matches_sync(agent, scripted_agent):
+    sync_events = list(agent.find_resources_stream("I can't pay my heating bill", use_cache=False))
+    async_agent = scripted_agent(scripted_turn())
+
+    async def collect():
+        return [event async for event in async_agent.afind_resources_stream(
+            "I can't pay my heating bill", use_cache=False)]
+
+    async_events = asyncio.run(collect())
+    assert [e['type'] for e in async_events] == [e['type'] for e in sync_events]
+    assert async_events[-1]['content'] == sync_events[-1]['content'] == ANSWER
+    assert answer_tokens(async_events) == ANSWER
+
+
+def test_slow_async_reader_does_not_hold_an_llm_slot(scripted_agent, monkeypatch):
+    monkeypatch.setattr(Untapped_Resource_Agent, 'MAX_CONCURRENT_LLM_CALLS', 1)
+    agent = scripted_agent(itertools.repeat(AIMessage(content=ANSWER)))
+
+    async def scenario():
+        stalled = agent.afind_resources_stream("first question", use_cache=False)
+        await stalled.__anext__()        # the reader takes one event, then stops reading
+        # With one LLM slot, this only finishes if the stalled stream has given its slot back
+        answer = await asyncio.wait_for(agent.afind_resources("second question", use_cache=False), 5)
+        await stalled.aclose()
+        return answer
+
+    assert asyncio.run(scenario()) == ANSWER
+
+
+def test_async_answers_are_cached(scripted_agent):
+    agent = scripted_agent(itertools.repeat(AIMessage(content=ANSWER)))
+
+    async def ask_twice():
+        return [await agent.afind_resources("help with my heating bill") for _ in range(2)]
+
+    assert asyncio.run(ask_twice()) == [ANSWER, ANSWER]
+    assert agent.cache_stats()['exact_hits'] == 1
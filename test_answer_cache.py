@@ -0,0 +1,63 @@
+"""
+Tests for the two-tier answer cache: exact hits, near-duplicate hits, and
+near-duplicates that must not share an answer.
+
+Run with: python -m pytest test_answer_cache.py
+"""
+
+import pytest
+
+from answer_cache import AnswerCache, content_words, normalize_query
+
+SAME_QUESTION = [
+    ("help with my electric bill in Georgia", "help paying my electric bill in georgia"),
+    ("where can I find food banks near me", "where can i find a food bank near me"),
+    ("how do I apply for SNAP benefits", "how can I apply for SNAP benefits?"),
+]
+
+DIFFERENT_QUESTION = [
+    ("I need help paying rent and I live in Athens Georgia",
+     "I need help paying rent and I live in Atlanta Georgia"),
+    ("what food banks are open on weekends near me in Austin",
+     "what food banks are open on weekends near me in Dallas"),
+    ("I am a single mother and need help finding childcare assistance",
+     "I am a single father and need help finding childcare assistance"),
+    ("help with rent for a family of 3 in 30303", "help with rent for a family of 4 in 30303"),
+    ("help with my electric bill", "help with my medical bill"),
+]
+
+
+@pytest.mark.parametrize("cached, asked", SAME_QUESTION)
+def test_rephrased_questions_share_an_answer(cached, asked):
+    cache = AnswerCache()
+    cache.put(cached, "answer")
+    assert cache.get(asked) == "answer"
+    assert cache.stats()['near_hits'] == 1
+
+
+@pytest.mark.parametrize("cached, asked", DIFFERENT_QUESTION)
+def test_other_places_and_people_miss(cached, asked):
+    cache = AnswerCache()
+    cache.put(cached, "answer")
+    assert cache.get(asked) is None
+    assert cache.get(cached) == "answer"
+    stats = cache.stats()
+    assert (stats['exact_hits'], stats['near_hits'], stats['misses']) == (1, 0, 1)
+
+
+def test_closest_match_with_the_same_content_words_wins():
+    cache = AnswerCache()
+    cache.put("I need help paying rent in Athens Georgia", "athens")
+    cache.put("help paying rent in Atlanta Georgia", "atlanta")
+    assert cache.get("I need help paying my rent in Atlanta Georgia") == "atlanta"
+    assert content_words(normalize_query("Food banks near me?")) == frozenset({'food', 'bank'})
+
+
+def test_exact_tier_only_and_expiry():
+    cache = AnswerCache(near_duplicates=False)
+    cache.put("help with my electric bill in Georgia", "answer")
+    assert cache.get("Help with my electric bill in Georgia!") == "answer"
+    assert cache.get("help paying my electric bill in georgia") is None
+
+    cache.put("food banks", "stale", ttl_seconds=0)
+    assert cache.get("food banks") is None
@@ -0,0 +1,100 @@
+"""
+Tests for the write-behind call analytics store.
+
+Run with: python -m pytest test_call_analytics.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from call_analytics import CallAnalytics, analytics_files, read_events, summarize  # noqa: E402
+
+DAY = 86400
+TURNS = ["I need help with my electric bill", "Atlanta, GA 30303", "Maria", "34", "18000"]
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_events_are_written_in_batches_and_redacted(tmp_path):
+    path = str(tmp_path / 'calls.db')
+    sink = CallAnalytics(path=path, batch_size=2, flush_seconds=60)
+    sink.record('call_started', 'call-1', direction='inbound')
+    sink.record('turn', 'call-1', step='collecting_age', language='en', latency_ms=1.5,
+                transcript="I'm 34, call me at 404-555-0199")
+    sink.record('call_ended', 'call-1', step='collecting_income', duration_ms=61000)
+    sink.flush()
+
+    events = list(read_events(path))
+    assert [e['event'] for e in events] == ['call_started', 'turn', 'call_ended']
+    assert events[1]['latency_ms'] == 1.5 and events[1]['step'] == 'collecting_age'
+    assert '34' not in events[1]['detail']['transcript'] and '<phone>' in events[1]['detail']['transcript']
+    assert events[2]['detail'] == {'duration_ms': 61000}
+    assert sink.stats()['written'] == 3 and sink.stats()['batches'] == 2
+    assert [e['event'] for e in read_events(path, call_id='other')] == []
+
+
+def test_full_buffer_drops_the_oldest_events(tmp_path):
+    path = str(tmp_path / 'calls.db')
+    sink = CallAnalytics(path=path, buffer_size=3, batch_size=100, flush_seconds=60)
+    for turn in range(5):
+        sink.record('turn', f'call-{turn}', step='greeting')
+    assert sink.stats()['buffered'] == 3 and sink.stats()['dropped'] == 2
+    sink.flush()
+    assert [e['call_id'] for e in read_events(path)] == ['call-2', 'call-3', 'call-4']
+
+    # An empty path records nothing and starts no writer
+    disabled = CallAnalytics(path='')
+    disabled.record('turn', 'call-1')
+    assert disabled.stats()['recorded'] == 0 and not disabled.enabled
+
+
+def test_daily_files_rotate_and_expire(tmp_path):
+    path = str(tmp_path / 'calls.db')
+    clock = FakeClock(20000 * DAY)
+    sink = CallAnalytics(path=path, keep_days=2, clock=clock)
+    for _ in range(4):
+        sink.record('turn', 'call-1', step='greeting')
+        sink.flush()
+        clock.now += DAY
+    files = analytics_files(path)
+    assert len(files) == 2 and all(os.path.basename(f).startswith('calls-') for f in files.values())
+    assert len(list(read_events(path))) == 2
+    assert len(list(read_events(path, days=1))) == 1
+
+
+def test_report_from_persona_calls(tmp_path):
+    from app import AnthonyPersona
+    from call_state import MemoryCallStateStore
+
+    path = str(tmp_path / 'calls.db')
+    sink = CallAnalytics(path=path)
+    persona = AnthonyPersona(call_states=MemoryCallStateStore(), analytics=sink)
+    for text in TURNS:
+        persona.process_user_input('finished', text)
+    persona.end_call('finished', duration_ms=90000)
+    # A Spanish-speaking caller who hangs up at the name question
+    persona.process_user_input('dropped', "Necesito ayuda con mi factura de luz")
+    persona.process_user_input('dropped', "Houston, TX 77002")
+    persona.end_call('dropped')
+    sink.flush()
+
+    summary = summarize(read_events(path))
+    assert summary['calls'] == 2
+    assert summary['events'] == {'turn': 7, 'call_ended': 2}
+    assert summary['drop_off']['collecting_name'] == {'reached': 2, 'ended': 1}
+    assert summary['drop_off']['providing_resources'] == {'reached': 1, 'ended': 1}
+    assert summary['languages'] == {'en': 1, 'es': 1}
+    assert len(summary['latency_ms']['collecting_income']) == 1
+    # The call state no longer carries the history; the store does
+    history = list(read_events(path, call_id='finished'))
+    assert [e['step'] for e in history[:5]] == ['greeting', 'collecting_location', 'collecting_name',
+                                                 'collecting_age', 'collecting_income']
+    assert 'conversation_history' not in persona.get_call_state('new-call')
@@ -0,0 +1,113 @@
+"""
+Tests for the bounded call-state stores and their use by AnthonyPersona.
+
+Run with: python -m pytest test_call_state.py
+"""
+
+import os
+import sys
+
+import pytest
+
+from call_state import (
+    CallStateStore,
+    MemoryCallStateStore,
+    SQLiteCallStateStore,
+    create_call_state_store,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def persona_class():
+    from app import AnthonyPersona
+    return AnthonyPersona
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_ttl_and_lru_eviction(backend, tmp_path):
+    clock = FakeClock()
+    if backend == "memory":
+        store = MemoryCallStateStore(ttl_seconds=60, max_calls=3, clock=clock)
+    else:
+        store = SQLiteCallStateStore(str(tmp_path / "calls.db"), ttl_seconds=60, max_calls=3,
+                                     sweep_every=1, clock=clock)
+    for i in range(4):
+        clock.now += 1
+        store.put(f"call-{i}", {'step': 'greeting', 'n': i})
+    assert store.get("call-0") is None          # least recently used, over max_calls
+    assert store.get("call-3") == {'step': 'greeting', 'n': 3}
+    assert len(store) == 3
+
+    clock.now += 61
+    assert store.get("call-3") is None          # idle past the TTL
+    store.put("call-9", {'step': 'greeting'})
+    assert len(store) == 1
+    assert store.delete("call-9") and not store.delete("call-9")
+    stats = store.stats()
+    assert stats['evicted'] >= 1 and stats['deleted'] == 1
+    store.close()
+
+
+def test_backends_must_implement_the_interface():
+    class PartialStore(CallStateStore):
+        def get(self, call_id):
+            return None
+
+    with pytest.raises(TypeError):
+        CallStateStore()
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "calls.db")
+    first, second = SQLiteCallStateStore(path), SQLiteCallStateStore(path)
+    first.put("call-1", {'step': 'collecting_location', 'user_info': {'name': 'José'}})
+    assert second.get("call-1")['user_info']['name'] == 'José'
+    second.delete("call-1")
+    assert first.get("call-1") is None
+    first.close()
+    second.close()
+
+    with pytest.raises(ValueError):
+        create_call_state_store("redis")
+
+
+def test_workers_share_a_call_and_call_end_evicts(persona_class, tmp_path):
+    path = str(tmp_path / "calls.db")
+    worker_a = persona_class(SQLiteCallStateStore(path))
+    worker_b = persona_class(SQLiteCallStateStore(path))
+
+    worker_a.process_user_input("call-1", "I need help with my electric bill")
+    assert worker_b.get_call_state("call-1")['need_type'] == 'energy'
+    worker_b.process_user_input("call-1", "Atlanta, GA 30303")
+    assert worker_a.get_call_state("call-1")['step'] == 'collecting_name'
+
+    assert worker_a.end_call("call-1")
+    assert worker_b.get_call_state("call-1")['step'] == 'greeting'
+    assert len(worker_b.call_states) == 0
+
+
+def test_memory_stays_bounded_over_many_calls(persona_class):
+    persona = persona_class(MemoryCallStateStore(max_calls=500))
+    for i in range(20000):
+        call_id = f"call-{i}"
+        persona.process_user_input(call_id, "I need food")
+        # One call in five is abandoned without a call_ended event
+        if i % 5:
+            persona.end_call(call_id)
+    stats = persona.call_states.stats()
+    assert stats['calls'] <= 500
+    assert stats['deleted'] == 16000
+    # Every abandoned call is either still held or was evicted
+    assert stats['evicted'] + stats['calls'] == 4000
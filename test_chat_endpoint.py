@@ -0,0 +1,105 @@
+"""
+Tests for the web chat endpoint (/chat): JSON and SSE replies, sessions and
+per-session concurrency limits.
+
+Run with: python -m pytest test_chat_endpoint.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from chat_sessions import SessionLimiter, session_id_from  # noqa: E402
+
+CATALOG_QUESTION = "I need help paying my electric bill"
+
+
+class CountingModel(GenericFakeChatModel):
+    calls: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.fixture
+def chat(monkeypatch, make_agent):
+    import app as app_module
+
+    model = CountingModel(messages=iter([AIMessage(content=f"model answer {i}") for i in range(10)]))
+    agent = make_agent(model=model, search=None)
+    monkeypatch.setattr(app_module, 'resource_agent', agent)
+    monkeypatch.setattr(app_module, 'chat_limiter', SessionLimiter(1))
+    return app_module, app_module.app.test_client(), model
+
+
+def read_events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        event, data = block.split('\n')
+        events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_json_reply_for_the_web_chatbot(chat):
+    _, client, model = chat
+    response = client.post('/chat', json={'message': CATALOG_QUESTION})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert 'LIHEAP' in body['reply'] and session_id_from(body['session_id'])
+    # Catalog-answerable, so the model was never called
+    assert model.calls == 0
+
+    assert client.post('/chat', json={'message': '  '}).status_code == 400
+
+
+def test_streamed_session_keeps_context(chat):
+    app_module, client, model = chat
+    first = read_events(client.post('/chat', json={'message': CATALOG_QUESTION, 'stream': True}))
+    assert [event for event, _ in first] == ['session', 'token', 'done']
+    session_id = first[0][1]['session_id']
+    assert first[-1][1]['fast_path'] and first[-1][1]['session_id'] == session_id
+
+    # A follow-up in the same session goes to the model with the earlier turn as context
+    response = client.post('/chat', json={'message': 'Which of those fits a renter?', 'session_id': session_id},
+                           headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    events = read_events(response)
+    assert events[-1][0] == 'done' and events[-1][1]['reply'] == 'model answer 0'
+    assert ''.join(data['content'] for event, data in events if event == 'token') == 'model answer 0'
+    assert model.calls == 1
+    assert app_module.chat_limiter.stats()['in_flight'] == 0
+
+
+def test_one_message_at_a_time_per_session(chat):
+    app_module, client, _ = chat
+    session_id = 'web-session-1'
+    assert app_module.chat_limiter.acquire(session_id)
+    busy = client.post('/chat', json={'message': CATALOG_QUESTION, 'session_id': session_id})
+    assert busy.status_code == 429 and busy.headers['Retry-After']
+    # Other sessions are unaffected
+    assert client.post('/chat', json={'message': CATALOG_QUESTION, 'session_id': 'web-session-2'}).status_code == 200
+    app_module.chat_limiter.release(session_id)
+    assert client.post('/chat', json={'message': CATALOG_QUESTION, 'session_id': session_id}).status_code == 200
+    assert app_module.chat_limiter.stats() == {'active_sessions': 0, 'in_flight': 0,
+                                               'max_concurrent_per_session': 1, 'rejected': 1}
+
+
+def test_session_ids_and_cors(chat):
+    _, client, _ = chat
+    assert session_id_from('not a session id!') is None and session_id_from(42) is None
+    response = client.post('/chat', json={'message': CATALOG_QUESTION, 'session_id': '../etc'},
+                           headers={'Origin': 'http://localhost:3000'})
+    assert response.get_json()['session_id'] != '../etc'
+    assert response.headers['Access-Control-Allow-Origin'] == '*'
+    preflight = client.options('/chat', headers={'Origin': 'http://localhost:3000'})
+    assert 'POST' in preflight.headers['Access-Control-Allow-Methods']
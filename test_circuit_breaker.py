@@ -0,0 +1,187 @@
+"""
+Tests for the Groq/SerpAPI circuit breakers, using fake slow backends in
+place of the live services.
+
+Run with: python -m pytest test_circuit_breaker.py
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from Untapped_Resource_Agent import DEGRADED_NOTICE, SEARCH_UNAVAILABLE_MESSAGE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowModel(GenericFakeChatModel):
+    """Answers every prompt, taking `delay` seconds per call"""
+    delay: float = 0.0
+    calls: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class SlowSearch:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def run(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"result for {query}"
+
+
+def answers(n):
+    return iter([AIMessage(content=f"answer {i}") for i in range(n)])
+
+
+def test_slow_calls_trip_and_half_open_probe_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker("groq", slow_call_seconds=1.0, window_size=4, minimum_calls=4,
+                             reset_timeout=30, clock=clock)
+    for seconds in (0.1, 2.0, 0.1, 2.0):
+        assert breaker.allow()
+        breaker.record(seconds)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+
+    # After the reset timeout a single probe goes through; a slow probe reopens
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()
+    breaker.record(3.0)
+    assert breaker.state == OPEN
+
+    clock.now = 60
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    stats = breaker.stats()
+    assert stats['trips'] == 2
+    assert stats['slow_calls'] == 3
+    assert stats['rejected'] == 3
+
+
+def test_unreported_probe_does_not_block_forever():
+    clock = FakeClock()
+    breaker = CircuitBreaker("groq", window_size=1, minimum_calls=1, reset_timeout=10, clock=clock)
+    breaker.record(0.0, error=True)
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.allow()
+
+
+def test_call_timeout_counts_as_failure():
+    breaker = CircuitBreaker("serpapi", window_size=2, minimum_calls=2, timeout=0.05)
+    search = SlowSearch(delay=0.5)
+    for _ in range(2):
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            breaker.call(search.run, "rent help")
+        assert time.perf_counter() - start < 0.3
+    assert breaker.stats()['timeouts'] == 2
+    assert breaker.state == OPEN
+
+
+def test_slow_llm_degrades_to_internal_tools(make_agent):
+    model = SlowModel(messages=answers(10), delay=0.05)
+    breaker = CircuitBreaker("groq", slow_call_seconds=0.02, window_size=2, minimum_calls=2)
+    agent = make_agent(model=model, search=SlowSearch(0), fast_path=False, llm_breaker=breaker)
+
+    assert agent.find_resources("housing help", use_cache=False) == "answer 0"
+    assert agent.find_resources("housing help", use_cache=False) == "answer 1"
+    assert breaker.state == OPEN
+
+    degraded = agent.find_resources("housing help", use_cache=False)
+    assert degraded.startswith(DEGRADED_NOTICE)
+    assert "HUD Public Housing" in degraded
+    assert model.calls == 2
+
+    events = list(agent.find_resources_stream("food", use_cache=False))
+    assert events[-1]['degraded'] is True
+    stats = agent.breaker_stats()
+    assert stats['groq']['trips'] == 1
+    assert stats['degraded_answers'] == 2
+
+
+def test_agent_deadline_and_search_outage(make_agent):
+    model = SlowModel(messages=answers(10), delay=0.5)
+    search_breaker = CircuitBreaker("serpapi", window_size=1, minimum_calls=1, timeout=0.05)
+    search = SlowSearch(delay=0.5)
+    agent = make_agent(model=model, search=search, fast_path=False,
+                       search_breaker=search_breaker, timeout=0.1)
+
+    start = time.perf_counter()
+    assert agent.find_resources("food pantry", use_cache=False).startswith(DEGRADED_NOTICE)
+    assert time.perf_counter() - start < 0.4
+    assert agent.breaker_stats()['groq']['timeouts'] == 1
+
+    # A timed-out search tells the model to use the internal tools, then stops calling SerpAPI
+    assert agent._google_search("latest LIHEAP eligibility") == SEARCH_UNAVAILABLE_MESSAGE
+    assert agent._google_search("food bank hours") == SEARCH_UNAVAILABLE_MESSAGE
+    assert search.calls == 1
+    assert agent.breaker_stats()['serpapi']['state'] == OPEN
+
+
+def test_late_finish_of_a_timed_out_probe_is_not_reported(make_agent):
+    clock = FakeClock()
+    breaker = CircuitBreaker("groq", window_size=1, minimum_calls=1, reset_timeout=30, clock=clock)
+    model = SlowModel(messages=answers(10), delay=0.3)
+    agent = make_agent(model=model, search=None, fast_path=False, llm_breaker=breaker, timeout=0.05)
+    agent.warmup()
+    breaker.record(0.0, error=True)
+
+    # The probe times out and reopens the breaker; its run goes on in the background
+    clock.now = 30
+    assert agent.find_resources("food pantry", use_cache=False).startswith(DEGRADED_NOTICE)
+    assert breaker.state == OPEN
+
+    # The late finish arrives while the breaker is half-open again and must not close it
+    clock.now = 60
+    time.sleep(0.5)
+    assert model.calls == 1
+    assert breaker.state == HALF_OPEN
+    assert breaker.stats()['calls'] == 2
+
+
+def test_streams_observe_the_agent_deadline(make_agent):
+    model = SlowModel(messages=answers(10), delay=0.5)
+    agent = make_agent(model=model, search=None, fast_path=False, timeout=0.1)
+    agent.warmup()
+
+    def timed(events):
+        start = time.perf_counter()
+        return list(events), time.perf_counter() - start
+
+    async def atimed():
+        start = time.perf_counter()
+        events = [event async for event in agent.afind_resources_stream("food pantry", use_cache=False)]
+        return events, time.perf_counter() - start
+
+    for events, elapsed in (timed(agent.find_resources_stream("food pantry", use_cache=False)),
+                            asyncio.run(atimed())):
+        assert elapsed < 0.4
+        assert [event['type'] for event in events] == ['interim', 'token', 'final']
+        assert events[-1]['degraded'] and events[-1]['content'].startswith(DEGRADED_NOTICE)
+    assert agent.breaker_stats()['groq']['timeouts'] == 2
@@ -0,0 +1,124 @@
+"""
+Tests for ConversationMemory: summarizing compaction (sync and async),
+idle-session eviction, and turns answered without the model.
+
+Run with: python -m pytest test_conversation_memory.py
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+
+from conversation_memory import SUMMARY_MESSAGE_ID, ConversationMemory
+
+
+class RecordingSummarizer:
+    """Stands in for the chat model; records which interface wrote the summary"""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append('invoke')
+        return AIMessage(content="Caller needs rent help in Atlanta.")
+
+    async def ainvoke(self, messages):
+        self.calls.append('ainvoke')
+        return AIMessage(content="Caller needs rent help in Atlanta.")
+
+
+class RecordingCheckpointer:
+    def __init__(self):
+        self.deleted = []
+
+    def delete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+
+    def get_tuple(self, config):
+        return None
+
+
+def conversation(turns):
+    messages = []
+    for i in range(turns):
+        messages += [HumanMessage(content=f"question {i}", id=f"h{i}"),
+                     AIMessage(content=f"answer {i}", id=f"a{i}")]
+    return messages
+
+
+def make_memory(**kwargs):
+    # One token per message keeps the budgets easy to reason about
+    return ConversationMemory(token_budget=6, keep_recent_tokens=3, token_counter=len,
+                              checkpointer=RecordingCheckpointer(), **kwargs)
+
+
+def check_compacted(update):
+    messages = update['messages']
+    assert isinstance(messages[0], RemoveMessage)
+    assert isinstance(messages[1], SystemMessage) and messages[1].id == SUMMARY_MESSAGE_ID
+    assert "rent help in Atlanta" in messages[1].content
+    assert [m.content for m in messages[2:]] == ["question 4", "answer 4"]
+
+
+def test_history_within_budget_is_left_alone():
+    memory = make_memory()
+    assert memory.pre_model_hook({'messages': conversation(3)}) == {}
+    assert memory.stats()['compactions'] == 0
+
+
+def test_sync_and_async_compaction_use_the_matching_summarizer_call():
+    memory = make_memory()
+    memory.summarizer = RecordingSummarizer()
+    check_compacted(memory.pre_model_hook({'messages': conversation(5)}))
+    check_compacted(asyncio.run(memory.apre_model_hook({'messages': conversation(5)})))
+    assert memory.summarizer.calls == ['invoke', 'ainvoke']
+    assert memory.stats()['compactions'] == 2
+
+
+def test_failed_summarizer_falls_back_to_the_callers_words():
+    memory = make_memory()
+    memory.summarizer = object()  # has no invoke(), like a model call that raises
+    update = memory.pre_model_hook({'messages': conversation(5)})
+    assert update['messages'][1].content.endswith("Caller: question 2 Caller: question 3")
+    assert "answer" not in update['messages'][1].content
+
+
+def test_idle_sessions_are_swept_without_new_traffic():
+    memory = make_memory(idle_ttl_seconds=0.05, sweep_interval_seconds=0.02)
+    memory.touch('call-1')
+    memory.remember('call-1', "food stamps", "SNAP ...")
+    deadline = time.monotonic() + 2
+    while memory.stats()['active_sessions'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    memory.close()
+    assert memory._checkpointer.deleted == ['call-1']
+    assert memory.stats()['pending_turns'] == 0 and memory.stats()['evictions'] == 1
+
+
+def test_oldest_sessions_are_evicted_past_max_sessions():
+    memory = make_memory(max_sessions=2, sweep_interval_seconds=0)
+    for session in ('a', 'b', 'a', 'c'):
+        memory.touch(session)
+    assert memory._checkpointer.deleted == ['b']
+    assert memory.stats()['active_sessions'] == 2
+
+
+def test_answers_without_the_model_join_the_next_model_turn():
+    memory = make_memory(sweep_interval_seconds=0)
+    memory.touch('s')
+    assert not memory.has_history('s')
+    memory.remember('s', "food stamps", "Apply for SNAP.")
+    assert memory.has_history('s')
+    assert memory.turn_input('s', "which fits a renter?") == {'messages': [
+        ("user", "food stamps"), ("assistant", "Apply for SNAP."), ("user", "which fits a renter?")]}
+    assert memory.turn_input('s', "next") == {'messages': [("user", "next")]}
+
+
+def test_fast_path_turns_do_not_build_the_agent(make_agent):
+    agent = make_agent(model=None, search=None)
+    assert agent.find_resources("I need food stamps", session_id='web-1').startswith("**Government")
+    assert agent._session_agent is None and agent._agent is None
+    assert agent.memory.stats()['pending_turns'] == 1
+    agent.end_session('web-1')
+    assert agent.memory.stats()['pending_turns'] == 0
@@ -0,0 +1,102 @@
+"""
+Tests for the vectorized eligibility screening engine.
+
+Run with: python -m pytest test_eligibility.py
+"""
+
+import random
+
+from eligibility import (
+    STATE_CODES,
+    ZIP_PREFIXES,
+    EligibilityEngine,
+    state_from_location,
+    state_from_zip,
+)
+
+
+def names(programs):
+    return {program['name'] for program in programs}
+
+
+def test_state_overrides_change_medicaid():
+    engine = EligibilityEngine()
+    assert state_from_location("Atlanta, GA 30303") == 'GA'
+    assert state_from_location("Brooklyn, New York") == 'NY'
+    assert state_from_location("somewhere") is None
+
+    # A 30-year-old at ~100% FPL: covered under expansion, not in Georgia
+    assert "Medicaid" in names(engine.screen(age=30, income=15000, state='NY'))
+    assert "Medicaid" not in names(engine.screen(age=30, income=15000, state='GA'))
+    # Alaska's higher poverty line makes the same income qualify for SNAP
+    assert "SNAP (Food Stamps)" not in names(engine.screen(age=30, income=20000))
+    assert "SNAP (Food Stamps)" in names(engine.screen(age=30, income=20000, state='AK'))
+
+
+def test_state_codes_need_a_location_context():
+    assert state_from_location("Tulsa, OK") == 'OK'
+    assert state_from_location("Gary IN 46402") == 'IN'
+    assert state_from_location("ME") == 'ME'
+    for text in ("I'm OK", "OK so I live IN the city", "Call ME back later", "I am OK, thanks"):
+        assert state_from_location(text) is None
+
+
+def test_zip_codes_map_to_their_state():
+    assert state_from_location("30303") == 'GA'
+    assert state_from_location("my zip is 10001-1234") == 'NY'
+    assert state_from_location("73301") == 'TX'
+    assert state_from_location("99501") == 'AK'
+    assert state_from_location("00901") is None  # Puerto Rico has no state limits
+    assert state_from_location("Tulsa, OK 74103") == 'OK'
+    assert state_from_location("my income is 30000", allow_zip=False) is None
+    assert all(state_from_zip(f"{prefix:03d}00") in STATE_CODES.values()
+               for start, end, _ in ZIP_PREFIXES for prefix in (start, end))
+
+
+def test_unknown_values_do_not_exclude():
+    engine = EligibilityEngine()
+    unknown = names(engine.screen())
+    assert {"SNAP (Food Stamps)", "Medicaid", "SSI", "Medicare"} <= unknown
+    assert "WIC" not in unknown   # needs children, and the default is none
+
+    wealthy = names(engine.screen(age=40, income=500000))
+    assert wealthy == {"Unemployment Insurance"}
+
+
+def test_batch_matches_scalar_screen():
+    engine = EligibilityEngine()
+    rng = random.Random(5)
+    states = [None, 'NY', 'GA', 'TX', 'AK', 'HI', 'WI', 'CA']
+    profiles = [
+        dict(age=rng.choice([None, rng.randint(16, 90)]),
+             income=rng.choice([None, rng.randint(0, 90000)]),
+             household_size=rng.randint(1, 6),
+             state=rng.choice(states),
+             children=rng.randint(0, 3))
+        for _ in range(300)
+    ]
+    matrix = engine.screen_batch(
+        [p['age'] for p in profiles],
+        [p['income'] for p in profiles],
+        household_sizes=[p['household_size'] for p in profiles],
+        states=[p['state'] for p in profiles],
+        children=[p['children'] for p in profiles],
+    )
+    for row, profile in zip(matrix, profiles):
+        expected = names(engine.screen(**profile))
+        assert {p['name'] for p, hit in zip(engine.programs, row) if hit} == expected
+
+
+def test_prefilter_then_refine_matches_screen():
+    engine = EligibilityEngine()
+    rng = random.Random(7)
+    # Incomes exactly at program limits as well as random ones
+    boundary = [15060 * 1.3, 15060 * 1.5, 15060 * 2, 18810 * 1.3, 15060 * 1.38]
+    for _ in range(500):
+        state = rng.choice([None, 'NY', 'GA', 'TX', 'AK', 'HI', 'WI', 'CA', 'xx'])
+        household_size, children = rng.randint(1, 5), rng.randint(0, 2)
+        age = rng.choice([None, rng.randint(16, 90), 19, 64, 65])
+        income = rng.choice([None, rng.randint(0, 90000), rng.choice(boundary)])
+        shortlist = engine.prefilter(state=state, household_size=household_size, children=children)
+        assert shortlist.refine(age=age, income=income) == engine.screen(
+            age=age, income=income, household_size=household_size, state=state, children=children)
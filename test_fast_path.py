@@ -0,0 +1,63 @@
+"""
+Tests for the deterministic fast path: which queries it answers from the
+catalogs and which it must leave to the LLM.
+
+Run with: python -m pytest test_fast_path.py
+"""
+
+import pytest
+
+from fast_path import FastPathRouter
+from Untapped_Resource_Agent import (
+    GOVERNMENT_RESOURCE_CATEGORIES,
+    NONPROFIT_CATEGORIES,
+    financial_info_explainer,
+)
+
+
+@pytest.fixture
+def router():
+    return FastPathRouter(GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES,
+                          financial_info_explainer)
+
+
+@pytest.mark.parametrize("query, needs", [
+    ("I need food stamps", ['food']),
+    ("help paying my electric bill in Georgia", ['energy']),
+    ("I need help with my heating bill", ['energy']),
+    ("help with my water bill", ['energy']),
+    ("I need help with utilities and groceries", ['energy', 'food']),
+    ("food bank 30303", ['food']),
+])
+def test_catalog_questions_take_the_fast_path(router, query, needs):
+    confidence, found = router.score(query)
+    assert confidence >= router.threshold and found == needs
+    assert router.route(query) is not None
+
+
+@pytest.mark.parametrize("query", [
+    "help with my medical bill",
+    "I have a hospital bill I cannot pay",
+    "help with my bill",
+])
+def test_bill_alone_is_not_an_energy_need(router, query):
+    confidence, needs = router.score(query)
+    assert 'energy' not in needs
+    assert router.route(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "I dont need food stamps I need housing",
+    "I don't need food stamps, I need housing",
+    "not food, I need help with rent",
+    "I need housing but no food",
+    "rent help without a voucher",
+])
+def test_negated_needs_go_to_the_llm(router, query):
+    assert router.score(query)[0] == 0.0
+    assert router.route(query) is None
+
+
+def test_specific_info_goes_to_the_llm(router):
+    assert router.route("phone number for the Atlanta housing authority") is None
+    assert router.stats()['declined'] == 1
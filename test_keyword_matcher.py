@@ -0,0 +1,94 @@
+"""
+Tests for the single-pass keyword matcher behind Anthony's turn analysis.
+
+Run with: python -m pytest test_keyword_matcher.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from keyword_matcher import KeywordMatcher, analyze_turn  # noqa: E402
+
+
+def test_whole_words_and_inflections():
+    # "aid" in "said" and "eat" in "great" were substring false positives
+    assert analyze_turn("She said that was great").need == 'general'
+    assert analyze_turn("I need financial aid").need == 'money'
+    assert analyze_turn("I can't pay my bills").need == 'energy'
+    assert analyze_turn("I can't pay my utilities").need == 'energy'
+    assert analyze_turn("I'm renting and behind").need == 'housing'
+    assert analyze_turn("We have not been eating").need == 'food'
+    # Earlier needs win, as in the original if/elif order
+    assert analyze_turn("my rent and my electric bill").need == 'energy'
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Hola, necesito ayuda por favor", 'es'),    # "por favor" is also Portuguese; Spanish is checked first
+    ("Bonjour, j’ai besoin d’aide", 'fr'),
+    ("Hallo, ich brauche Hilfe", 'de'),           # "hallo" is also Dutch; German is checked first
+    ("नमस्ते, मुझे मदद चाहिए", 'hi'),
+    ("Привет, мне нужно помощь", 'ru'),
+    ("Olá, preciso de ajuda", 'pt'),
+    ("こんにちは、助けが必要です", 'ja'),
+    ("Ciao, ho bisogno di aiuto", 'it'),
+    ("Ik heb hulp nodig, dank je", 'nl'),
+    ("I need help with my electric bill", 'en'),
+    ("Chaos at home", 'en'),                      # "ciao" must not match inside other words
+])
+def test_language_detection(text, language):
+    assert analyze_turn(text).language == language
+
+
+def test_urgency_follows_conversation_language():
+    assert analyze_turn("They are shutting it off today").is_urgent('en')
+    assert analyze_turn("Es una emergencia, hoy").is_urgent('es')
+    assert analyze_turn("C'est pour aujourd'hui").is_urgent('fr')
+    assert analyze_turn("чрезвычайная ситуация").is_urgent('ru')
+    assert analyze_turn("今日電気が停止されます").is_urgent('ja')
+    assert not analyze_turn("Es una emergencia").is_urgent('en')
+    # Languages without urgent keywords fall back to English
+    assert analyze_turn("eviction notice").is_urgent('xx')
+    assert not analyze_turn("I'll call back another day").is_urgent('en')
+
+
+def test_intent_matches_extract_user_intent():
+    from utils import extract_user_intent
+
+    assert extract_user_intent("I need food right now") == {
+        'category': 'food', 'urgency': 'high', 'specific_need': None}
+    assert extract_user_intent("Can you help soon with my debts") == {
+        'category': 'financial', 'urgency': 'medium', 'specific_need': None}
+    assert extract_user_intent("hello") == {'category': 'general', 'urgency': 'normal', 'specific_need': None}
+
+
+def test_custom_keyword_lists():
+    matcher = KeywordMatcher(languages={'es': ['renta']}, urgent={}, needs={'housing': ['renta', 'right now']},
+                             intent_categories={}, intent_urgency={})
+    analysis = matcher.analyze("Necesito la renta right now")
+    assert (analysis.language, analysis.need) == ('es', 'housing')
+
+
+def test_persona_uses_one_analysis_per_turn():
+    from app import AnthonyPersona
+
+    persona = AnthonyPersona()
+    response = persona.process_user_input('kw-call', "Hola, necesito ayuda con comida y la renta, mis bills")
+    state = persona.get_call_state('kw-call')
+    assert state['language'] == 'es'
+    assert state['need_type'] == 'energy'
+    assert state['step'] == 'collecting_location'
+    assert response.startswith("Entendido")
+
+    urgent = persona.process_user_input('kw-urgent', "I got an eviction notice")
+    assert urgent.startswith("I'm really sorry")
+
+
+def test_corrections():
+    assert analyze_turn("Actually, I need food help").correction
+    assert analyze_turn("Cambié de opinión, vivo en Texas").correction
+    assert analyze_turn("実は食べ物が必要です").correction
+    assert not analyze_turn("I need food help").correction
@@ -0,0 +1,79 @@
+"""
+Tests for the Anthony message catalog.
+
+Run with: python -m pytest test_message_catalog.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from message_catalog import DEFAULT_MESSAGES_PATH, MessageCatalog  # noqa: E402
+
+
+@pytest.fixture
+def data():
+    with open(DEFAULT_MESSAGES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_renders_selected_language_with_english_fallback(data):
+    catalog = MessageCatalog(data)
+    assert catalog.render('es', 'ask_location', need_type='food') == (
+        "Entendido, necesitas ayuda con food. ¿En qué estado o código postal estás?")
+    assert catalog.render('xx', 'ask_age') == "What's your age?"
+    assert catalog.render(None, 'greeting').startswith("Hi, I'm Anthony")
+    assert set(catalog.message_keys) == set(data['en']['messages'])
+    for code in data:
+        assert set(data[code]['messages']) == set(catalog.message_keys), code
+
+
+def test_adding_a_language_is_data_only(data):
+    data['sw'] = {'name': 'Swahili', 'messages': {'ask_age': "Una umri gani?"}}
+    catalog = MessageCatalog(data)
+    assert 'sw' in catalog and catalog.language_names['sw'] == 'Swahili'
+    assert catalog.render('sw', 'ask_age') == "Una umri gani?"
+    # Messages not yet translated fall back to English
+    assert catalog.render('sw', 'ask_name') == data['en']['messages']['ask_name']
+
+
+def test_language_keywords_come_from_the_catalog(data):
+    from keyword_matcher import KeywordMatcher
+
+    data['sw'] = {'name': 'Swahili', 'messages': {},
+                  'keywords': {'detect': ['habari', 'msaada'], 'urgent': ['dharura', 'leo']}}
+    matcher = KeywordMatcher.from_catalog(MessageCatalog(data))
+    analysis = matcher.analyze("Habari, nahitaji msaada leo")
+    assert analysis.language == 'sw' and analysis.is_urgent('sw')
+    assert matcher.analyze("Hola, necesito ayuda hoy").is_urgent('es')
+    # A language without urgent keywords uses the English ones
+    del data['sw']['keywords']['urgent']
+    assert KeywordMatcher.from_catalog(MessageCatalog(data)).analyze("eviction today").is_urgent('sw')
+
+    data['sw']['keywords']['urgnet'] = ['dharura']
+    with pytest.raises(ValueError, match="urgnet"):
+        MessageCatalog(data)
+
+
+def test_placeholders_are_validated(data):
+    data['es']['messages']['ask_location'] = "Entendido. ¿En qué estado estás?"
+    with pytest.raises(ValueError, match="es.ask_location"):
+        MessageCatalog(data)
+    data['es']['messages']['ask_location'] = "{need} ok"
+    with pytest.raises(ValueError):
+        MessageCatalog(data)
+
+
+def test_persona_replies_from_catalog():
+    from app import AnthonyPersona
+
+    persona = AnthonyPersona()
+    assert persona.process_user_input('cat-call', "Hallo, ich brauche Hilfe mit Strom und Heizung bill") == (
+        "Verstanden, Sie brauchen Hilfe mit energy. In welchem Bundesstaat oder Postleitzahl sind Sie?")
+    assert persona.process_user_input('cat-call', "10115") == (
+        "Danke. Wie ist Ihr Name? Sie können das überspringen, wenn Sie möchten.")
+    assert persona.supported_languages['ja'] == 'Japanese'
@@ -0,0 +1,99 @@
+"""
+Tests for the offline record/replay harness, using a scripted stand-in for
+the live chat model (no Groq or SerpAPI key needed).
+
+Run with: python -m pytest test_replay_harness.py
+"""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from replay_harness import (
+    FixtureStore,
+    ModelRecorder,
+    RecordingSearch,
+    ReplayChatModel,
+    StageTimer,
+    attach_callbacks,
+    replay_components,
+)
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Searches once, then answers; stands in for ChatGroq while recording"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class LiveSearch:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, query):
+        self.calls.append(query)
+        return f"live result for {query}"
+
+
+def scripted_responses(n_queries):
+    for i in range(n_queries):
+        yield AIMessage(content="", tool_calls=[
+            {'name': 'google_search', 'args': {'query': f'search {i}'}, 'id': f'call-{i}'}])
+        yield AIMessage(content=f"final answer {i}")
+
+
+@pytest.fixture
+def replay_agent(make_agent):
+    # Each agent gets its own search cache so replays never hit recorded-run entries
+    return lambda model, search: make_agent(model=model, search=search, fast_path=False)
+
+
+@pytest.fixture
+def recorded(tmp_path, replay_agent):
+    fixtures = FixtureStore(str(tmp_path / "fixtures"))
+    live_search = LiveSearch()
+    agent = replay_agent(ScriptedModel(messages=scripted_responses(2)),
+                         RecordingSearch(live_search, fixtures))
+    attach_callbacks(agent, [ModelRecorder(fixtures)])
+    answers = [agent.find_resources(q, use_cache=False) for q in ("query zero", "query one")]
+    assert live_search.calls == ["search 0", "search 1"]
+    fixtures.save()
+    return str(tmp_path / "fixtures"), answers
+
+
+def test_replay_matches_recording(recorded, replay_agent):
+    fixtures_dir, answers = recorded
+    model, search = replay_components(fixtures_dir)
+    assert model.fixtures.queries == ["query one", "query zero"]
+
+    agent = replay_agent(model, search)
+    timer = StageTimer()
+    attach_callbacks(agent, [timer])
+    # Replay order does not matter; responses are keyed by turn, not call order
+    assert agent.find_resources("query one", use_cache=False) == answers[1]
+    assert agent.find_resources("query zero", use_cache=False) == answers[0]
+
+    assert answers == ["final answer 0", "final answer 1"]
+    assert len(timer.durations['llm']) == 4
+    assert len(timer.durations['tool:google_search']) == 2
+
+
+def test_injected_latency_and_missing_fixture(recorded, replay_agent):
+    fixtures_dir, _ = recorded
+    model, search = replay_components(fixtures_dir, llm_latency=0.05, search_latency=0.05)
+    agent = replay_agent(model, search)
+    timer = StageTimer()
+    attach_callbacks(agent, [timer])
+    agent.find_resources("query zero", use_cache=False)
+
+    assert min(timer.durations['llm']) >= 0.05
+    assert min(timer.durations['tool:google_search']) >= 0.05
+    with pytest.raises(ValueError, match="No recorded model response"):
+        agent.find_resources("never recorded", use_cache=False)
+
+
+def test_replay_requires_fixtures(tmp_path):
+    with pytest.raises(ValueError, match="No fixtures"):
+        replay_components(str(tmp_path / "empty"))
+    assert isinstance(ReplayChatModel(fixtures=FixtureStore(str(tmp_path))), ReplayChatModel)
@@ -0,0 +1,87 @@
+"""
+Tests for the ranked catalog retriever.
+
+Run with: python -m pytest test_resource_retrieval.py
+"""
+
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from Untapped_Resource_Agent import GOVERNMENT_RESOURCE_CATEGORIES, NONPROFIT_CATEGORIES
+from resource_retrieval import ResourceRetriever, tokenize
+
+
+@pytest.fixture
+def retriever():
+    retriever = ResourceRetriever()
+    retriever.add_catalog(GOVERNMENT_RESOURCE_CATEGORIES, "government")
+    retriever.add_catalog(NONPROFIT_CATEGORIES, "nonprofit")
+    return retriever
+
+
+def brute_force_bm25(retriever, query, k1=1.2, b=0.75):
+    """Reference BM25 scores computed directly from the entries"""
+    docs = [Counter(tokenize(" ".join((e.name, e.source, *e.categories, e.text))))
+            for e in retriever._entries]
+    avgdl = sum(sum(d.values()) for d in docs) / len(docs)
+    scores = []
+    for doc in docs:
+        length = sum(doc.values())
+        score = 0.0
+        for term in set(tokenize(query)):
+            if term not in doc:
+                continue
+            df = sum(1 for d in docs if term in d)
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            tf = doc[term]
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avgdl))
+        scores.append(score)
+    return scores
+
+
+def test_duplicates_are_merged_across_categories(retriever):
+    names = [entry.name for entry in retriever._entries]
+    assert names.count("Medicaid") == 1
+    assert "Housing Choice Voucher Program (Section 8)" in names
+    assert "Housing Choice Voucher Program" not in names
+
+    (medicaid, _), = [r for r in retriever.search("medicaid") if r[0].name == "Medicaid"]
+    assert medicaid.categories == ("financial assistance", "healthcare")
+
+
+def test_matches_brute_force_ranking(retriever):
+    rng = random.Random(3)
+    vocabulary = sorted({t for e in retriever._entries for t in tokenize(e.name)})
+    for _ in range(50):
+        query = " ".join(rng.sample(vocabulary, rng.randint(1, 3)))
+        expected = brute_force_bm25(retriever, query)
+        results = retriever.search(query, k=5)
+        assert results, query
+        ranked = sorted((s for s in expected if s > 0), reverse=True)[:5]
+        assert [round(score, 9) for _, score in results] == [round(s, 9) for s in ranked]
+
+
+def test_top_k_sources_and_no_match(retriever):
+    results = retriever.search("veterans programs", k=3)
+    assert len(results) == 3
+    assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+    nonprofit = retriever.search("housing", k=20, sources=["nonprofit"])
+    assert nonprofit and all(entry.source == "nonprofit" for entry, _ in nonprofit)
+
+    assert retriever.search("xyzzy") == []
+    assert retriever.search("I need help with") == []
+
+
+def test_ties_keep_catalog_order():
+    retriever = ResourceRetriever()
+    for name in ["Alpha Center", "Beta Center", "Gamma Center"]:
+        retriever.add(name, "nonprofit", "food assistance")
+    assert [e.name for e, _ in retriever.search("food", k=2)] == ["Alpha Center", "Beta Center"]
+
+    # Adding an entry rebuilds the index on the next search
+    retriever.add("Food Bank", "nonprofit", "food assistance")
+    assert retriever.search("food", k=1)[0][0].name == "Food Bank"
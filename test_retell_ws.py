@@ -0,0 +1,86 @@
+"""
+Tests for the Retell custom-LLM WebSocket server and sentence chunking.
+
+Run with: python -m pytest test_retell_ws.py
+"""
+
+import json
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from websockets.exceptions import InvalidStatus  # noqa: E402
+from websockets.sync.client import connect  # noqa: E402
+
+from utils import sentence_chunks  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def ws_url():
+    import retell_ws
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    retell_ws.start_in_thread('127.0.0.1', port)
+    return f'ws://127.0.0.1:{port}'
+
+
+def read_reply(websocket, response_id):
+    chunks = []
+    while True:
+        event = json.loads(websocket.recv(timeout=10))
+        if event.get('response_id') != response_id:
+            continue
+        assert event['response_type'] == 'response'
+        if event['content_complete']:
+            return chunks
+        chunks.append(event['content'])
+
+
+def test_sentence_chunks():
+    pieces = ["Thanks, Maria. I found 3 ", "resources.\n\n1. Energy Help\nCall 555. ", "Ok? Yes!"]
+    chunks = list(sentence_chunks(pieces))
+    assert ''.join(chunks) == ''.join(pieces)
+    assert chunks[:2] == ["Thanks, Maria. ", "I found 3 resources.\n\n"]
+    assert "1. Energy Help\n" in chunks
+    # Sentences shorter than min_chars ride along with the next one
+    assert chunks[-2:] == ["Call 555. Ok? ", "Yes!"]
+    assert list(sentence_chunks(["你好。", "我需要帮助。"], min_chars=1)) == ["你好。", "我需要帮助。"]
+
+
+def test_call_streams_the_same_replies_as_the_webhook(ws_url):
+    from app import AnthonyPersona
+
+    reference = AnthonyPersona()
+    turns = ["I need help with my electric bill", "Atlanta, GA 30303", "Maria", "34", "18000"]
+    with connect(f'{ws_url}/llm-websocket/ws-test-call') as websocket:
+        assert json.loads(websocket.recv(timeout=10))['response_type'] == 'config'
+        assert ''.join(read_reply(websocket, 0)) == reference.get_greeting('en')
+
+        transcript = []
+        for response_id, text in enumerate(turns, 1):
+            transcript.append({'role': 'user', 'content': text})
+            websocket.send(json.dumps({'interaction_type': 'response_required',
+                                       'response_id': response_id, 'transcript': transcript}))
+            chunks = read_reply(websocket, response_id)
+            assert ''.join(chunks) == reference.process_user_input('reference-call', text)
+            transcript.append({'role': 'agent', 'content': ''.join(chunks)})
+        # The resource list arrives as several speakable chunks, not one block
+        assert len(chunks) > 3
+
+        websocket.send(json.dumps({'interaction_type': 'ping_pong', 'timestamp': 123}))
+        assert json.loads(websocket.recv(timeout=10)) == {'response_type': 'ping_pong', 'timestamp': 123}
+
+        websocket.send(json.dumps({'interaction_type': 'reminder_required', 'response_id': 9,
+                                   'transcript': transcript}))
+        assert read_reply(websocket, 9)
+
+
+def test_other_paths_are_rejected(ws_url):
+    with pytest.raises(InvalidStatus) as error:
+        connect(f'{ws_url}/not-retell')
+    assert error.value.response.status_code == 404
@@ -0,0 +1,87 @@
+"""
+Tests for batch mode in run_agent.py: resuming, retrying failed queries and
+bypassing the answer cache, with a stand-in chat model (no API keys needed).
+
+Run with: python -m pytest test_run_agent.py
+"""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from circuit_breaker import CircuitBreaker
+from run_agent import load_completed_ids, run_batch
+
+
+class FlakyModel(GenericFakeChatModel):
+    """Answers every question, failing once for each question in `failures`"""
+    failures: set = set()
+    asked: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        question = messages[-1].content
+        self.asked.append(question)
+        if question in self.failures:
+            self.failures.discard(question)
+            raise RuntimeError("Groq unavailable")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"answer: {question}"))])
+
+
+@pytest.fixture
+def flaky_agent(make_agent):
+    def make(failures=(), **kwargs):
+        model = FlakyModel(messages=iter([]), failures=set(failures), asked=[])
+        return make_agent(model=model, search=None, fast_path=False, **kwargs), model
+
+    return make
+
+
+def test_resume_retries_only_failed_queries(flaky_agent, tmp_path, capsys):
+    in_path, out_path = tmp_path / "queries.jsonl", tmp_path / "answers.jsonl"
+    in_path.write_text(''.join(json.dumps({'id': i, 'query': f"question {i}"}) + '\n' for i in range(3)))
+    agent, model = flaky_agent(failures={"question 1"})
+
+    run_batch(agent, str(in_path), str(out_path), 2, use_cache=False)
+    assert load_completed_ids(str(out_path)) == {'0', '2'}
+
+    run_batch(agent, str(in_path), str(out_path), 2, use_cache=False)
+    assert load_completed_ids(str(out_path)) == {'0', '1', '2'}
+    assert sorted(model.asked) == ["question 0", "question 1", "question 1", "question 2"]
+    assert "Queries run:  1 (0 errors, 2 skipped)" in capsys.readouterr().out
+
+
+def test_batches_bypass_the_answer_cache_by_default(flaky_agent):
+    agent, model = flaky_agent()
+    agent.answer_cache.put("rent help in Atlanta", "stale cached answer")
+    results = list(agent.find_resources_batch(["rent help in Atlanta"]))
+    assert results[0]['response'] == "answer: rent help in Atlanta"
+
+    results = list(agent.find_resources_batch(["rent help in Atlanta"], use_cache=True))
+    assert results[0]['response'] == "stale cached answer"
+
+
+def test_degraded_answers_are_failures_that_resume_retries(flaky_agent, tmp_path, capsys):
+    in_path, out_path = tmp_path / "queries.jsonl", tmp_path / "answers.jsonl"
+    in_path.write_text(''.join(json.dumps({'id': i, 'query': f"question {i}"}) + '\n' for i in range(2)))
+    breaker = CircuitBreaker("groq", window_size=1, minimum_calls=1, reset_timeout=60)
+    agent, model = flaky_agent(llm_breaker=breaker)
+    breaker.record(0.0, error=True)
+
+    run_batch(agent, str(in_path), str(out_path), 2, use_cache=False)
+    records = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert [r['error'] for r in records] == ["degraded: model circuit open"] * 2
+    assert all(r['response'] for r in records)
+    assert load_completed_ids(str(out_path)) == set()
+    assert model.asked == []
+
+    breaker.reset()
+    run_batch(agent, str(in_path), str(out_path), 2, use_cache=False)
+    assert load_completed_ids(str(out_path)) == {'0', '1'}
+    assert sorted(model.asked) == ["question 0", "question 1"]
+    assert "Queries run:  2 (0 errors, 0 skipped)" in capsys.readouterr().out
@@ -0,0 +1,154 @@
+"""
+Tests for the persistent google_search cache, run against a local fake
+search backend (no SerpAPI key or network needed).
+
+Run with: python -m pytest test_search_cache.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from search_cache import SearchCache
+
+
+class FakeSearch:
+    """Stands in for SerpAPIWrapper.run; counts calls and can block or fail"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def run(self, query: str) -> str:
+        with self._lock:
+            self.calls.append(query)
+            n = len(self.calls)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("search backend unavailable")
+        return f"result #{n} for {query}"
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "search_cache.db")
+
+
+def test_hit_after_miss_and_survives_restart(db_path):
+    backend = FakeSearch()
+    cache = SearchCache(backend.run, path=db_path)
+    first = cache.run("LIHEAP eligibility Georgia")
+    assert cache.run("liheap eligibility  georgia") == first
+    assert len(backend.calls) == 1
+    cache.close()
+
+    reopened = SearchCache(backend.run, path=db_path)
+    assert reopened.run("LIHEAP eligibility Georgia") == first
+    assert len(backend.calls) == 1
+    reopened.close()
+
+
+def test_entry_expires_after_its_ttl(db_path):
+    backend = FakeSearch()
+    clock = FakeClock()
+    cache = SearchCache(backend.run, path=db_path, ttl_seconds=60, clock=clock)
+    cache.run("food banks in NYC")
+    cache.run("contact for section 8", ttl_seconds=600)
+
+    clock.now += 61
+    assert cache.get("food banks in NYC") is None
+    assert cache.get("contact for section 8") is not None
+    cache.run("food banks in NYC")
+    assert backend.calls.count("food banks in NYC") == 2
+    assert cache.purge_expired() == 0
+    cache.close()
+
+
+def test_concurrent_misses_make_one_backend_call(db_path):
+    backend = FakeSearch(delay=0.2)
+    cache = SearchCache(backend.run, path=db_path)
+    results = []
+
+    def worker():
+        results.append(cache.run("latest LIHEAP eligibility"))
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(backend.calls) == 1
+    assert len(set(results)) == 1 and len(results) == 20
+    stats = cache.stats()
+    # Counters are updated under a lock, so no increment is lost between threads
+    assert stats['hits'] + stats['misses'] == 20
+    assert 1 <= stats['coalesced'] <= stats['misses'] - 1
+    cache.close()
+
+
+def test_backend_errors_reach_every_waiter_and_are_not_cached(db_path):
+    backend = FakeSearch(delay=0.2, fail=True)
+    cache = SearchCache(backend.run, path=db_path)
+    errors = []
+
+    def worker():
+        try:
+            cache.run("food pantry hours")
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 5
+    assert cache.get("food pantry hours") is None
+    backend.fail = False
+    assert cache.run("food pantry hours").startswith("result")
+    cache.close()
+
+
+def test_near_expiry_hit_refreshes_in_background(db_path):
+    backend = FakeSearch()
+    clock = FakeClock()
+    cache = SearchCache(backend.run, path=db_path, ttl_seconds=100,
+                        refresh_ahead=0.2, clock=clock)
+    first = cache.run("housing authority phone")
+
+    clock.now += 50
+    assert cache.run("housing authority phone") == first
+    assert len(backend.calls) == 1
+
+    clock.now += 35
+    # Still inside the TTL: served from cache while a refresh runs behind it
+    assert cache.run("housing authority phone") == first
+    cache.close()
+    assert len(backend.calls) == 2
+    assert cache.refreshes == 1
+
+
+def test_warm_prefills_and_skips_cached(db_path):
+    backend = FakeSearch()
+    cache = SearchCache(backend.run, path=db_path)
+    cache.run("snap office atlanta")
+
+    counts = cache.warm(["snap office atlanta", "", "LIHEAP Georgia", "food banks NYC\n"])
+    assert counts == {'fetched': 2, 'skipped': 1, 'failed': 0}
+    calls = len(backend.calls)
+    cache.run("food banks NYC")
+    assert len(backend.calls) == calls
+    cache.close()
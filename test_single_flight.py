@@ -0,0 +1,143 @@
+"""
+Tests for coalescing identical in-flight agent queries, threaded and async.
+
+Run with: python -m pytest test_single_flight.py
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from single_flight import SingleFlight
+
+
+class SlowModel(GenericFakeChatModel):
+    """Answers every prompt after `delay` seconds, or raises `error` if set"""
+    delay: float = 0.0
+    calls: int = 0
+    error: str = ""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+@pytest.fixture
+def slow_agent(make_agent):
+    return lambda model: make_agent(model=model, search=None, fast_path=False)
+
+
+def answers(n):
+    return iter([AIMessage(content=f"answer {i}") for i in range(n)])
+
+
+def test_threaded_callers_share_one_run(slow_agent):
+    model = SlowModel(messages=answers(10), delay=0.2)
+    agent = slow_agent(model)
+    queries = ["Rent help?", "rent help", "RENT  help!"] * 3
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(lambda q: agent.find_resources(q, use_cache=False), queries))
+
+    assert results == ["answer 0"] * len(queries)
+    assert model.calls == 1
+    stats = agent.coalescing_stats()
+    assert stats['executions'] == 1 and stats['coalesced'] == len(queries) - 1
+    assert stats['coalescing_ratio'] == pytest.approx(8 / 9)
+
+    # Once the run finished, the same question starts a new one
+    assert agent.find_resources("rent help", use_cache=False) == "answer 1"
+
+
+def test_threaded_error_reaches_every_caller(slow_agent):
+    model = SlowModel(messages=answers(10), delay=0.2, error="groq is down")
+    agent = slow_agent(model)
+
+    def ask(_):
+        try:
+            return agent.find_resources("food", use_cache=False)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(ask, range(4))) == ["groq is down"] * 4
+    assert model.calls == 1
+
+
+def test_async_callers_share_one_run(slow_agent):
+    model = SlowModel(messages=answers(10), delay=0.1)
+    agent = slow_agent(model)
+
+    async def main():
+        return await asyncio.gather(*(agent.afind_resources("housing", use_cache=False)
+                                      for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer 0"] * 5
+    assert model.calls == 1
+    assert agent.coalescing_stats()['coalesced'] == 4
+
+
+def test_async_cancellation():
+    flights = SingleFlight()
+    started = []
+
+    async def work(value):
+        started.append(value)
+        await asyncio.sleep(0.1)
+        return value
+
+    async def main():
+        # Cancelling one waiter leaves the shared run going for the others
+        leader = asyncio.ensure_future(flights.arun("k", lambda: work(1)))
+        follower = asyncio.ensure_future(flights.arun("k", lambda: work(2)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == (1, True)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        # Once every waiter is gone the run is cancelled and the next caller starts afresh
+        only = asyncio.ensure_future(flights.arun("k", lambda: work(3)))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        await asyncio.sleep(0)
+        assert await flights.arun("k", lambda: work(4)) == (4, False)
+
+    asyncio.run(main())
+    assert started == [1, 3, 4]
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_threaded_flights_are_per_key():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work(key):
+        calls.append(key)
+        release.wait(1)
+        return key
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.run, key, lambda key=key: work(key)) for key in "aabb"]
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+    assert sorted(calls) == ["a", "b"]
+    assert sorted(r for r, _ in results) == ["a", "a", "b", "b"]
+    assert sum(shared for _, shared in results) == 2
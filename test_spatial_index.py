@@ -0,0 +1,71 @@
+"""
+Tests for the nearest-resource spatial index, checked against a brute-force
+haversine scan.
+
+Run with: python -m pytest test_spatial_index.py
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from spatial_index import SpatialIndex, extract_zip, haversine_miles, load_resource_locations
+
+CATEGORIES = ["Food Assistance", "Utility Assistance", "Housing Assistance"]
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = random.Random(5)
+    records = [{'id': i, 'lat': rng.uniform(25, 49), 'lng': rng.uniform(-124, -67),
+                'category': rng.choice(CATEGORIES)} for i in range(5000)]
+    # A dense city cluster, where a uniform grid would degrade
+    records += [{'id': 5000 + i, 'lat': 33.75 + rng.gauss(0, 0.05), 'lng': -84.39 + rng.gauss(0, 0.05),
+                 'category': rng.choice(CATEGORIES)} for i in range(2000)]
+    return records
+
+
+def brute_force(records, lat, lng, k, radius=None, category=None):
+    """(miles, id) of the k closest records by a full haversine scan"""
+    kept = [r for r in records if category is None or r['category'] == category]
+    distances = haversine_miles(lat, lng, np.array([r['lat'] for r in kept]),
+                                np.array([r['lng'] for r in kept]))
+    ranked = sorted((float(d), r['id']) for d, r in zip(distances, kept) if radius is None or d <= radius)
+    return ranked[:k]
+
+
+def test_nearest_matches_brute_force(points):
+    index = SpatialIndex(points, leaf_size=16)
+    rng = random.Random(9)
+    queries = [(rng.uniform(25, 49), rng.uniform(-124, -67)) for _ in range(40)] + [(33.75, -84.39)]
+    for lat, lng in queries:
+        for category in (None, "Food Assistance"):
+            expected = brute_force(points, lat, lng, 5, category=category)
+            results = index.nearest(lat, lng, k=5, category=category)
+            assert [r['id'] for r, _ in results] == [i for _, i in expected]
+            assert np.allclose([d for _, d in results], [d for d, _ in expected])
+
+
+def test_radius_and_category_filters(points):
+    index = SpatialIndex(points)
+    results = index.nearest(33.75, -84.39, k=10000, radius_miles=3)
+    assert len(results) == len(brute_force(points, 33.75, -84.39, 10000, radius=3))
+    assert all(d <= 3 for _, d in results)
+
+    food = index.nearest(33.75, -84.39, k=20, category="food assistance")
+    assert len(food) == 20 and all(r['category'] == "Food Assistance" for r, _ in food)
+    assert index.nearest(33.75, -84.39, category="Legal Aid") == []
+    assert index.nearest(0.0, 0.0, k=3, radius_miles=10) == []
+
+
+def test_loads_webapp_placeholder_resources():
+    records = load_resource_locations()
+    assert {r['zip'] for r in records} == {"30303", "10001"}
+
+    index = SpatialIndex(records)
+    assert extract_zip("Atlanta, GA 30303-1234") == "30303"
+    lat, lng = index.locate("I'm in 30303")
+    (closest, miles), = index.nearest(lat, lng, k=1, category="Utility Assistance")
+    assert closest['name'] == "Atlanta LIHEAP Program" and miles < 1
+    assert index.locate("somewhere without a zip") is None
@@ -0,0 +1,92 @@
+"""
+Tests for the resource lookups Anthony prefetches during intake.
+
+Run with: python -m pytest test_speculative_lookup.py
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from speculative_lookup import SpeculativeLookups  # noqa: E402
+
+TURNS = ["I need help with my electric bill", "Atlanta, GA 30303", "Maria", "34", "18000"]
+
+
+def test_one_lookup_per_call_and_key():
+    lookups = SpeculativeLookups(workers=1)
+    release = threading.Event()
+    seen = []
+
+    def slow(cancelled):
+        release.wait(5)
+        seen.append(cancelled.is_set())
+        return 'old'
+
+    assert lookups.start('call', ('energy', 'GA'), slow)
+    assert not lookups.start('call', ('energy', 'GA'), slow)     # same inputs: keep it
+    # The caller changed their mind: the running lookup is told to stop
+    assert lookups.start('call', ('food', 'GA'), lambda cancelled: 'new')
+    release.set()
+    assert lookups.take('call', ('food', 'GA')) == 'new'
+    assert seen == [True]
+
+    # A key that no longer matches the call is never handed over
+    lookups.start('other', ('energy', 'GA'), lambda cancelled: 'x')
+    assert lookups.take('other', ('energy', 'TX')) is None
+    assert lookups.take('missing', ('energy', 'GA')) is None
+    assert lookups.stats() == {'pending': 0, 'started': 3, 'used': 1, 'cancelled': 1,
+                               'stale': 1, 'missed': 1}
+
+
+def test_failed_or_evicted_lookups_fall_back():
+    lookups = SpeculativeLookups(workers=1, max_calls=2)
+
+    def broken(cancelled):
+        raise RuntimeError("index unavailable")
+
+    lookups.start('a', 1, broken)
+    assert lookups.take('a', 1) is None
+    for call in 'bcd':
+        lookups.start(call, 1, lambda cancelled: call)
+    assert lookups.take('b', 1) is None       # the oldest was dropped to stay within max_calls
+    assert lookups.take('d', 1) == 'd'
+    assert lookups.cancel('c') and not lookups.cancel('c')
+
+
+def test_persona_replies_are_unchanged_by_prefetching():
+    from app import AnthonyPersona
+    from call_state import MemoryCallStateStore
+
+    persona = AnthonyPersona(call_states=MemoryCallStateStore())
+    reference = AnthonyPersona(call_states=MemoryCallStateStore())
+    state = reference.get_call_state('reference')
+    for text in TURNS:
+        assert persona.process_user_input('call-1', text) == reference.respond(state, text)
+    assert persona.lookups.stats()['used'] == 1
+
+
+def test_changed_need_restarts_the_lookup():
+    from app import AnthonyPersona
+    from call_state import MemoryCallStateStore
+
+    persona = AnthonyPersona(call_states=MemoryCallStateStore())
+    persona.process_user_input('call-2', TURNS[0])
+    persona.process_user_input('call-2', TURNS[1])
+    reply = persona.process_user_input('call-2', "Actually, I need food help")
+    assert reply.startswith("Got it, I've updated that.") and "name" in reply
+    assert persona.get_call_state('call-2')['need_type'] == 'food'
+    # A number after "actually" at the income question is still the income
+    for text in ["Maria", "34"]:
+        persona.process_user_input('call-2', text)
+    reply = persona.process_user_input('call-2', "Actually it's 18000 from my job")
+    assert "SNAP" in reply and persona.get_call_state('call-2')['need_type'] == 'food'
+    assert persona.lookups.stats()['cancelled'] == 1 and persona.lookups.stats()['used'] == 1
+
+    # A call that ends early takes its lookup with it
+    persona.process_user_input('call-3', TURNS[0])
+    persona.process_user_input('call-3', TURNS[1])
+    persona.end_call('call-3')
+    assert persona.lookups.stats()['pending'] == 0
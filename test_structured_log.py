@@ -0,0 +1,115 @@
+"""
+Tests for the queue-based structured logging used on the webhook path.
+
+Run with: python -m pytest test_structured_log.py
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from structured_log import AsyncLogging, log_fields, redact, redact_text, sample_payload  # noqa: E402
+
+
+def make_logger(name, async_logging):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [async_logging.handler]
+    return logger
+
+
+def test_records_are_single_line_redacted_json():
+    stream = io.StringIO()
+    async_logging = AsyncLogging(stream=stream, fmt='json', transcripts='redacted')
+    logger = make_logger('test.json', async_logging)
+    payload = {'event': 'conversation_turn',
+               'call': {'call_id': 'c1', 'from_number': '+14045550199',
+                        'transcript_object': [{'role': 'user', 'content': 'I am 34, email me at m@x.org'}]}}
+    logger.info("retell_webhook", extra=log_fields(call_id='c1', payload=payload))
+    logger.info("conversation_turn", extra=log_fields(transcript="Call me at (404) 555-0199, ZIP 30303"))
+    async_logging.flush()
+    async_logging.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    first, second = (json.loads(line) for line in lines)
+    assert first['msg'] == 'retell_webhook' and first['call_id'] == 'c1'
+    assert first['payload']['call']['from_number'] == '<phone>'
+    assert first['payload']['call']['transcript_object'][0]['content'] == 'I am <num>, email me at <email>'
+    assert second['transcript'] == 'Call me at <phone>, ZIP <num>'
+    assert '4045550199' not in stream.getvalue()
+    # The caller's dict is left untouched
+    assert payload['call']['from_number'] == '+14045550199'
+
+
+def test_transcript_modes():
+    assert redact_text("I'm 34", 'full') == "I'm 34"
+    assert redact_text("I'm 34", 'omit') == "<6 chars>"
+    assert redact({'user_input': 'SSN 123-45-6789', 'event': 'x 12'}, 'redacted') == {
+        'user_input': 'SSN <ssn>', 'event': 'x 12'}
+
+
+def test_payload_sampling_is_per_call():
+    assert sample_payload('any', rate=1.0) and not sample_payload('any', rate=0.0)
+    sampled = [call for call in range(10000) if sample_payload(f'call-{call}', rate=0.1)]
+    assert 800 < len(sampled) < 1200
+    assert all(sample_payload(f'call-{call}', rate=0.1) for call in sampled[:50])
+
+
+def test_full_queue_drops_instead_of_blocking():
+    class BlockedStream(io.StringIO):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+
+        def write(self, text):
+            self.release.wait()
+            return super().write(text)
+
+    stream = BlockedStream()
+    async_logging = AsyncLogging(stream=stream, queue_size=5)
+    logger = make_logger('test.drop', async_logging)
+    for i in range(50):
+        logger.info("turn %d", i)
+    # One record is held by the blocked writer and five are queued; the rest were dropped
+    assert async_logging.handler.dropped >= 44
+    stream.release.set()
+    async_logging.flush()
+    async_logging.stop()
+    assert async_logging.stats()['dropped'] == async_logging.handler.dropped
+    assert len(stream.getvalue().splitlines()) == 50 - async_logging.handler.dropped
+
+
+def test_webhook_logs_structured_records():
+    import structured_log
+    from app import app, logging_stats
+
+    stream = io.StringIO()
+    capture = AsyncLogging(stream=stream, transcripts='redacted')
+    app_logger = logging.getLogger('app')
+    previous = app_logger.handlers, app_logger.propagate
+    app_logger.handlers, app_logger.propagate = [capture.handler], False
+    rate = structured_log.LOG_PAYLOAD_SAMPLE_RATE
+    structured_log.LOG_PAYLOAD_SAMPLE_RATE = 0.0
+    try:
+        response = app.test_client().post('/retell/webhook', json={
+            'event': 'conversation_turn', 'transcript': 'I need food, call 404-555-0199',
+            'call': {'call_id': 'log-call'}})
+        assert response.status_code == 200
+        capture.flush()
+    finally:
+        app_logger.handlers, app_logger.propagate = previous
+        structured_log.LOG_PAYLOAD_SAMPLE_RATE = rate
+        capture.stop()
+
+    records = {record['msg']: record for record in map(json.loads, stream.getvalue().splitlines())}
+    assert records['retell_webhook']['payload'] is None
+    assert records['conversation_turn']['transcript'] == 'I need food, call <phone>'
+    assert records['anthony_response']['call_id'] == 'log-call'
+    assert 'dropped' in logging_stats()
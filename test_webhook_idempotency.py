@@ -0,0 +1,195 @@
+"""
+Tests for idempotent Retell webhook handling: retried deliveries are
+answered with the first delivery's response and never handled twice.
+
+Run with: python -m pytest test_webhook_idempotency.py
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flask_backend'))
+
+from idempotency import IdempotentResponses, TurnNumbers, payload_digest  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def turn(call_id, transcript, **extra):
+    return {'event': 'conversation_turn', 'call': {'call_id': call_id}, 'transcript': transcript, **extra}
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    import app as app_module
+    from call_state import MemoryCallStateStore
+
+    persona = app_module.AnthonyPersona(call_states=MemoryCallStateStore())
+    monkeypatch.setattr(app_module, 'anthony', persona)
+    monkeypatch.setattr(app_module, 'webhook_responses',
+                        IdempotentResponses(keep=lambda response: response[1] < 500))
+    monkeypatch.setattr(app_module, 'webhook_turns', TurnNumbers())
+    return app_module, app_module.app.test_client(), persona
+
+
+def test_concurrent_duplicates_are_handled_once(webhook):
+    app_module, client, persona = webhook
+    handled = []
+    process = persona.process_user_input
+
+    def slow_process(call_id, text):
+        handled.append(text)
+        time.sleep(0.2)      # long enough for Retell to give up and retry
+        return process(call_id, text)
+
+    persona.process_user_input = slow_process
+    payload = turn('call-1', "I need help with my electric bill")
+    start = threading.Barrier(8)
+
+    def deliver(_):
+        start.wait()
+        return app_module.app.test_client().post('/retell/webhook', json=payload)
+
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(deliver, range(8)))
+
+    assert handled == ["I need help with my electric bill"]
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.get_data() for r in responses}) == 1
+    assert "zip code" in responses[0].get_json()['response'].lower()
+    # The conversation advanced one step, not eight
+    assert persona.get_call_state('call-1')['step'] == 'collecting_location'
+    stats = app_module.webhook_responses.stats()
+    assert stats['executed'] == 1 and stats['replayed'] == 7 and stats['in_flight'] == 0
+
+
+def test_retries_are_replayed_and_new_turns_are_handled(webhook):
+    app_module, client, persona = webhook
+    first = client.post('/retell/webhook', json=turn('call-2', "I need help with my electric bill"))
+    retry = client.post('/retell/webhook', json=turn('call-2', "I need help with my electric bill"))
+    assert retry.get_data() == first.get_data()
+    assert retry.mimetype == 'application/json'
+
+    # The next turn has a different transcript, so it is a new delivery
+    client.post('/retell/webhook', json=turn('call-2', "Atlanta, GA 30303"))
+    assert persona.get_call_state('call-2')['step'] == 'collecting_name'
+    # An explicit Idempotency-Key identifies the delivery instead of its payload
+    headers = {'Idempotency-Key': 'turn-7'}
+    name = client.post('/retell/webhook', json=turn('call-2', "Maria"), headers=headers)
+    again = client.post('/retell/webhook', json=turn('call-2', "Maria", retry=1), headers=headers)
+    assert again.get_data() == name.get_data()
+    assert persona.get_call_state('call-2')['step'] == 'collecting_age'
+    assert app_module.webhook_responses.stats()['replayed'] == 2
+
+    health = client.get('/health').get_json()
+    assert health['webhook_dedupe']['executed'] == 3
+
+
+def start_intake(client, call_id):
+    for text in ['I need food', '30303', 'Maria']:
+        client.post('/retell/webhook', json=turn(call_id, text))
+
+
+def test_sequential_retry_of_a_mid_call_answer_is_replayed(webhook):
+    app_module, client, persona = webhook
+    start_intake(client, 'call-4')
+    first = client.post('/retell/webhook', json=turn('call-4', "34"))
+    retry = client.post('/retell/webhook', json=turn('call-4', "34"))
+    assert retry.get_data() == first.get_data()
+    state = persona.get_call_state('call-4')
+    assert state['step'] == 'collecting_income'
+    assert 'income' not in state['user_info']
+    assert app_module.webhook_responses.stats()['replayed'] == 1
+
+
+def test_concurrent_retries_of_a_mid_call_answer_are_handled_once(webhook):
+    app_module, client, persona = webhook
+    start_intake(client, 'call-5')
+    handled = []
+    process = persona.process_user_input
+
+    def slow_process(call_id, text):
+        handled.append(text)
+        time.sleep(0.2)
+        return process(call_id, text)
+
+    persona.process_user_input = slow_process
+    start = threading.Barrier(4)
+
+    def deliver(_):
+        start.wait()
+        return app_module.app.test_client().post('/retell/webhook', json=turn('call-5', "34"))
+
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(deliver, range(4)))
+    # A retry after the first delivery finished is replayed too
+    responses.append(client.post('/retell/webhook', json=turn('call-5', "34")))
+
+    assert handled == ["34"]
+    assert len({r.get_data() for r in responses}) == 1
+    assert persona.get_call_state('call-5')['step'] == 'collecting_income'
+    assert app_module.webhook_responses.stats()['replayed'] == 4
+
+
+def test_same_answer_at_two_steps_is_two_turns(webhook):
+    app_module, client, persona = webhook
+    steps = []
+    for i, text in enumerate(['I need food', '30303', 'Maria', 'not sure', 'not sure']):
+        client.post('/retell/webhook', json=turn('call-3', text, response_id=i))
+        steps.append(persona.get_call_state('call-3')['step'])
+    assert steps == ['collecting_location', 'collecting_name', 'collecting_age',
+                     'collecting_income', 'providing_resources']
+    assert app_module.webhook_responses.stats()['replayed'] == 0
+
+
+def test_window_expiry_capacity_and_failures():
+    clock = FakeClock()
+    responses = IdempotentResponses(window_seconds=10, max_entries=2,
+                                    keep=lambda response: response != 'error', clock=clock)
+    runs = []
+
+    def handler(value):
+        return lambda: runs.append(value) or value
+
+    assert responses.run('a', handler('first')) == ('first', False)
+    assert responses.run('a', handler('second')) == ('first', True)
+    clock.now = 10
+    assert responses.run('a', handler('third')) == ('third', False)    # the window has passed
+    responses.run('b', handler('b'))
+    responses.run('c', handler('c'))
+    assert len(responses) == 2 and responses.run('a', handler('again')) == ('again', False)
+
+    # Failures are not kept, so a retry runs again
+    assert responses.run('d', handler('error')) == ('error', False)
+    assert responses.run('d', handler('ok')) == ('ok', False)
+    # Deliveries without a key always run
+    assert responses.run(None, handler('x')) == ('x', False)
+    assert runs == ['first', 'third', 'b', 'c', 'again', 'error', 'ok', 'x']
+    stats = responses.stats()
+    assert stats['expired'] == 1 and stats['evicted'] >= 2 and stats['replayed'] == 1
+
+
+def test_payload_digest_ignores_key_order():
+    assert payload_digest({'a': 1, 'b': [1, 2]}) == payload_digest({'b': [1, 2], 'a': 1})
+    assert payload_digest({'a': 1}) != payload_digest({'a': 2})
+
+
+def test_turn_numbers_follow_each_calls_latest_payload():
+    turns = TurnNumbers(max_calls=2)
+    assert [turns.number('a', d) for d in ['x', 'x', 'y', 'x', 'x']] == [0, 0, 1, 2, 2]
+    assert turns.number('b', 'x') == 0
+    turns.number('c', 'x')
+    assert len(turns) == 2 and turns.number('a', 'x') == 0     # 'a' was evicted
+    turns.forget('a')
+    assert len(turns) == 1
@@ -17,6 +17,8 @@ export default function Chatbot() {
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const messagesEndRef = useRef(null);
+  // Issued by the backend with the first reply
+  const sessionIdRef = useRef(null);
 
   // Automatically scroll to the bottom of the chat
   const scrollToBottom = () => {
@@ -39,21 +41,52 @@ export default function Chatbot() {
     setIsLoading(true);
 
     // --- Backend API Call ---
-    // The simulation is replaced with a real fetch call to your Python server.
+    // Streams the reply as Server-Sent Events, so the answer appears as it is written.
+    // The session ID from the first reply keeps later questions in the same conversation.
     try {
       const response = await fetch('http://127.0.0.1:5000/chat', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message: inputValue })
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({ message: inputValue, session_id: sessionIdRef.current })
       });
 
       if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
       }
-      
-      const data = await response.json();
-      const botResponse = { text: data.reply, sender: 'bot' };
-      setMessages(prev => [...prev, botResponse]);
+
+      // Add an empty bot message and grow it as tokens arrive
+      setMessages(prev => [...prev, { text: '', sender: 'bot' }]);
+      const appendToReply = (text, replace = false) => setMessages(prev => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, text: replace ? text : last.text + text }];
+      });
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const block of events) {
+          const event = block.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? '{}');
+          if (event === 'session') {
+            sessionIdRef.current = data.session_id;
+          } else if (event === 'token') {
+            appendToReply(data.content);
+          } else if (event === 'interim' || event === 'tool_call') {
+            // What was streamed so far came with a tool call; the answer follows it
+            appendToReply('', true);
+          } else if (event === 'done') {
+            appendToReply(data.reply, true);
+          } else if (event === 'error') {
+            throw new Error(data.error);
+          }
+        }
+      }
 
     } catch (error) {
       console.error("Error fetching chatbot response:", error);